@@ -0,0 +1,160 @@
+"""
+Offline microbenchmarks for the hot-path helpers, keyboards, rendering and
+model methods, compared against stored baselines.
+
+    python -m benchmarks --save               # run and store the results as the local baseline
+    python -m benchmarks                      # run and compare with benchmarks/baseline.json
+    python -m benchmarks -k inline -k helpers # only benchmarks whose name contains a filter
+    python -m benchmarks --storage mongo --db-name giveaway_bench
+
+Models run against the in-memory storage backend unless --storage mongo is
+given, which uses DB_URL with a separate database (dropped before the run).
+Each result is the best per-call time of several timed rounds. The exit
+status is 1 if any benchmark is slower than its baseline by more than
+--threshold. Timings only compare on the same machine, so the baseline is
+not committed: save one with --save before changing the code under test.
+Without a baseline every result is reported as new.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Offline microbenchmarks with baseline comparison")
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="only run benchmarks whose name contains this")
+    parser.add_argument("--storage", choices=["memory", "mongo"], default="memory", help="storage backend for the model benchmarks")
+    parser.add_argument("--db-name", default="giveaway_bench", help="database used (and dropped) with --storage mongo")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per round")
+    parser.add_argument("--threshold", type=float, default=0.3, help="relative slowdown reported as a regression")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    return parser.parse_args()
+
+def prepare_environment(args):
+    """Select the storage backend and fill in placeholder credentials before config is imported"""
+    os.environ["STORAGE_BACKEND"] = args.storage
+    if args.storage == "mongo":
+        os.environ["DB_NAME"] = args.db_name
+    for key, value in {
+        "API_ID": "1",
+        "API_HASH": "bench",
+        "BOT_TOKEN": "1:bench",
+        "LOG_CHANNEL": "-1000000000001",
+        "DB_URL": "mongodb://localhost:27017",
+        "DB_NAME": args.db_name,
+        "ADMINS": "1"
+    }.items():
+        os.environ.setdefault(key, value)
+
+def measure(func, rounds, min_time):
+    """Best seconds per call over rounds, each looping func for at least min_time"""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    
+    best = elapsed / loops
+    for _ in range(rounds - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best
+
+def format_duration(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+def compare(results, baseline, threshold):
+    """Return (report lines, regressed names) for results against the baseline"""
+    lines = [f"{'benchmark':<60} {'baseline':>10} {'current':>10} {'change':>8}"]
+    regressed = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            lines.append(f"{name:<60} {'-':>10} {format_duration(seconds):>10} {'new':>8}")
+            continue
+        change = seconds / before - 1
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressed.append(name)
+        elif change < -threshold:
+            mark = "  faster"
+        lines.append(f"{name:<60} {format_duration(before):>10} {format_duration(seconds):>10} {change:>+8.1%}{mark}")
+    return lines, regressed
+
+def main():
+    args = parse_args()
+    prepare_environment(args)
+    
+    # Imported after the environment is set up, since config reads it on import
+    import asyncio
+    import logging
+    from utils.logger import logger
+    from database.models import connect_storage, close_storage
+    from benchmarks import suite
+    
+    logger.logger.setLevel(logging.WARNING)
+    if args.storage == "mongo":
+        from database.mongo import db
+        db.client.drop_database(args.db_name)
+    asyncio.run(connect_storage())
+    
+    def selected(name):
+        return not args.filters or any(text in name for text in args.filters)
+    
+    results = {}
+    try:
+        groups = [suite.helper_benchmarks(), suite.keyboard_benchmarks(), suite.rendering_benchmarks(), suite.model_benchmarks(args.storage, selected)]
+        for group in groups:
+            for name, func in group:
+                if not selected(name):
+                    continue
+                results[name] = measure(func, args.rounds, args.min_time)
+                if not args.json:
+                    print(f"{name:<60} {format_duration(results[name]):>10}", file=sys.stderr)
+    finally:
+        close_storage()
+    
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump({"python": platform.python_version(), "results": baseline}, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Saved {len(results)} results to {args.baseline}")
+        return 0
+    
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file).get("results", {})
+    
+    lines, regressed = compare(results, baseline, args.threshold)
+    if args.json:
+        print(json.dumps({"results": results, "baseline": {name: baseline.get(name) for name in results}, "regressed": regressed}, indent=2))
+    else:
+        print("\n".join(lines))
+        print(f"\n{len(regressed)} regression(s) over {args.threshold:.0%}" if regressed else f"\nNo regressions over {args.threshold:.0%}")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+import itertools
+from datetime import datetime, timedelta
+from database.models import User, Giveaway, Settings, Chat, Broadcast, Announcement, Conversation
+from handlers.announcement import render_announcement
+from utils import inline
+from utils.helpers import select_random_winners, format_time_remaining, parse_duration
+
+# Ids used by the benchmarks start here, clear of real users and admins
+FIRST_ID = 900_000_000
+
+def helper_benchmarks():
+    participants_small = list(range(50))
+    participants_large = list(range(100_000))
+    end_soon = datetime.now() + timedelta(minutes=42)
+    end_later = datetime.now() + timedelta(days=3, hours=5)
+    end_iso = end_later.isoformat()
+    
+    yield "helpers.select_random_winners[50,10]", lambda: select_random_winners(participants_small, 10)
+    yield "helpers.select_random_winners[100k,10]", lambda: select_random_winners(participants_large, 10)
+    yield "helpers.select_random_winners[100k,1k]", lambda: select_random_winners(participants_large, 1000)
+    yield "helpers.format_time_remaining[minutes]", lambda: format_time_remaining(end_soon)
+    yield "helpers.format_time_remaining[days]", lambda: format_time_remaining(end_later)
+    yield "helpers.format_time_remaining[iso]", lambda: format_time_remaining(end_iso)
+    yield "helpers.parse_duration[2d]", lambda: parse_duration("2d")
+    yield "helpers.parse_duration[1d2h30m]", lambda: parse_duration("1d2h30m")
+
+def keyboard_benchmarks():
+    channels = [{"id": -1001000000000 - index, "username": f"@channel{index}", "title": f"Channel {index}"} for index in range(5)]
+    giveaway_id = "GA_20240101000000_1234"
+    
+    yield "inline.join_giveaway_keyboard", inline.join_giveaway_keyboard
+    yield "inline.force_subscribe_keyboard[5]", lambda: inline.force_subscribe_keyboard(channels)
+    yield "inline.admin_panel_keyboard", inline.admin_panel_keyboard
+    yield "inline.giveaway_admin_keyboard", lambda: inline.giveaway_admin_keyboard(giveaway_id)
+    yield "inline.broadcast_target_keyboard", inline.broadcast_target_keyboard
+    yield "inline.settings_keyboard", inline.settings_keyboard
+    yield "inline.confirm_keyboard", lambda: inline.confirm_keyboard("end")
+    yield "inline.close_keyboard", inline.close_keyboard
+    yield "inline.end_giveaway_keyboard", lambda: inline.end_giveaway_keyboard(giveaway_id)
+    yield "inline.announce_winner_keyboard", lambda: inline.announce_winner_keyboard(giveaway_id)
+
+def rendering_benchmarks():
+    giveaway = {
+        "giveaway_id": "GA_20240101000000_1234",
+        "prize": "Telegram Premium (12 months)",
+        "description": "Join the channels and tap the button below. " * 4,
+        "end_time": datetime.now() + timedelta(days=2),
+        "winners_count": 3
+    }
+    
+    yield "announcement.render_announcement", lambda: render_announcement(giveaway, 12345)
+
+def model_benchmarks(backend, selected=lambda name: True, users=10_000, participants=10_000):
+    """Benchmarks of every model method against a store seeded with users and one active giveaway
+    
+    Only the benchmarks whose name passes selected are returned, and the
+    store is seeded only if at least one is.
+    """
+    ids = itertools.count(FIRST_ID)
+    prefix = f"models.{backend}"
+    seeded = [next(ids) for _ in range(users)]
+    giveaway_id = "GA_BENCH_ACTIVE"
+    toggled_id = "GA_BENCH_TOGGLE"
+    # Grows with every add_participant call, so it is kept out of the other queries
+    joined_id = "GA_BENCH_JOINS"
+    
+    def seed():
+        for user_id in seeded:
+            User.add_user(user_id, f"user{user_id}")
+        for index in range(20):
+            Chat.add_chat(-1002000000000 - index, "channel", seeded[0])
+        
+        Giveaway.create_giveaway(giveaway_id, "Prize", "Benchmark giveaway", datetime.now() + timedelta(days=1), 3, seeded[0])
+        for user_id in seeded[:participants]:
+            Giveaway.add_participant(giveaway_id, user_id)
+        for index in range(5):
+            ended_id = f"GA_BENCH_ENDED_{index}"
+            Giveaway.create_giveaway(ended_id, "Prize", "Ended", datetime.now(), 1, seeded[0])
+            Giveaway.end_giveaway(ended_id, [seeded[index]])
+        Giveaway.create_giveaway(toggled_id, "Prize", "Toggled", datetime.now(), 1, seeded[0])
+        Giveaway.update_giveaway_status(toggled_id, "ended")
+        Giveaway.create_giveaway(joined_id, "Prize", "Joins", datetime.now(), 1, seeded[0])
+        Giveaway.update_giveaway_status(joined_id, "paused")
+        Announcement.add_announcements(giveaway_id, [(-1002000000000 - index, index + 1) for index in range(20)])
+    
+    def add_user():
+        User.add_user(next(ids), "bench", seeded[0])
+    
+    def add_users():
+        User.add_users([(next(ids), "bench", seeded[0]) for _ in range(100)])
+    
+    def add_participant():
+        Giveaway.add_participant(joined_id, next(ids))
+    
+    def pending_broadcast_cycle():
+        Broadcast.create_pending(seeded[1], 1, "text")
+        broadcast = Broadcast.get_pending(seeded[1])
+        Broadcast.complete(broadcast["_id"], "users", 1, 0, 0)
+    
+    def conversation_cycle():
+        Conversation.save_state(seeded[2], "create_giveaway", {"step": "prize"}, 60)
+        Conversation.get_state(seeded[2])
+        Conversation.clear_state(seeded[2])
+    
+    def force_channel_cycle():
+        Settings.add_force_channel(-1003000000000, "@bench")
+        Settings.remove_force_channel(-1003000000000)
+    
+    def admin_cycle():
+        Settings.add_admin(seeded[3])
+        Settings.remove_admin(seeded[3])
+    
+    # Reads of all users run before add_user grows the collection
+    benchmarks = [
+        (f"{prefix}.User.get_all_users[{users // 1000}k]", User.get_all_users),
+        (f"{prefix}.User.get_user", lambda: User.get_user(seeded[-1])),
+        (f"{prefix}.User.count_users", User.count_users),
+        (f"{prefix}.User.add_user", add_user),
+        (f"{prefix}.User.add_users[100]", add_users),
+        (f"{prefix}.Giveaway.get_active_giveaway[{participants // 1000}k]", Giveaway.get_active_giveaway),
+        (f"{prefix}.Giveaway.get_giveaway[{participants // 1000}k]", lambda: Giveaway.get_giveaway(giveaway_id)),
+        (f"{prefix}.Giveaway.add_participant", add_participant),
+        (f"{prefix}.Giveaway.get_participants_count[{participants // 1000}k]", lambda: Giveaway.get_participants_count(giveaway_id)),
+        (f"{prefix}.Giveaway.update_giveaway_status", lambda: Giveaway.update_giveaway_status(toggled_id, "ended")),
+        (f"{prefix}.Giveaway.end_giveaway", lambda: Giveaway.end_giveaway(toggled_id, [seeded[0]])),
+        (f"{prefix}.Giveaway.set_winners", lambda: Giveaway.set_winners(toggled_id, seeded[:3])),
+        (f"{prefix}.Giveaway.count_giveaways", lambda: Giveaway.count_giveaways("ended")),
+        (f"{prefix}.Giveaway.get_recent_ended[5]", lambda: Giveaway.get_recent_ended(5)),
+        (f"{prefix}.Settings.get_settings", Settings.get_settings),
+        (f"{prefix}.Settings.get_admins", Settings.get_admins),
+        (f"{prefix}.Settings.get_force_channels", Settings.get_force_channels),
+        (f"{prefix}.Settings.update_setting", lambda: Settings.update_setting("broadcast_target", "users")),
+        (f"{prefix}.Settings.add_remove_force_channel", force_channel_cycle),
+        (f"{prefix}.Settings.add_remove_admin", admin_cycle),
+        (f"{prefix}.Chat.add_chat[existing]", lambda: Chat.add_chat(-1002000000000, "channel", seeded[0])),
+        (f"{prefix}.Chat.get_all_chats[20]", Chat.get_all_chats),
+        (f"{prefix}.Chat.count_chats", lambda: Chat.count_chats("channel")),
+        (f"{prefix}.Broadcast.add_broadcast", lambda: Broadcast.add_broadcast("text", "users", seeded[0], 10, 0)),
+        (f"{prefix}.Broadcast.pending_cycle", pending_broadcast_cycle),
+        (f"{prefix}.Announcement.add_announcements[1]", lambda: Announcement.add_announcements("GA_BENCH_OTHER", [(-1002000000000, 1)])),
+        (f"{prefix}.Announcement.get_announcements[20]", lambda: Announcement.get_announcements(giveaway_id)),
+        (f"{prefix}.Conversation.cycle", conversation_cycle)
+    ]
+    benchmarks = [(name, func) for name, func in benchmarks if selected(name)]
+    if benchmarks:
+        seed()
+    return benchmarks
@@ -29,10 +29,110 @@ class Config:
   FORCE_SUBSCRIBE = os.getenv("FORCE_SUBSCRIBE", "true").lower() == "true"
   FORCE_CHANNEL = os.getenv("FORCE_CHANNEL", "true").lower() == "true"
 
+  # Force subscribe membership cache: TTLs in seconds for members / non-members and max entries (optional)
+  FSUB_CACHE_TTL = int(os.getenv("FSUB_CACHE_TTL", "600"))
+  FSUB_NEGATIVE_CACHE_TTL = int(os.getenv("FSUB_NEGATIVE_CACHE_TTL", "15"))
+  FSUB_CACHE_SIZE = int(os.getenv("FSUB_CACHE_SIZE", "100000"))
+
+  # Seconds a force channel membership learned from member updates is trusted (optional)
+  FSUB_INDEX_TTL = int(os.getenv("FSUB_INDEX_TTL", "86400"))
+
+  # Timeout in seconds for a single force subscribe membership lookup (optional)
+  FSUB_CHECK_TIMEOUT = float(os.getenv("FSUB_CHECK_TIMEOUT", "5"))
+
+  # Seconds the force subscribe switch and channel list are reused before they are re-read from settings (optional)
+  FSUB_SETTINGS_TTL = int(os.getenv("FSUB_SETTINGS_TTL", "30"))
+
+  # Default winner announcement mode: winners, participants or all (optional)
+  ANNOUNCE_MODES = ["winners", "participants", "all"]
+  ANNOUNCE_MODE = os.getenv("ANNOUNCE_MODE", "winners").lower()
+  if ANNOUNCE_MODE not in ANNOUNCE_MODES:
+    raise ValueError(f"Unknown ANNOUNCE_MODE {ANNOUNCE_MODE!r}, expected one of {', '.join(ANNOUNCE_MODES)}")
+
+  # Live announcement editing: seconds between edit passes and max edits per second (optional)
+  ANNOUNCE_EDIT_INTERVAL = int(os.getenv("ANNOUNCE_EDIT_INTERVAL", "60"))
+  ANNOUNCE_EDIT_RATE = int(os.getenv("ANNOUNCE_EDIT_RATE", "20"))
+
   # Developer information (optional)
   DEVELOPER_NAME = os.getenv("DEVELOPER_NAME", "YourName")
   DEVELOPER_CONTACT = os.getenv("DEVELOPER_CONTACT", "https://t.me/yourtelegram")
 
+  # Log channel digest: seconds to aggregate start/join logs (0 sends each one) and sample ids per event (optional)
+  LOG_DIGEST_INTERVAL = int(os.getenv("LOG_DIGEST_INTERVAL", "60"))
+  LOG_DIGEST_SAMPLE = int(os.getenv("LOG_DIGEST_SAMPLE", "10"))
+
+  # Log output format: text or json (one object per line with correlation ids and timings) (optional)
+  LOG_FORMATS = ["text", "json"]
+  LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+  if LOG_FORMAT not in LOG_FORMATS:
+    raise ValueError(f"Unknown LOG_FORMAT {LOG_FORMAT!r}, expected one of {', '.join(LOG_FORMATS)}")
+
+  # Max log records waiting for the background writer; extra records are dropped (optional)
+  LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+  # Local Prometheus metrics endpoint; 0 disables it (optional)
+  METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+  METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+  # MongoDB commands slower than this (ms) are flagged and get one explain plan per query shape (optional)
+  MONGO_SLOW_MS = float(os.getenv("MONGO_SLOW_MS", "100"))
+  MONGO_EXPLAIN = os.getenv("MONGO_EXPLAIN", "true").lower() == "true"
+
+  # Event loop watchdog: heartbeat interval and lag (ms) after which the blocked stack is logged (optional)
+  LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+  LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+
+  # Upper bound for on-demand profiles started with /profile (optional)
+  PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "60"))
+
+  # How long get_chat/get_users results are reused, and how many are kept (optional)
+  PEER_CACHE_TTL = int(os.getenv("PEER_CACHE_TTL", "3600"))
+  PEER_CACHE_SIZE = int(os.getenv("PEER_CACHE_SIZE", "10000"))
+
+  # Multi-step admin flows: lifetime in seconds, in-memory cache size and how
+  # long a cached flow is trusted before it is re-read, so a save or end on
+  # another replica is seen (optional)
+  CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", "3600"))
+  CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "1000"))
+  CONVERSATION_CACHE_TTL = int(os.getenv("CONVERSATION_CACHE_TTL", "5"))
+
+  # Seconds the admin list from settings is reused before it is re-read (optional)
+  ADMIN_CACHE_TTL = int(os.getenv("ADMIN_CACHE_TTL", "60"))
+
+  # Per-user anti-flood limits as "burst/seconds", admins are exempt (optional)
+  FLOOD_JOIN_RATE = os.getenv("FLOOD_JOIN_RATE", "5/10")
+  FLOOD_HEAVY_RATE = os.getenv("FLOOD_HEAVY_RATE", "3/30")
+  FLOOD_DEFAULT_RATE = os.getenv("FLOOD_DEFAULT_RATE", "20/10")
+  FLOOD_REPLY = os.getenv("FLOOD_REPLY", "true").lower() == "true"
+
+  # Seconds a repeated "Join" tap is answered from the previous answer (optional)
+  JOIN_ANSWER_CACHE_TTL = int(os.getenv("JOIN_ANSWER_CACHE_TTL", "30"))
+
+  # Join admission: join workers, max queued joins, seconds a tap waits for its result before a queue notice,
+  # and queued join results messaged per second (optional)
+  JOIN_WORKERS = int(os.getenv("JOIN_WORKERS", "32"))
+  JOIN_QUEUE_SIZE = int(os.getenv("JOIN_QUEUE_SIZE", "20000"))
+  JOIN_ANSWER_WAIT = float(os.getenv("JOIN_ANSWER_WAIT", "2"))
+  JOIN_RESULT_RATE = float(os.getenv("JOIN_RESULT_RATE", "25"))
+
+  # /start registrations: ms to collect new users before one bulk write, and max users per write (optional)
+  USER_BATCH_MS = float(os.getenv("USER_BATCH_MS", "5"))
+  USER_BATCH_SIZE = int(os.getenv("USER_BATCH_SIZE", "500"))
+
+  # Handler workers shared by all users; each user's updates still run one at a time, in order (optional)
+  DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", "8"))
+
+  # Seconds shutdown waits for queued joins, and then for running broadcasts and announcements, before cancelling them (optional)
+  SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+
+  # Seconds an update may wait for a handler before it is dropped, 0 to never drop (optional)
+  DISPATCH_CALLBACK_DEADLINE = float(os.getenv("DISPATCH_CALLBACK_DEADLINE", "10"))
+  DISPATCH_MESSAGE_DEADLINE = float(os.getenv("DISPATCH_MESSAGE_DEADLINE", "300"))
+  DISPATCH_LOW_PRIORITY_DEADLINE = float(os.getenv("DISPATCH_LOW_PRIORITY_DEADLINE", "30"))
+
+  # Storage backend: "mongo", or "memory" for a process-local store that is lost on restart (optional)
+  STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+
   # Bot UI and channel configuration (optional)
   STARTER_PIC = os.getenv("STARTER_PIC", "https://example.com/default_image.jpg")
   UPDATE_CHANNEL = os.getenv("UPDATE_CHANNEL", "")
@@ -0,0 +1,338 @@
+import itertools
+from datetime import datetime, timedelta
+from config import Config
+from database.repository import (
+    UserRepository,
+    GiveawayRepository,
+    SettingsRepository,
+    ChatRepository,
+    BroadcastRepository,
+    AnnouncementRepository,
+    ConversationRepository
+)
+
+class MemoryStore:
+    """
+    Process-local collections for the in-memory storage backend.
+    
+    Documents are plain dicts keyed the way the Mongo queries look them up,
+    with secondary indexes (giveaway status, pending broadcasts, participant
+    sets) so lookups stay O(1) instead of scanning. Nothing is persisted.
+    """
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.users = {}
+        self.giveaways = {}
+        self.giveaways_by_status = {}
+        self.participants = {}
+        self.settings = None
+        self.chats = {}
+        self.broadcasts = {}
+        self.pending_broadcasts = {}
+        self.broadcast_ids = itertools.count(1)
+        self.announcements = {}
+        self.conversations = {}
+    
+    def init_settings(self):
+        """Initialize default settings if not exists, like MongoDB._init_settings"""
+        if self.settings is None:
+            self.settings = {
+                "_id": "main",
+                "force_subscribe": Config.FORCE_SUBSCRIBE,
+                "force_channels": [],
+                "log_group_id": Config.LOG_CHANNEL,
+                "admins": list(Config.ADMINS)
+            }
+
+store = MemoryStore()
+
+async def connect():
+    store.init_settings()
+
+def close():
+    pass
+
+def _copy(document):
+    """Copy a stored document so callers cannot change it in place, as with documents read from MongoDB"""
+    if document is None:
+        return None
+    return {
+        key: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+        for key, value in document.items()
+    }
+
+class MemoryUserRepository(UserRepository):
+    def add_user(self, user_id, username=None, referred_by=None):
+        return self._add(user_id, username, referred_by)
+    
+    def add_users(self, registrations):
+        return [self._add(user_id, username, referred_by) for user_id, username, referred_by in registrations]
+    
+    def _add(self, user_id, username, referred_by):
+        if user_id in store.users:
+            return False
+        store.users[user_id] = {
+            "user_id": user_id,
+            "username": username,
+            "joined_at": datetime.now(),
+            "referrals": [],
+            "referred_by": referred_by
+        }
+        
+        # Update referrer's referrals
+        referrer = store.users.get(referred_by) if referred_by else None
+        if referrer:
+            referrer["referrals"].append(user_id)
+        return True
+    
+    def get_user(self, user_id):
+        return _copy(store.users.get(user_id))
+    
+    def get_all_users(self):
+        return [_copy(user) for user in store.users.values()]
+    
+    def count_users(self):
+        return len(store.users)
+
+class MemoryGiveawayRepository(GiveawayRepository):
+    def _set_status(self, giveaway, status):
+        store.giveaways_by_status.get(giveaway["status"], {}).pop(giveaway["giveaway_id"], None)
+        store.giveaways_by_status.setdefault(status, {})[giveaway["giveaway_id"]] = giveaway
+        giveaway["status"] = status
+    
+    def create_giveaway(self, giveaway_id, prize, description, end_time, winners_count, created_by, announce_mode="winners"):
+        giveaway_data = {
+            "giveaway_id": giveaway_id,
+            "prize": prize,
+            "description": description,
+            "end_time": end_time,
+            "winners_count": winners_count,
+            "announce_mode": announce_mode,
+            "status": "active",
+            "participants": [],
+            "winners": [],
+            "created_by": created_by,
+            "created_at": datetime.now()
+        }
+        giveaway = _copy(giveaway_data)
+        store.giveaways[giveaway_id] = giveaway
+        store.giveaways_by_status.setdefault("active", {})[giveaway_id] = giveaway
+        store.participants[giveaway_id] = set()
+        return giveaway_data
+    
+    def add_participant(self, giveaway_id, user_id):
+        giveaway = store.giveaways.get(giveaway_id)
+        participants = store.participants.get(giveaway_id)
+        if giveaway and user_id not in participants:
+            participants.add(user_id)
+            giveaway["participants"].append(user_id)
+            return True
+        return False
+    
+    def get_active_giveaway(self):
+        active = store.giveaways_by_status.get("active")
+        return _copy(next(iter(active.values()))) if active else None
+    
+    def get_giveaway(self, giveaway_id):
+        return _copy(store.giveaways.get(giveaway_id))
+    
+    def end_giveaway(self, giveaway_id, winners=None):
+        giveaway = store.giveaways.get(giveaway_id)
+        if giveaway:
+            self._set_status(giveaway, "ended")
+            if winners:
+                giveaway["winners"] = list(winners)
+    
+    def update_giveaway_status(self, giveaway_id, status):
+        giveaway = store.giveaways.get(giveaway_id)
+        if giveaway:
+            self._set_status(giveaway, status)
+    
+    def set_winners(self, giveaway_id, winners):
+        giveaway = store.giveaways.get(giveaway_id)
+        if giveaway:
+            giveaway["winners"] = list(winners)
+    
+    def get_participants_count(self, giveaway_id):
+        return len(store.participants.get(giveaway_id, ()))
+    
+    def count_giveaways(self, status=None):
+        if status:
+            return len(store.giveaways_by_status.get(status, {}))
+        return len(store.giveaways)
+    
+    def get_recent_ended(self, limit):
+        ended = store.giveaways_by_status.get("ended", {}).values()
+        recent = sorted(ended, key=lambda giveaway: giveaway["created_at"], reverse=True)[:limit]
+        return [_copy(giveaway) for giveaway in recent]
+
+class MemorySettingsRepository(SettingsRepository):
+    def get_settings(self):
+        return _copy(store.settings) or {}
+    
+    def update_setting(self, key, value):
+        if store.settings is None:
+            store.settings = {"_id": "main"}
+        store.settings[key] = value
+    
+    def add_force_channel(self, channel_id, channel_username):
+        if store.settings is None:
+            return
+        channel = {"id": channel_id, "username": channel_username}
+        channels = store.settings.setdefault("force_channels", [])
+        if channel not in channels:
+            channels.append(channel)
+    
+    def remove_force_channel(self, channel_id):
+        if store.settings is None:
+            return
+        channels = store.settings.get("force_channels", [])
+        store.settings["force_channels"] = [channel for channel in channels if channel.get("id") != channel_id]
+    
+    def add_admin(self, admin_id):
+        if store.settings is None:
+            return
+        admins = store.settings.setdefault("admins", [])
+        if admin_id not in admins:
+            admins.append(admin_id)
+    
+    def remove_admin(self, admin_id):
+        if store.settings is None:
+            return
+        store.settings["admins"] = [admin for admin in store.settings.get("admins", []) if admin != admin_id]
+    
+    def get_force_channels(self):
+        return [dict(channel) for channel in (store.settings or {}).get("force_channels", [])]
+    
+    def get_admins(self):
+        return list((store.settings or {}).get("admins", []))
+
+class MemoryChatRepository(ChatRepository):
+    def add_chat(self, chat_id, chat_type, added_by):
+        if chat_id in store.chats:
+            return False
+        # Convert enum to string if needed
+        if hasattr(chat_type, 'value'):
+            chat_type = chat_type.value
+        store.chats[chat_id] = {
+            "chat_id": chat_id,
+            "type": chat_type,
+            "added_by": added_by,
+            "date_added": datetime.now()
+        }
+        return True
+    
+    def get_all_chats(self, chat_type=None):
+        return [_copy(chat) for chat in store.chats.values() if not chat_type or chat["type"] == chat_type]
+    
+    def count_chats(self, chat_type=None):
+        if not chat_type:
+            return len(store.chats)
+        return sum(1 for chat in store.chats.values() if chat["type"] == chat_type)
+
+class MemoryBroadcastRepository(BroadcastRepository):
+    def _insert(self, broadcast):
+        broadcast["_id"] = next(store.broadcast_ids)
+        store.broadcasts[broadcast["_id"]] = broadcast
+        return broadcast
+    
+    def add_broadcast(self, message, target_type, sent_by, success_count, failed_count):
+        self._insert({
+            "message": message,
+            "target_type": target_type,
+            "sent_by": sent_by,
+            "date": datetime.now(),
+            "success_count": success_count,
+            "failed_count": failed_count
+        })
+    
+    def create_pending(self, admin_id, message_id, text):
+        broadcast = self._insert({
+            "admin_id": admin_id,
+            "message_id": message_id,
+            "text": text,
+            "status": "pending",
+            "target": None,
+            "created_at": datetime.now()
+        })
+        store.pending_broadcasts.setdefault(admin_id, []).append(broadcast["_id"])
+    
+    def get_pending(self, admin_id):
+        pending = store.pending_broadcasts.get(admin_id)
+        return _copy(store.broadcasts[pending[0]]) if pending else None
+    
+    def set_target(self, broadcast_id, target):
+        broadcast = store.broadcasts.get(broadcast_id)
+        if broadcast:
+            broadcast["target"] = target
+    
+    def cancel_pending(self, admin_id):
+        for broadcast_id in store.pending_broadcasts.pop(admin_id, []):
+            store.broadcasts.pop(broadcast_id, None)
+    
+    def claim_pending(self, broadcast_id):
+        broadcast = store.broadcasts.get(broadcast_id)
+        if not broadcast or broadcast.get("status") != "pending":
+            return False
+        pending = store.pending_broadcasts.get(broadcast["admin_id"], [])
+        if broadcast_id in pending:
+            pending.remove(broadcast_id)
+        if not pending:
+            store.pending_broadcasts.pop(broadcast["admin_id"], None)
+        broadcast.update({"status": "sending", "started_at": datetime.now()})
+        return True
+    
+    def complete(self, broadcast_id, target, success, failed, blocked):
+        broadcast = store.broadcasts.get(broadcast_id)
+        if not broadcast:
+            return
+        if broadcast.get("status") == "pending":
+            pending = store.pending_broadcasts.get(broadcast["admin_id"], [])
+            if broadcast_id in pending:
+                pending.remove(broadcast_id)
+            if not pending:
+                store.pending_broadcasts.pop(broadcast["admin_id"], None)
+        broadcast.update({
+            "status": "completed",
+            "success": success,
+            "failed": failed,
+            "blocked": blocked,
+            "target": target,
+            "completed_at": datetime.now()
+        })
+
+class MemoryAnnouncementRepository(AnnouncementRepository):
+    def add_announcements(self, giveaway_id, messages):
+        announcements = store.announcements.setdefault(giveaway_id, [])
+        for chat_id, message_id in messages:
+            announcements.append({
+                "giveaway_id": giveaway_id,
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "date": datetime.now()
+            })
+    
+    def get_announcements(self, giveaway_id):
+        return [_copy(announcement) for announcement in store.announcements.get(giveaway_id, [])]
+
+class MemoryConversationRepository(ConversationRepository):
+    def get_state(self, user_id):
+        document = store.conversations.get(user_id)
+        if document is None:
+            return None
+        if document["expires_at"] <= datetime.utcnow():
+            # Expired flows are removed on read, as the TTL index does in MongoDB
+            del store.conversations[user_id]
+            return None
+        return _copy(document)
+    
+    def save_state(self, user_id, flow, state, ttl):
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        store.conversations[user_id] = {"_id": user_id, "flow": flow, "state": state, "expires_at": expires_at}
+        return expires_at
+    
+    def clear_state(self, user_id):
+        store.conversations.pop(user_id, None)
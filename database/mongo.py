@@ -1,19 +1,24 @@
+import asyncio
 from pymongo import MongoClient
 from config import Config
+from database.monitoring import command_listener
+from utils.logger import logger
 import time
 
 class MongoDB:
     def __init__(self):
         try:
-            # Connect with timeout and retry settings
+            # No I/O here: the client connects on connect() or on first use, so
+            # importing this module does not need a live MongoDB
             self.client = MongoClient(
                 Config.DB_URL,
                 serverSelectionTimeoutMS=5000,
                 connectTimeoutMS=10000,
-                socketTimeoutMS=None
+                socketTimeoutMS=None,
+                event_listeners=[command_listener],
+                connect=False
             )
-            # Force connection test
-            self.client.server_info()
+            command_listener.client = self.client
             
             self.db = self.client[Config.DB_NAME]
             
@@ -23,12 +28,27 @@ class MongoDB:
             self.settings = self.db.settings
             self.chats = self.db.chats
             self.broadcasts = self.db.broadcasts
-            
-            # Initialize default settings
-            self._init_settings()
+            self.announcements = self.db.announcements
+            self.conversations = self.db.conversations
+        except Exception as e:
+            print(f"[ERROR] Failed to set up MongoDB client: {e}")
+            raise
+    
+    async def connect(self):
+        """Check the connection and initialize settings and indexes, off the event loop"""
+        await asyncio.to_thread(self._connect)
+    
+    def _connect(self):
+        try:
+            # Force connection test
+            self.client.server_info()
         except Exception as e:
             print(f"[ERROR] Failed to connect to MongoDB: {e}")
             raise
+        
+        # Initialize default settings
+        self._init_settings()
+        self._init_indexes()
     
     def _init_settings(self):
         """Initialize default settings if not exists"""
@@ -44,13 +64,42 @@ class MongoDB:
         except Exception as e:
             print(f"[ERROR] Failed to initialize settings: {e}")
     
+    def _init_indexes(self):
+        """
+        Create indexes that the code relies on.
+        
+        The unique user_id index is required: batched registrations rely on
+        its duplicate key errors to detect racing inserts, so startup fails
+        without it. It cannot be built while the users collection holds
+        duplicate user_id documents (left by the old find-then-insert path).
+        To clean up, list them in mongosh with
+        
+            db.users.aggregate([{$group: {_id: "$user_id", n: {$sum: 1}, ids: {$push: "$_id"}}}, {$match: {n: {$gt: 1}}}])
+        
+        then delete every _id but the oldest of each group and restart the bot.
+        """
+        try:
+            # Expired conversation flows are removed by MongoDB
+            self.conversations.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            print(f"[ERROR] Failed to create indexes: {e}")
+        try:
+            self.users.create_index("user_id", unique=True)
+        except Exception as e:
+            logger.error(
+                "[DB] Cannot create the unique user_id index: %s. Remove duplicate user_id documents "
+                "from the users collection (see MongoDB._init_indexes in database/mongo.py) and restart.",
+                e
+            )
+            raise
+    
     def close(self):
         try:
             self.client.close()
         except Exception as e:
             print(f"[ERROR] Failed to close database: {e}")
 
-# Global database instance
+# Global database instance; GiveawayBot.start awaits db.connect()
 try:
     db = MongoDB()
 except Exception as e:
@@ -0,0 +1,334 @@
+from datetime import datetime, timedelta
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from database.mongo import db
+from database.repository import (
+    UserRepository,
+    GiveawayRepository,
+    SettingsRepository,
+    ChatRepository,
+    BroadcastRepository,
+    AnnouncementRepository,
+    ConversationRepository
+)
+from utils.logger import logger
+
+async def connect():
+    await db.connect()
+
+def close():
+    db.close()
+
+class MongoUserRepository(UserRepository):
+    def add_user(self, user_id, username=None, referred_by=None):
+        if not db.users.find_one({"user_id": user_id}):
+            user_data = {
+                "user_id": user_id,
+                "username": username,
+                "joined_at": datetime.now(),
+                "referrals": [],
+                "referred_by": referred_by
+            }
+            db.users.insert_one(user_data)
+            
+            # Update referrer's referrals
+            if referred_by:
+                db.users.update_one(
+                    {"user_id": referred_by},
+                    {"$push": {"referrals": user_id}}
+                )
+            return True
+        return False
+    
+    def add_users(self, registrations):
+        # One read for the users that already exist, one unordered bulk insert for
+        # the new ones and one bulk update for their referral credits
+        user_ids = list({user_id for user_id, _, _ in registrations})
+        existing = {user["user_id"] for user in db.users.find({"user_id": {"$in": user_ids}}, {"user_id": 1})}
+        
+        documents = {}
+        for user_id, username, referred_by in registrations:
+            if user_id not in existing and user_id not in documents:
+                documents[user_id] = {
+                    "user_id": user_id,
+                    "username": username,
+                    "joined_at": datetime.now(),
+                    "referrals": [],
+                    "referred_by": referred_by
+                }
+        if not documents:
+            return [False] * len(registrations)
+        
+        inserted = set(documents)
+        try:
+            db.users.bulk_write([InsertOne(document) for document in documents.values()], ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean another process added the user since the read
+            new_users = list(documents)
+            errors = e.details.get("writeErrors", [])
+            if any(error["code"] != 11000 for error in errors):
+                raise
+            for error in errors:
+                inserted.discard(new_users[error["index"]])
+        
+        # Referrers are credited only for users this call actually inserted
+        referrals = {}
+        for user_id, document in documents.items():
+            if user_id in inserted and document["referred_by"]:
+                referrals.setdefault(document["referred_by"], []).append(user_id)
+        if referrals:
+            db.users.bulk_write([
+                UpdateOne({"user_id": referrer}, {"$push": {"referrals": {"$each": credited}}})
+                for referrer, credited in referrals.items()
+            ], ordered=False)
+        
+        results = []
+        for user_id, _, _ in registrations:
+            # A user registering twice in one batch is new only the first time
+            results.append(user_id in inserted)
+            inserted.discard(user_id)
+        return results
+    
+    def get_user(self, user_id):
+        return db.users.find_one({"user_id": user_id})
+    
+    def get_all_users(self):
+        return list(db.users.find({}))
+    
+    def count_users(self):
+        return db.users.count_documents({})
+
+class MongoGiveawayRepository(GiveawayRepository):
+    def create_giveaway(self, giveaway_id, prize, description, end_time, winners_count, created_by, announce_mode="winners"):
+        giveaway_data = {
+            "giveaway_id": giveaway_id,
+            "prize": prize,
+            "description": description,
+            "end_time": end_time,
+            "winners_count": winners_count,
+            "announce_mode": announce_mode,
+            "status": "active",
+            "participants": [],
+            "winners": [],
+            "created_by": created_by,
+            "created_at": datetime.now()
+        }
+        db.giveaways.insert_one(giveaway_data)
+        return giveaway_data
+    
+    def add_participant(self, giveaway_id, user_id):
+        giveaway = db.giveaways.find_one({"giveaway_id": giveaway_id})
+        if giveaway and user_id not in giveaway.get("participants", []):
+            db.giveaways.update_one(
+                {"giveaway_id": giveaway_id},
+                {"$push": {"participants": user_id}}
+            )
+            return True
+        return False
+    
+    def get_active_giveaway(self):
+        return db.giveaways.find_one({"status": "active"})
+    
+    def get_giveaway(self, giveaway_id):
+        return db.giveaways.find_one({"giveaway_id": giveaway_id})
+    
+    def end_giveaway(self, giveaway_id, winners=None):
+        try:
+            update_data = {"status": "ended"}
+            if winners:
+                update_data["winners"] = winners
+            
+            logger.info(f"[DB_END_GIVEAWAY] Ending giveaway {giveaway_id}, winners: {len(winners) if winners else 0}")
+            db.giveaways.update_one(
+                {"giveaway_id": giveaway_id},
+                {"$set": update_data}
+            )
+            logger.info(f"[DB_END_GIVEAWAY] ✅ Successfully ended giveaway {giveaway_id}")
+        except Exception as e:
+            logger.error(f"[DB_END_GIVEAWAY] Error ending giveaway {giveaway_id}: {str(e)}", exc_info=True)
+            raise
+    
+    def update_giveaway_status(self, giveaway_id, status):
+        try:
+            logger.info(f"[DB_UPDATE_STATUS] Updating giveaway {giveaway_id} status to {status}")
+            db.giveaways.update_one(
+                {"giveaway_id": giveaway_id},
+                {"$set": {"status": status}}
+            )
+            logger.info(f"[DB_UPDATE_STATUS] ✅ Successfully updated status for {giveaway_id}")
+        except Exception as e:
+            logger.error(f"[DB_UPDATE_STATUS] Error updating status for {giveaway_id}: {str(e)}", exc_info=True)
+            raise
+    
+    def set_winners(self, giveaway_id, winners):
+        db.giveaways.update_one(
+            {"giveaway_id": giveaway_id},
+            {"$set": {"winners": winners}}
+        )
+    
+    def get_participants_count(self, giveaway_id):
+        giveaway = db.giveaways.find_one({"giveaway_id": giveaway_id})
+        return len(giveaway.get("participants", [])) if giveaway else 0
+    
+    def count_giveaways(self, status=None):
+        query = {"status": status} if status else {}
+        return db.giveaways.count_documents(query)
+    
+    def get_recent_ended(self, limit):
+        return list(db.giveaways.find({"status": "ended"}).sort("created_at", -1).limit(limit))
+
+class MongoSettingsRepository(SettingsRepository):
+    def get_settings(self):
+        settings = db.settings.find_one({"_id": "main"})
+        return settings if settings else {}
+    
+    def update_setting(self, key, value):
+        db.settings.update_one(
+            {"_id": "main"},
+            {"$set": {key: value}},
+            upsert=True
+        )
+    
+    def add_force_channel(self, channel_id, channel_username):
+        db.settings.update_one(
+            {"_id": "main"},
+            {"$addToSet": {"force_channels": {"id": channel_id, "username": channel_username}}}
+        )
+    
+    def remove_force_channel(self, channel_id):
+        db.settings.update_one(
+            {"_id": "main"},
+            {"$pull": {"force_channels": {"id": channel_id}}}
+        )
+    
+    def add_admin(self, admin_id):
+        db.settings.update_one(
+            {"_id": "main"},
+            {"$addToSet": {"admins": admin_id}}
+        )
+    
+    def remove_admin(self, admin_id):
+        db.settings.update_one(
+            {"_id": "main"},
+            {"$pull": {"admins": admin_id}}
+        )
+
+class MongoChatRepository(ChatRepository):
+    def add_chat(self, chat_id, chat_type, added_by):
+        if not db.chats.find_one({"chat_id": chat_id}):
+            # Convert enum to string if needed
+            if hasattr(chat_type, 'value'):
+                chat_type = chat_type.value
+            chat_data = {
+                "chat_id": chat_id,
+                "type": chat_type,
+                "added_by": added_by,
+                "date_added": datetime.now()
+            }
+            db.chats.insert_one(chat_data)
+            return True
+        return False
+    
+    def get_all_chats(self, chat_type=None):
+        query = {"type": chat_type} if chat_type else {}
+        return list(db.chats.find(query))
+    
+    def count_chats(self, chat_type=None):
+        query = {"type": chat_type} if chat_type else {}
+        return db.chats.count_documents(query)
+
+class MongoBroadcastRepository(BroadcastRepository):
+    def add_broadcast(self, message, target_type, sent_by, success_count, failed_count):
+        broadcast_data = {
+            "message": message,
+            "target_type": target_type,
+            "sent_by": sent_by,
+            "date": datetime.now(),
+            "success_count": success_count,
+            "failed_count": failed_count
+        }
+        db.broadcasts.insert_one(broadcast_data)
+    
+    def create_pending(self, admin_id, message_id, text):
+        db.broadcasts.insert_one({
+            "admin_id": admin_id,
+            "message_id": message_id,
+            "text": text,
+            "status": "pending",
+            "target": None,
+            "created_at": datetime.now()
+        })
+    
+    def get_pending(self, admin_id):
+        return db.broadcasts.find_one({
+            "admin_id": admin_id,
+            "status": "pending"
+        })
+    
+    def set_target(self, broadcast_id, target):
+        db.broadcasts.update_one(
+            {"_id": broadcast_id},
+            {"$set": {"target": target}}
+        )
+    
+    def cancel_pending(self, admin_id):
+        db.broadcasts.delete_many({
+            "admin_id": admin_id,
+            "status": "pending"
+        })
+    
+    def claim_pending(self, broadcast_id):
+        # Conditional on the status, so of two concurrent confirms only one matches
+        result = db.broadcasts.update_one(
+            {"_id": broadcast_id, "status": "pending"},
+            {"$set": {"status": "sending", "started_at": datetime.now()}}
+        )
+        return result.modified_count == 1
+    
+    def complete(self, broadcast_id, target, success, failed, blocked):
+        db.broadcasts.update_one(
+            {"_id": broadcast_id},
+            {
+                "$set": {
+                    "status": "completed",
+                    "success": success,
+                    "failed": failed,
+                    "blocked": blocked,
+                    "target": target,
+                    "completed_at": datetime.now()
+                }
+            }
+        )
+
+class MongoAnnouncementRepository(AnnouncementRepository):
+    def add_announcements(self, giveaway_id, messages):
+        if not messages:
+            return
+        db.announcements.insert_many([
+            {
+                "giveaway_id": giveaway_id,
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "date": datetime.now()
+            }
+            for chat_id, message_id in messages
+        ])
+    
+    def get_announcements(self, giveaway_id):
+        return list(db.announcements.find({"giveaway_id": giveaway_id}))
+
+class MongoConversationRepository(ConversationRepository):
+    def get_state(self, user_id):
+        return db.conversations.find_one({"_id": user_id, "expires_at": {"$gt": datetime.utcnow()}})
+    
+    def save_state(self, user_id, flow, state, ttl):
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl)
+        db.conversations.update_one(
+            {"_id": user_id},
+            {"$set": {"flow": flow, "state": state, "expires_at": expires_at}},
+            upsert=True
+        )
+        return expires_at
+    
+    def clear_state(self, user_id):
+        db.conversations.delete_one({"_id": user_id})
@@ -0,0 +1,157 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import monitoring
+from config import Config
+from utils.logger import logger
+from utils.metrics import registry, add_route
+
+command_latency = registry.histogram(
+    "bot_mongo_command_latency_seconds",
+    "MongoDB command latency",
+    ["collection", "operation"]
+)
+command_failures = registry.counter(
+    "bot_mongo_command_failures_total",
+    "MongoDB commands that failed",
+    ["collection", "operation"]
+)
+slow_commands = registry.counter(
+    "bot_mongo_slow_commands_total",
+    "MongoDB commands slower than MONGO_SLOW_MS",
+    ["collection", "operation"]
+)
+
+# Commands that can be explained, and where their filter lives
+EXPLAINABLE = {
+    "find": lambda command: command.get("filter", {}),
+    "count": lambda command: command.get("query", {}),
+    "distinct": lambda command: command.get("query", {}),
+    "findAndModify": lambda command: command.get("query", {}),
+    "update": lambda command: (command.get("updates") or [{}])[0].get("q", {}),
+    "delete": lambda command: (command.get("deletes") or [{}])[0].get("q", {}),
+    "aggregate": lambda command: (command.get("pipeline") or [{}])[0].get("$match", {})
+}
+
+# Driver-added fields that must not be sent back inside an explain
+DRIVER_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "$readConcern"}
+
+def query_shape(value):
+    """Replace literal values with 1 so queries differing only in values share a shape"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in sorted(value.items())}
+    if isinstance(value, list):
+        return [query_shape(item) for item in value[:1]]
+    return 1
+
+def summarize_plan(explain_result):
+    """Condense a winning plan into 'FETCH > IXSCAN' style text"""
+    planner = explain_result.get("queryPlanner", {})
+    plan = planner.get("winningPlan", {})
+    plan = plan.get("queryPlan", plan)
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        if plan.get("indexName"):
+            stage += f"({plan['indexName']})"
+        stages.append(stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(stages) or "unknown"
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Records per-collection/per-operation latency for every MongoDB command and
+    captures one explain plan per slow query shape in a background thread.
+    """
+    
+    def __init__(self):
+        self.client = None
+        self.pending = {}
+        self.lock = threading.Lock()
+        # shape key -> {"collection", "operation", "shape", "count", "max_ms", "plan"}
+        self.slow_queries = {}
+        self.explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-explain")
+    
+    def started(self, event):
+        if event.command_name == "explain":
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        command = None
+        if event.command_name in EXPLAINABLE:
+            command = {key: value for key, value in event.command.items() if key not in DRIVER_FIELDS}
+        with self.lock:
+            self.pending[event.request_id] = (collection, command, event.database_name)
+    
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+    
+    def failed(self, event):
+        self._finish(event, failed=True)
+    
+    def _finish(self, event, failed):
+        with self.lock:
+            entry = self.pending.pop(event.request_id, None)
+        if entry is None:
+            return
+        
+        collection, command, database_name = entry
+        operation = event.command_name
+        elapsed_ms = event.duration_micros / 1000
+        command_latency.observe(elapsed_ms / 1000, collection=collection, operation=operation)
+        if failed:
+            command_failures.inc(collection=collection, operation=operation)
+        
+        if elapsed_ms < Config.MONGO_SLOW_MS:
+            return
+        
+        slow_commands.inc(collection=collection, operation=operation)
+        shape = query_shape(EXPLAINABLE[operation](command)) if command else {}
+        key = f"{collection}.{operation}:{json.dumps(shape, sort_keys=True, default=str)}"
+        
+        with self.lock:
+            slow_query = self.slow_queries.get(key)
+            is_new = slow_query is None
+            if is_new:
+                slow_query = self.slow_queries[key] = {
+                    "collection": collection,
+                    "operation": operation,
+                    "shape": shape,
+                    "count": 0,
+                    "max_ms": 0.0,
+                    "plan": None
+                }
+            slow_query["count"] += 1
+            slow_query["max_ms"] = max(slow_query["max_ms"], elapsed_ms)
+        
+        logger.limited(
+            ("mongo_slow", key),
+            "[MONGO_SLOW] %s.%s took %.1fms, shape %s",
+            collection, operation, elapsed_ms, shape
+        )
+        
+        if is_new and command and Config.MONGO_EXPLAIN and self.client is not None:
+            self.explainer.submit(self._explain, key, command, database_name)
+    
+    def _explain(self, key, command, database_name):
+        """Run explain for a slow query shape; the explain command itself is not tracked"""
+        try:
+            result = self.client[database_name].command({"explain": command, "verbosity": "queryPlanner"})
+            plan = summarize_plan(result)
+            with self.lock:
+                self.slow_queries[key]["plan"] = plan
+            logger.warning("[MONGO_SLOW] Plan for %s: %s", key, plan)
+        except Exception as e:
+            logger.error("[MONGO_SLOW] Could not explain %s: %s", key, e)
+    
+    def report(self):
+        """Slow query shapes with their captured plans, slowest first"""
+        with self.lock:
+            slow_queries = list(self.slow_queries.values())
+        return sorted(slow_queries, key=lambda item: item["max_ms"], reverse=True)
+
+# Global listener, registered on the MongoClient in database/mongo.py
+command_listener = CommandMetricsListener()
+
+add_route("/mongo/slow", lambda query: ("application/json", json.dumps(command_listener.report(), default=str, indent=2)))
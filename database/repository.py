@@ -0,0 +1,179 @@
+from abc import ABC, abstractmethod
+
+class UserRepository(ABC):
+    """Storage interface for users"""
+    
+    @abstractmethod
+    def add_user(self, user_id, username=None, referred_by=None):
+        """Add a new user (and credit the referrer); False if the user already exists"""
+    
+    @abstractmethod
+    def add_users(self, registrations):
+        """Add many (user_id, username, referred_by) registrations in one write; returns add_user's result for each"""
+    
+    @abstractmethod
+    def get_user(self, user_id):
+        """Get user by ID"""
+    
+    @abstractmethod
+    def get_all_users(self):
+        """Get all users"""
+    
+    @abstractmethod
+    def count_users(self):
+        """Count total users"""
+
+class GiveawayRepository(ABC):
+    """Storage interface for giveaways"""
+    
+    @abstractmethod
+    def create_giveaway(self, giveaway_id, prize, description, end_time, winners_count, created_by, announce_mode="winners"):
+        """Create a new active giveaway and return it"""
+    
+    @abstractmethod
+    def add_participant(self, giveaway_id, user_id):
+        """Add participant to giveaway; False if already in or no such giveaway"""
+    
+    @abstractmethod
+    def get_active_giveaway(self):
+        """Get active giveaway"""
+    
+    @abstractmethod
+    def get_giveaway(self, giveaway_id):
+        """Get giveaway by ID"""
+    
+    @abstractmethod
+    def end_giveaway(self, giveaway_id, winners=None):
+        """Mark a giveaway ended, storing its winners"""
+    
+    @abstractmethod
+    def update_giveaway_status(self, giveaway_id, status):
+        """Update giveaway status"""
+    
+    @abstractmethod
+    def set_winners(self, giveaway_id, winners):
+        """Replace the winners of a giveaway"""
+    
+    @abstractmethod
+    def get_participants_count(self, giveaway_id):
+        """Get participants count"""
+    
+    @abstractmethod
+    def count_giveaways(self, status=None):
+        """Count giveaways, optionally only those with a status"""
+    
+    @abstractmethod
+    def get_recent_ended(self, limit):
+        """Get the most recently created ended giveaways, newest first"""
+    
+    def get_last_ended(self):
+        """Get the most recently created ended giveaway"""
+        ended = self.get_recent_ended(1)
+        return ended[0] if ended else None
+
+class SettingsRepository(ABC):
+    """Storage interface for the bot settings document"""
+    
+    @abstractmethod
+    def get_settings(self):
+        """Get bot settings ({} if not initialized)"""
+    
+    @abstractmethod
+    def update_setting(self, key, value):
+        """Update a setting"""
+    
+    @abstractmethod
+    def add_force_channel(self, channel_id, channel_username):
+        """Add a force subscribe channel"""
+    
+    @abstractmethod
+    def remove_force_channel(self, channel_id):
+        """Remove a force subscribe channel"""
+    
+    @abstractmethod
+    def add_admin(self, admin_id):
+        """Add an admin"""
+    
+    @abstractmethod
+    def remove_admin(self, admin_id):
+        """Remove an admin"""
+    
+    def get_force_channels(self):
+        """Get all force subscribe channels"""
+        return self.get_settings().get("force_channels", [])
+    
+    def get_admins(self):
+        """Get all admins"""
+        return self.get_settings().get("admins", [])
+
+class ChatRepository(ABC):
+    """Storage interface for groups and channels the bot is in"""
+    
+    @abstractmethod
+    def add_chat(self, chat_id, chat_type, added_by):
+        """Add a chat (group/channel); False if it already exists"""
+    
+    @abstractmethod
+    def get_all_chats(self, chat_type=None):
+        """Get all chats, optionally filtered by type"""
+    
+    @abstractmethod
+    def count_chats(self, chat_type=None):
+        """Count chats by type"""
+
+class BroadcastRepository(ABC):
+    """Storage interface for broadcasts: pending ones per admin and their results"""
+    
+    @abstractmethod
+    def add_broadcast(self, message, target_type, sent_by, success_count, failed_count):
+        """Add broadcast history"""
+    
+    @abstractmethod
+    def create_pending(self, admin_id, message_id, text):
+        """Store a broadcast waiting for its target and confirmation"""
+    
+    @abstractmethod
+    def get_pending(self, admin_id):
+        """Get an admin's pending broadcast"""
+    
+    @abstractmethod
+    def set_target(self, broadcast_id, target):
+        """Set the target of a pending broadcast"""
+    
+    @abstractmethod
+    def cancel_pending(self, admin_id):
+        """Drop all pending broadcasts of an admin"""
+    
+    @abstractmethod
+    def claim_pending(self, broadcast_id):
+        """Move a pending broadcast to sending; True only for the one caller that did"""
+    
+    @abstractmethod
+    def complete(self, broadcast_id, target, success, failed, blocked):
+        """Mark a broadcast completed with its delivery results"""
+
+class AnnouncementRepository(ABC):
+    """Storage interface for posted giveaway announcement messages"""
+    
+    @abstractmethod
+    def add_announcements(self, giveaway_id, messages):
+        """Record announcement messages as (chat_id, message_id) pairs"""
+    
+    @abstractmethod
+    def get_announcements(self, giveaway_id):
+        """Get all recorded announcement messages of a giveaway"""
+
+class ConversationRepository(ABC):
+    """Storage interface for multi-step conversation flows"""
+    
+    @abstractmethod
+    def get_state(self, user_id):
+        """Get a user's open conversation flow, if it has not expired"""
+    
+    @abstractmethod
+    def save_state(self, user_id, flow, state, ttl):
+        """Store a user's conversation flow and state for ttl seconds"""
+    
+    @abstractmethod
+    def clear_state(self, user_id):
+        """Close a user's conversation flow"""
@@ -2,8 +2,12 @@ from pyrogram import Client, filters
 from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from pyrogram.enums import ChatMemberStatus
 from config import Config
-from database.mongo import db
+from database.models import User, Giveaway, Settings, Chat, Broadcast
+from handlers.forcesubscribe import get_force_subscribe_service
 from utils.logger import logger
+from utils.peers import get_chat_cached, get_user_cached
+from utils.tasks import background
+from utils.cache import TTLCache
 from handlers.botlog import (
     send_admin_action_log,
     send_force_channel_added_log,
@@ -12,7 +16,10 @@ from handlers.botlog import (
     send_admin_removed_log,
     send_broadcast_log
 )
+from utils.profiler import run_profile, PROFILE_MODES
+from utils.callbacks import get_callback_router, pack, unpack, BROADCAST_SELECT, BROADCAST_CONFIRM, BROADCAST_CANCEL
 from datetime import datetime
+import io
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin"""
@@ -24,18 +31,39 @@ def admin_filter(_, __, message: Message):
 
 admin_only = filters.create(admin_filter)
 
+# Admins from settings (Config.ADMINS plus /addadmin), shared by all handlers
+admin_ids = TTLCache(1)
+
+def get_admin_ids():
+    """Get the set of admins from settings, re-read at most every ADMIN_CACHE_TTL seconds"""
+    admins = admin_ids.get("admins")
+    if admins is None:
+        admins = set(Settings.get_admins())
+        admin_ids.set("admins", admins, Config.ADMIN_CACHE_TTL)
+    return admins
+
+def settings_admin_filter(_, __, message: Message):
+    """Filter to check if user is an admin in settings"""
+    return message.from_user and message.from_user.id in get_admin_ids()
+
+settings_admin_only = filters.create(settings_admin_filter)
+
 def setup_admin_handlers(app: Client):
     """Setup admin command handlers"""
+    router = get_callback_router(app)
     
     @app.on_message(filters.command("stats") & admin_only & filters.private)
     async def admin_stats_command(client, message: Message):
         """Show bot statistics"""
         try:
             # Get statistics
-            total_users = db.users.count_documents({})
-            total_giveaways = db.giveaways.count_documents({})
-            active_giveaways = db.giveaways.count_documents({"status": "active"})
-            total_chats = db.chats.count_documents({})
+            total_users = User.count_users()
+            total_giveaways = Giveaway.count_giveaways()
+            active_giveaways = Giveaway.count_giveaways("active")
+            total_chats = Chat.count_chats()
+            force_subscribe_service = get_force_subscribe_service(client)
+            fsub_cache = force_subscribe_service.membership_cache.stats()
+            fsub_index = force_subscribe_service.index_stats()
             
             stats_text = f"""📊 **Bot Statistics**
 
@@ -43,9 +71,19 @@ def setup_admin_handlers(app: Client):
 🎁 **Total Giveaways:** {total_giveaways:,}
 🔥 **Active Giveaways:** {active_giveaways:,}
 💬 **Total Chats:** {total_chats:,}
+🔔 **Force Sub Cache:** {fsub_cache['hit_rate']:.1%} hits ({fsub_cache['size']:,} entries)
+📇 **Force Sub Index:** {fsub_index['entries']:,} members, {fsub_index['hits']:,} hits ({fsub_index['tracked_channels']} channels tracked)
 
 📅 **Date:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 """
+            latency = force_subscribe_service.latency_breakdown()
+            if latency:
+                stats_text += "\n⏱ **Force Sub Latency:**\n"
+                for channel_id, channel_latency in latency.items():
+                    stats_text += (
+                        f"• `{channel_id}`: avg {channel_latency['avg_ms']:.0f}ms, "
+                        f"max {channel_latency['max_ms']:.0f}ms ({channel_latency['calls']:,} calls)\n"
+                    )
             await message.reply_text(stats_text)
             logger.info(f"Admin {message.from_user.id} checked stats")
             
@@ -58,7 +96,7 @@ def setup_admin_handlers(app: Client):
         """Set broadcast target (users, channels, or both)"""
         try:
             if len(message.command) < 2:
-                settings = db.settings.find_one({"_id": "main"})
+                settings = Settings.get_settings()
                 target = settings.get("broadcast_target", "both") if settings else "both"
                 await message.reply_text(
                     f"ℹ️ **Current Broadcast Target:** {target}\n\n"
@@ -75,11 +113,7 @@ def setup_admin_handlers(app: Client):
                 await message.reply_text("❌ Invalid target! Use: users, channels, or both")
                 return
             
-            db.settings.update_one(
-                {"_id": "main"},
-                {"$set": {"broadcast_target": target}},
-                upsert=True
-            )
+            Settings.update_setting("broadcast_target", target)
             
             await message.reply_text(f"✅ Broadcast target set to: **{target}**")
             
@@ -120,14 +154,14 @@ def setup_admin_handlers(app: Client):
             # Select broadcast target
             buttons = InlineKeyboardMarkup([
                 [
-                    InlineKeyboardButton("👤 Users Only", callback_data="broadcast_select_users"),
-                    InlineKeyboardButton("📺 Channels Only", callback_data="broadcast_select_channels")
+                    InlineKeyboardButton("👤 Users Only", callback_data=pack(BROADCAST_SELECT, "users")),
+                    InlineKeyboardButton("📺 Channels Only", callback_data=pack(BROADCAST_SELECT, "channels"))
                 ],
                 [
-                    InlineKeyboardButton("👥 Both", callback_data="broadcast_select_both")
+                    InlineKeyboardButton("👥 Both", callback_data=pack(BROADCAST_SELECT, "both"))
                 ],
                 [
-                    InlineKeyboardButton("❌ Cancel", callback_data="broadcast_cancel")
+                    InlineKeyboardButton("❌ Cancel", callback_data=pack(BROADCAST_CANCEL))
                 ]
             ])
             
@@ -138,62 +172,46 @@ def setup_admin_handlers(app: Client):
             )
             
             # Store broadcast data temporarily
-            db.broadcasts.insert_one({
-                "admin_id": message.from_user.id,
-                "message_id": message_id,
-                "text": broadcast_text,
-                "status": "pending",
-                "target": None,
-                "created_at": datetime.now()
-            })
+            Broadcast.create_pending(message.from_user.id, message_id, broadcast_text)
             
         except Exception as e:
             logger.error(f"Error in broadcast: {e}")
             await message.reply_text("❌ Error preparing broadcast")
     
-    @app.on_callback_query(filters.regex("^broadcast_select_"))
-    async def handle_broadcast_target_selection(client, callback_query):
+    @router.route(BROADCAST_SELECT)
+    async def handle_broadcast_target_selection(client, callback_query, target):
         """Handle broadcast target selection"""
         try:
             if not is_admin(callback_query.from_user.id):
                 await callback_query.answer("❌ You are not authorized!", show_alert=True)
                 return
             
-            # Get the target from callback data
-            target = callback_query.data.replace("broadcast_select_", "")
-            
             # Find the pending broadcast
-            broadcast = db.broadcasts.find_one({
-                "admin_id": callback_query.from_user.id,
-                "status": "pending"
-            })
+            broadcast = Broadcast.get_pending(callback_query.from_user.id)
             
             if not broadcast:
                 await callback_query.answer("❌ No pending broadcast found!", show_alert=True)
                 return
             
             # Update broadcast with target
-            db.broadcasts.update_one(
-                {"_id": broadcast["_id"]},
-                {"$set": {"target": target}}
-            )
+            Broadcast.set_target(broadcast["_id"], target)
             
             # Get counts for display
             if target == "users":
-                count = db.users.count_documents({})
+                count = User.count_users()
                 target_text = "👤 Users"
             elif target == "channels":
-                count = db.chats.count_documents({})
+                count = Chat.count_chats()
                 target_text = "📺 Channels"
             else:  # both
-                count = db.users.count_documents({}) + db.chats.count_documents({})
+                count = User.count_users() + Chat.count_chats()
                 target_text = "👥 Users + Channels"
             
             # Show confirmation with selected target
             buttons = InlineKeyboardMarkup([
                 [
-                    InlineKeyboardButton("✅ Confirm", callback_data="broadcast_confirm"),
-                    InlineKeyboardButton("❌ Cancel", callback_data="broadcast_cancel")
+                    InlineKeyboardButton("✅ Confirm", callback_data=pack(BROADCAST_CONFIRM)),
+                    InlineKeyboardButton("❌ Cancel", callback_data=pack(BROADCAST_CANCEL))
                 ]
             ])
             
@@ -233,9 +251,8 @@ def setup_admin_handlers(app: Client):
                     chat = await client.get_chat(int(channel_input))
                 
                 # Check if bot is admin in the channel
-                bot = await client.get_me()
                 try:
-                    bot_member = await client.get_chat_member(chat.id, bot.id)
+                    bot_member = await client.get_chat_member(chat.id, client.me.id)
                     logger.info(f"Bot status in channel {chat.id}: {bot_member.status}")
                     
                     if bot_member.status not in [ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER]:
@@ -257,10 +274,7 @@ def setup_admin_handlers(app: Client):
                     return
                 
                 # Add channel to database
-                settings = db.settings.find_one({"_id": "main"})
-                if settings is None:
-                    db.settings.insert_one({"_id": "main", "force_channels": []})
-                    settings = db.settings.find_one({"_id": "main"})
+                settings = Settings.get_settings()
                 
                 force_channels = settings.get("force_channels", [])
                 
@@ -285,11 +299,8 @@ def setup_admin_handlers(app: Client):
                     "title": chat.title
                 }
                 force_channels.append(channel_data)
-                db.settings.update_one(
-                    {"_id": "main"},
-                    {"$set": {"force_channels": force_channels}},
-                    upsert=True
-                )
+                Settings.update_setting("force_channels", force_channels)
+                get_force_subscribe_service(client).set_force_channels(force_channels)
                 
                 await message.reply_text(
                     f"✅ Channel **{chat.title}** added successfully!\n"
@@ -317,7 +328,7 @@ def setup_admin_handlers(app: Client):
     async def remove_channel_command(client, message: Message):
         """Remove force subscribe channel"""
         try:
-            settings = db.settings.find_one({"_id": "main"})
+            settings = Settings.get_settings()
             force_channels = settings.get("force_channels", []) if settings else []
             
             if not force_channels:
@@ -335,7 +346,7 @@ def setup_admin_handlers(app: Client):
                             channel_list += f"{idx}. {channel_title} (`{channel_id}`)\n"
                         else:
                             # Old format (integer)
-                            chat = await client.get_chat(channel)
+                            chat = await get_chat_cached(client, channel)
                             channel_list += f"{idx}. {chat.title} (`{channel}`)\n"
                     except:
                         channel_id = channel.get("id") if isinstance(channel, dict) else channel
@@ -369,10 +380,8 @@ def setup_admin_handlers(app: Client):
                 await message.reply_text("❌ Channel not in the list!")
                 return
             
-            db.settings.update_one(
-                {"_id": "main"},
-                {"$set": {"force_channels": updated_channels}}
-            )
+            Settings.update_setting("force_channels", updated_channels)
+            get_force_subscribe_service(client).set_force_channels(updated_channels)
             
             await message.reply_text(f"✅ Channel removed successfully!")
             
@@ -393,7 +402,7 @@ def setup_admin_handlers(app: Client):
         """Enable/disable force subscribe"""
         try:
             if len(message.command) < 2:
-                settings = db.settings.find_one({"_id": "main"})
+                settings = Settings.get_settings()
                 status = "Enabled" if settings.get("force_subscribe", False) else "Disabled"
                 await message.reply_text(
                     f"ℹ️ **Force Subscribe:** {status}\n\n"
@@ -411,10 +420,8 @@ def setup_admin_handlers(app: Client):
             
             enable = action in ["on", "enable"]
             
-            db.settings.update_one(
-                {"_id": "main"},
-                {"$set": {"force_subscribe": enable}}
-            )
+            Settings.update_setting("force_subscribe", enable)
+            get_force_subscribe_service(client).set_force_subscribe(enable)
             
             status = "Enabled" if enable else "Disabled"
             await message.reply_text(f"✅ Force Subscribe {status} successfully!")
@@ -448,18 +455,16 @@ def setup_admin_handlers(app: Client):
             else:
                 new_admin_id = int(message.command[1])
             
-            settings = db.settings.find_one({"_id": "main"})
-            admins = settings.get("admins", Config.ADMINS)
+            settings = Settings.get_settings()
+            admins = list(settings.get("admins", Config.ADMINS))
             
             if new_admin_id in admins:
                 await message.reply_text("ℹ️ User is already an admin!")
                 return
             
             admins.append(new_admin_id)
-            db.settings.update_one(
-                {"_id": "main"},
-                {"$set": {"admins": admins}}
-            )
+            Settings.update_setting("admins", admins)
+            admin_ids.invalidate("admins")
             
             await message.reply_text(f"✅ Admin added successfully!\nUser ID: `{new_admin_id}`")
             
@@ -482,7 +487,7 @@ def setup_admin_handlers(app: Client):
         """Remove admin"""
         try:
             if len(message.command) < 2:
-                settings = db.settings.find_one({"_id": "main"})
+                settings = Settings.get_settings()
                 admins = settings.get("admins", Config.ADMINS)
                 
                 admin_list = "👨‍💼 **Current Admins:**\n\n"
@@ -495,8 +500,8 @@ def setup_admin_handlers(app: Client):
             
             admin_to_remove = int(message.command[1])
             
-            settings = db.settings.find_one({"_id": "main"})
-            admins = settings.get("admins", Config.ADMINS)
+            settings = Settings.get_settings()
+            admins = list(settings.get("admins", Config.ADMINS))
             
             if admin_to_remove not in admins:
                 await message.reply_text("❌ User is not an admin!")
@@ -507,10 +512,8 @@ def setup_admin_handlers(app: Client):
                 return
             
             admins.remove(admin_to_remove)
-            db.settings.update_one(
-                {"_id": "main"},
-                {"$set": {"admins": admins}}
-            )
+            Settings.update_setting("admins", admins)
+            admin_ids.invalidate("admins")
             
             await message.reply_text(f"✅ Admin removed successfully!")
             
@@ -532,7 +535,7 @@ def setup_admin_handlers(app: Client):
     async def settings_command(client, message: Message):
         """Show bot settings"""
         try:
-            settings = db.settings.find_one({"_id": "main"})
+            settings = Settings.get_settings()
             force_subscribe = settings.get("force_subscribe", False) if settings else False
             force_channels = settings.get("force_channels", []) if settings else []
             admins = settings.get("admins", Config.ADMINS) if settings else Config.ADMINS
@@ -553,6 +556,7 @@ def setup_admin_handlers(app: Client):
 • `/addadmin <id>` - Add admin
 • `/removeadmin <id>` - Remove admin
 • `/setbroadcast users/channels/both` - Set broadcast target
+• `/profile [seconds] [cpu|sample] [mem]` - Profile the running bot
 """
             await message.reply_text(settings_text)
             
@@ -564,14 +568,14 @@ def setup_admin_handlers(app: Client):
     async def admins_list_command(client, message: Message):
         """Show list of admins"""
         try:
-            settings = db.settings.find_one({"_id": "main"})
+            settings = Settings.get_settings()
             admins = settings.get("admins", Config.ADMINS)
             
             admin_text = "👨‍💼 **Bot Admins:**\n\n"
             
             for idx, admin_id in enumerate(admins, 1):
                 try:
-                    user = await client.get_users(admin_id)
+                    user = await get_user_cached(client, admin_id)
                     name = user.first_name
                     username = f"@{user.username}" if user.username else "No username"
                     admin_text += f"{idx}. {name} ({username})\n   ID: `{admin_id}`\n\n"
@@ -584,7 +588,42 @@ def setup_admin_handlers(app: Client):
             logger.error(f"Error in admins list: {e}")
             await message.reply_text("❌ Error getting admins list")
     
-    @app.on_callback_query(filters.regex("^broadcast_"))
+    @app.on_message(filters.command("profile") & admin_only & filters.private)
+    async def profile_command(client, message: Message):
+        """Profile the running bot: /profile [seconds] [cpu|sample] [mem]"""
+        try:
+            args = message.command[1:]
+            seconds = int(args[0]) if args and args[0].isdigit() else 10
+            mode = next((arg for arg in args if arg in PROFILE_MODES), "cpu")
+            memory = "mem" in args
+            
+            await message.reply_text(
+                f"⏱ Profiling for {min(seconds, Config.PROFILE_MAX_SECONDS)}s ({mode}{', memory' if memory else ''})..."
+            )
+            # The profile window runs in the background so it does not hold a handler worker
+            background.spawn(send_profile(message, seconds, mode, memory))
+            
+        except Exception as e:
+            logger.error(f"Error in profile: {e}")
+            await message.reply_text("❌ Error running profile")
+    
+    async def send_profile(message, seconds, mode, memory):
+        """Run a profile and reply with the report"""
+        try:
+            report = await run_profile(seconds, mode, memory)
+            
+            document = io.BytesIO(report.encode())
+            document.name = f"profile_{mode}.txt"
+            await message.reply_document(document, caption=f"📊 {mode} profile")
+            
+        except RuntimeError as e:
+            await message.reply_text(f"❌ {e}")
+        except Exception as e:
+            logger.error(f"Error in profile: {e}")
+            await message.reply_text("❌ Error running profile")
+    
+    @router.route(BROADCAST_CONFIRM)
+    @router.route(BROADCAST_CANCEL)
     async def handle_broadcast_callback(client, callback_query):
         """Handle broadcast confirmation callbacks"""
         try:
@@ -592,31 +631,23 @@ def setup_admin_handlers(app: Client):
                 await callback_query.answer("❌ You are not authorized!", show_alert=True)
                 return
             
-            action = callback_query.data
+            action, _ = unpack(callback_query.data)
             
-            if action == "broadcast_cancel":
+            if action == BROADCAST_CANCEL:
                 # Delete pending broadcast
-                db.broadcasts.delete_many({
-                    "admin_id": callback_query.from_user.id,
-                    "status": "pending"
-                })
+                Broadcast.cancel_pending(callback_query.from_user.id)
                 await callback_query.message.edit_text("❌ Broadcast cancelled!")
                 logger.info(f"Admin {callback_query.from_user.id} cancelled broadcast")
                 return
             
-            if action == "broadcast_confirm":
+            if action == BROADCAST_CONFIRM:
                 # Get pending broadcast
-                broadcast = db.broadcasts.find_one({
-                    "admin_id": callback_query.from_user.id,
-                    "status": "pending"
-                })
+                broadcast = Broadcast.get_pending(callback_query.from_user.id)
                 
                 if not broadcast:
                     await callback_query.answer("❌ No pending broadcast found!", show_alert=True)
                     return
                 
-                await callback_query.message.edit_text("📢 Broadcasting... Please wait!")
-                
                 # Use the selected target from broadcast document
                 broadcast_target = broadcast.get("target")
                 if not broadcast_target:
@@ -625,74 +656,79 @@ def setup_admin_handlers(app: Client):
                 if broadcast_target not in ["users", "channels", "both"]:
                     broadcast_target = "both"
                 
-                # Get users to broadcast to
-                if broadcast_target == "users":
-                    recipients = db.users.find({})
-                elif broadcast_target == "channels":
-                    recipients = db.chats.find({})
-                else:  # both
-                    users = list(db.users.find({}))
-                    chats = list(db.chats.find({}))
-                    recipients = users + chats
-                
-                if broadcast_target == "users":
-                    total_users = db.users.count_documents({})
-                elif broadcast_target == "channels":
-                    total_users = db.chats.count_documents({})
-                else:  # both
-                    total_users = db.users.count_documents({}) + db.chats.count_documents({})
-                success = 0
-                failed = 0
-                blocked = 0
+                # Only one confirm tap may start the delivery; a repeated tap finds it already claimed
+                if not Broadcast.claim_pending(broadcast["_id"]):
+                    await callback_query.answer("ℹ️ This broadcast is already being sent!", show_alert=True)
+                    return
                 
-                # Broadcast to all recipients
-                for recipient in recipients:
-                    try:
-                        if "user_id" in recipient:
-                            recipient_id = recipient.get("user_id")
-                        else:
-                            recipient_id = recipient.get("chat_id")
-                        
-                        if broadcast.get("message_id"):
-                            # Forward the message
-                            await client.copy_message(
-                                chat_id=recipient_id,
-                                from_chat_id=callback_query.from_user.id,
-                                message_id=broadcast["message_id"]
-                            )
-                        else:
-                            # Send text message
-                            await client.send_message(
-                                chat_id=recipient_id,
-                                text=broadcast["text"]
-                            )
-                        
-                        success += 1
-                        
-                    except Exception as e:
-                        error_str = str(e).lower()
-                        if "blocked" in error_str or "user is deactivated" in error_str:
-                            blocked += 1
-                        else:
-                            failed += 1
-                        continue
+                await callback_query.answer("📢 Broadcast started!")
+                await callback_query.message.edit_text("📢 Broadcasting... Please wait!")
                 
-                # Update broadcast status
-                db.broadcasts.update_one(
-                    {"_id": broadcast["_id"]},
-                    {
-                        "$set": {
-                            "status": "completed",
-                            "success": success,
-                            "failed": failed,
-                            "blocked": blocked,
-                            "target": broadcast_target,
-                            "completed_at": datetime.now()
-                        }
-                    }
-                )
+                # The send loop runs in the background so it does not hold a handler worker for its whole length
+                background.spawn(deliver_broadcast(client, callback_query, broadcast, broadcast_target))
+        except Exception as e:
+            logger.error(f"Error in broadcast callback: {e}")
+            await callback_query.message.edit_text(f"❌ Error during broadcast: {str(e)}")
+    
+    async def deliver_broadcast(client, callback_query, broadcast, broadcast_target):
+        """Send a confirmed broadcast to its recipients and report the result"""
+        try:
+            # Get users to broadcast to
+            if broadcast_target == "users":
+                recipients = User.get_all_users()
+            elif broadcast_target == "channels":
+                recipients = Chat.get_all_chats()
+            else:  # both
+                users = User.get_all_users()
+                chats = Chat.get_all_chats()
+                recipients = users + chats
+            
+            if broadcast_target == "users":
+                total_users = User.count_users()
+            elif broadcast_target == "channels":
+                total_users = Chat.count_chats()
+            else:  # both
+                total_users = User.count_users() + Chat.count_chats()
+            success = 0
+            failed = 0
+            blocked = 0
+            
+            # Broadcast to all recipients
+            for recipient in recipients:
+                try:
+                    if "user_id" in recipient:
+                        recipient_id = recipient.get("user_id")
+                    else:
+                        recipient_id = recipient.get("chat_id")
+                    
+                    if broadcast.get("message_id"):
+                        # Forward the message
+                        await client.copy_message(
+                            chat_id=recipient_id,
+                            from_chat_id=callback_query.from_user.id,
+                            message_id=broadcast["message_id"]
+                        )
+                    else:
+                        # Send text message
+                        await client.send_message(
+                            chat_id=recipient_id,
+                            text=broadcast["text"]
+                        )
+                    
+                    success += 1
                 
-                result_text = f"""✅ **Broadcast Completed!**
+                except Exception as e:
+                    error_str = str(e).lower()
+                    if "blocked" in error_str or "user is deactivated" in error_str:
+                        blocked += 1
+                    else:
+                        failed += 1
+                    continue
+            
+            # Update broadcast status
+            Broadcast.complete(broadcast["_id"], broadcast_target, success, failed, blocked)
+            
+            result_text = f"""✅ **Broadcast Completed!**
 
 📊 **Results:**
 ✅ Success: {success:,}
@@ -703,21 +739,21 @@ def setup_admin_handlers(app: Client):
 
 📅 **Completed:** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 """
-                await callback_query.message.edit_text(result_text)
-                
-                # Send log
-                await send_broadcast_log(
-                    client,
-                    callback_query.from_user.id,
-                    total_users,
-                    success,
-                    failed,
-                    blocked
-                )
-                logger.info(f"Admin {callback_query.from_user.id} completed broadcast to {broadcast_target}: {success}/{total_users}")
-                
+            await callback_query.message.edit_text(result_text)
+            
+            # Send log
+            await send_broadcast_log(
+                client,
+                callback_query.from_user.id,
+                total_users,
+                success,
+                failed,
+                blocked
+            )
+            logger.info(f"Admin {callback_query.from_user.id} completed broadcast to {broadcast_target}: {success}/{total_users}")
+            
         except Exception as e:
-            logger.error(f"Error in broadcast callback: {e}")
+            logger.error(f"Error in broadcast delivery: {e}")
             await callback_query.message.edit_text(f"❌ Error during broadcast: {str(e)}")
     
     logger.info("Admin handlers setup complete")
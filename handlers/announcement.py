@@ -0,0 +1,118 @@
+import asyncio
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from config import Config
+from database.models import Giveaway, Announcement
+from utils.inline import join_giveaway_keyboard
+from utils.helpers import format_time_remaining
+from utils.logger import logger
+from utils.tasks import create_detached_task
+
+def render_announcement(giveaway, participants_count=0):
+    """Render the giveaway announcement text"""
+    announcement = f"🎉 **NEW GIVEAWAY!**\n\n"
+    announcement += f"🎁 **Prize:** {giveaway['prize']}\n"
+    announcement += f"📝 **Description:** {giveaway['description']}\n"
+    announcement += f"👥 **Participants:** {participants_count}\n"
+    announcement += f"⏰ **Ends:** {format_time_remaining(giveaway['end_time'])}\n"
+    announcement += f"🏆 **Winners:** {giveaway['winners_count']}\n\n"
+    announcement += "Click below to join!"
+    return announcement
+
+class AnnouncementUpdater:
+    """Keeps posted giveaway announcements up to date by editing them in place"""
+    
+    def __init__(self, app: Client, interval=None, edits_per_second=None):
+        self.app = app
+        self.interval = interval or Config.ANNOUNCE_EDIT_INTERVAL
+        self.edit_delay = 1 / (edits_per_second or Config.ANNOUNCE_EDIT_RATE)
+        self.task = None
+        # Held by each edit pass and by finalize, so a live edit never lands after the result
+        self.lock = asyncio.Lock()
+        self.dirty = True
+        self.participants_count = 0
+        # giveaway_id -> text of the last edit pass
+        self.last_text = {}
+        self.finalized = set()
+    
+    def start(self):
+        """Start the background edit loop if it is not running"""
+        if self.task is None or self.task.done():
+            self.task = create_detached_task(self._run())
+    
+    def mark_dirty(self):
+        """Note that the participant count changed; picked up by the next edit pass"""
+        self.dirty = True
+        self.start()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                giveaway = Giveaway.get_active_giveaway()
+                if not giveaway:
+                    logger.info("[ANNOUNCE_EDIT] No active giveaway, stopping edit loop")
+                    return
+                async with self.lock:
+                    await self._edit_pass(giveaway)
+            except Exception as e:
+                logger.error("[ANNOUNCE_EDIT] Edit pass failed: %s", e)
+    
+    async def _edit_pass(self, giveaway):
+        giveaway_id = giveaway["giveaway_id"]
+        if giveaway_id in self.finalized:
+            return
+        
+        # Debounce: only re-read the count when a join happened since the last pass
+        if self.dirty:
+            self.dirty = False
+            self.participants_count = Giveaway.get_participants_count(giveaway_id)
+        
+        # Compared on the rendered text, so a pass runs when the count or the "Ends" time changed
+        text = render_announcement(giveaway, self.participants_count)
+        if self.last_text.get(giveaway_id) == text:
+            return
+        self.last_text[giveaway_id] = text
+        
+        await self._edit_all(giveaway_id, text, join_giveaway_keyboard())
+    
+    async def _edit(self, announcement, text, reply_markup):
+        await self.app.edit_message_text(
+            announcement["chat_id"],
+            announcement["message_id"],
+            text,
+            reply_markup=reply_markup,
+            disable_web_page_preview=True
+        )
+    
+    async def _edit_all(self, giveaway_id, text, reply_markup=None):
+        """Edit every recorded announcement, paced to the edit budget"""
+        edited = []
+        failed = []
+        for announcement in Announcement.get_announcements(giveaway_id):
+            try:
+                try:
+                    await self._edit(announcement, text, reply_markup)
+                except FloodWait as e:
+                    logger.warning("[ANNOUNCE_EDIT] FloodWait %ss while editing in %s", e.value, announcement['chat_id'])
+                    await asyncio.sleep(e.value)
+                    await self._edit(announcement, text, reply_markup)
+                edited.append(announcement["chat_id"])
+            except Exception as e:
+                logger.limited("announcement_edit_failed", "[ANNOUNCE_EDIT] Could not edit announcement in %s: %s", announcement['chat_id'], e)
+                failed.append(announcement["chat_id"])
+            await asyncio.sleep(self.edit_delay)
+        return edited, failed
+    
+    async def finalize(self, giveaway_id, result_text):
+        """Edit the announcements into the result; returns (edited, failed) chat ids"""
+        self.finalized.add(giveaway_id)
+        self.last_text.pop(giveaway_id, None)
+        # Stop a live edit pass that is in progress; a later one skips this giveaway
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        
+        async with self.lock:
+            edited, failed = await self._edit_all(giveaway_id, result_text)
+        logger.info("[ANNOUNCE_EDIT] Edited %s announcements of %s into the result, %s failed", len(edited), giveaway_id, len(failed))
+        return edited, failed
@@ -0,0 +1,119 @@
+import time
+from collections import OrderedDict
+from pyrogram import Client, filters
+from pyrogram.types import Message, CallbackQuery
+from config import Config
+from handlers.admin import is_admin
+from utils.callbacks import unpack, JOIN_GIVEAWAY, CHECK_SUBSCRIPTION
+from utils.dispatch import command_name
+from utils.logger import logger
+from utils.metrics import registry
+
+# Handler group that runs before every other handler
+ANTIFLOOD_GROUP = -100
+
+# Commands and callbacks per rate class; everything else is "default"
+RATE_CLASSES = {
+    "join": {"commands": ["join"], "callbacks": [JOIN_GIVEAWAY, CHECK_SUBSCRIPTION]},
+    # Commands that make extra Telegram API calls or heavier queries
+    "heavy": {"commands": ["winners", "refer"], "callbacks": []}
+}
+
+flood_limited = registry.counter("bot_flood_limited_total", "Updates dropped by the anti-flood limiter", ["rate_class"])
+flood_tracked = registry.gauge("bot_flood_tracked_buckets", "Per-user rate buckets currently held in memory")
+
+def parse_rate(rule):
+    """'5/10' -> (capacity 5, refill 0.5 tokens per second)"""
+    capacity, period = (float(part) for part in rule.split("/"))
+    return capacity, capacity / period
+
+class FloodLimiter:
+    """
+    Per-user token buckets, one per rate class.
+    
+    A bucket is stored as [tokens, updated_at, warned] and is evicted once it
+    has had time to refill completely, since a full bucket carries no
+    information; idle users cost nothing.
+    """
+    
+    def __init__(self, rates):
+        # rate class -> (capacity, tokens per second)
+        self.rates = rates
+        # (user_id, rate class) -> [tokens, updated_at, warned], least recently touched first
+        self.buckets = OrderedDict()
+    
+    def allow(self, user_id, rate_class):
+        """Take a token; returns (allowed, warn) where warn is True once per throttled streak"""
+        capacity, refill = self.rates[rate_class]
+        now = time.monotonic()
+        self._evict_idle(now)
+        
+        key = (user_id, rate_class)
+        bucket = self.buckets.pop(key, None)
+        if bucket is None:
+            bucket = [capacity, now, False]
+        else:
+            bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill)
+            bucket[1] = now
+        self.buckets[key] = bucket
+        flood_tracked.set(len(self.buckets))
+        
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+            return True, False
+        
+        warn = not bucket[2]
+        bucket[2] = True
+        return False, warn
+    
+    def _evict_idle(self, now):
+        # Touch order is time order, so stop at the first bucket that may still be below capacity
+        while self.buckets:
+            (_, rate_class), bucket = next(iter(self.buckets.items()))
+            capacity, refill = self.rates[rate_class]
+            if now - bucket[1] < capacity / refill:
+                break
+            self.buckets.popitem(last=False)
+
+def _rate_class(command=None, callback_action=None):
+    for name, members in RATE_CLASSES.items():
+        if command in members["commands"] or callback_action in members["callbacks"]:
+            return name
+    return "default"
+
+def setup_antiflood_handlers(app: Client):
+    limiter = FloodLimiter({
+        "join": parse_rate(Config.FLOOD_JOIN_RATE),
+        "heavy": parse_rate(Config.FLOOD_HEAVY_RATE),
+        "default": parse_rate(Config.FLOOD_DEFAULT_RATE)
+    })
+    
+    def is_limited(user, rate_class):
+        if user is None or is_admin(user.id):
+            return False, False
+        allowed, warn = limiter.allow(user.id, rate_class)
+        if allowed:
+            return False, False
+        flood_limited.inc(rate_class=rate_class)
+        # Keyed by rate class, not user, so rotating accounts cannot grow the logger's rate-limit table
+        logger.limited(("flood", rate_class), "[FLOOD] Throttling user %s (%s)", user.id, rate_class)
+        return True, warn and Config.FLOOD_REPLY
+    
+    @app.on_message(filters.private, group=ANTIFLOOD_GROUP)
+    async def antiflood_message(client: Client, message: Message):
+        limited, warn = is_limited(message.from_user, _rate_class(command=command_name(message.text)))
+        if not limited:
+            return
+        if warn:
+            await message.reply_text("⏳ You're sending commands too fast. Please wait a moment.")
+        message.stop_propagation()
+    
+    @app.on_callback_query(group=ANTIFLOOD_GROUP)
+    async def antiflood_callback(client: Client, callback_query: CallbackQuery):
+        limited, warn = is_limited(callback_query.from_user, _rate_class(callback_action=unpack(callback_query.data or "")[0]))
+        if not limited:
+            return
+        if warn:
+            await callback_query.answer("⏳ Too many taps, please wait a moment.")
+        callback_query.stop_propagation()
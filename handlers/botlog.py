@@ -1,12 +1,90 @@
 #(©)HighTierBots - Bot Notifications Handler
 
+import asyncio
 from pyrogram import Client 
 from pyrogram.errors import FloodWait
 from config import Config
 from utils.logger import logger
+from utils.tasks import create_detached_task
 from datetime import datetime
 
 
+class LogDigest:
+    """
+    Aggregates high-volume log events and posts one summary per interval
+    
+    Each event keeps a count and a capped sample of ids. Admin actions do
+    not go through the digest and are still sent immediately.
+    """
+    
+    def __init__(self, interval: int, sample_size: int):
+        self.interval = interval
+        self.sample_size = sample_size
+        self.events = {}
+        self.task = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+    
+    def add(self, client: Client, event: str, item) -> None:
+        """Count an event and keep item as a sample if there is room"""
+        entry = self.events.setdefault(event, {"count": 0, "sample": []})
+        entry["count"] += 1
+        if len(entry["sample"]) < self.sample_size:
+            entry["sample"].append(item)
+        
+        if self.task is None or self.task.done():
+            self.task = create_detached_task(self._run(client))
+    
+    async def _run(self, client: Client) -> None:
+        while self.events:
+            await asyncio.sleep(self.interval)
+            await self.flush(client)
+    
+    async def flush(self, client: Client) -> bool:
+        """Send the aggregated events as one message to Config.LOG_CHANNEL"""
+        if not self.events:
+            return True
+        
+        events, self.events = self.events, {}
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        notification_text = f"📊 <b>Activity Digest</b> (last {self.interval}s)\n\n"
+        for event, entry in events.items():
+            sample = ", ".join(f"<code>{item}</code>" for item in entry["sample"])
+            more = entry["count"] - len(entry["sample"])
+            notification_text += f"{event}: <code>{entry['count']}</code>\n"
+            notification_text += f"   {sample}{f' (+{more} more)' if more else ''}\n\n"
+        notification_text += f"🕒 <b>Time:</b> <code>{timestamp}</code>"
+        
+        try:
+            await client.send_message(Config.LOG_CHANNEL, notification_text)
+            logger.info(f"Log digest sent with {sum(entry['count'] for entry in events.values())} events")
+            return True
+        except FloodWait as e:
+            logger.warning(f"FloodWait error while sending log digest: {e.value}s")
+            self._restore(events)
+            return False
+        except Exception as e:
+            logger.error(f"Error sending log digest: {e}")
+            self._restore(events)
+            return False
+    
+    def _restore(self, events: dict) -> None:
+        """Merge unsent events back in ahead of newer ones, for the next flush"""
+        for event, entry in events.items():
+            newer = self.events.get(event)
+            if newer:
+                entry["count"] += newer["count"]
+                entry["sample"] = (entry["sample"] + newer["sample"])[:self.sample_size]
+        self.events = {**events, **{event: entry for event, entry in self.events.items() if event not in events}}
+
+
+# Shared digest for start/join logs
+log_digest = LogDigest(Config.LOG_DIGEST_INTERVAL, Config.LOG_DIGEST_SAMPLE)
+
+
 async def send_bot_start_log(client: Client, user) -> bool:
     """
     Send bot start notification to Config.LOG_CHANNEL
@@ -25,6 +103,11 @@ async def send_bot_start_log(client: Client, user) -> bool:
         
         username = f"@{user.username}" if user.username else "Not Available"
         user_id = user.id if user.id else "Unknown"
+        
+        if log_digest.enabled:
+            log_digest.add(client, "🚀 <b>New Users</b>", user_id)
+            return True
+        
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         notification_text = (
@@ -240,6 +323,10 @@ async def send_user_joined_giveaway_log(client: Client, user_id: int, username:
         if not Config.LOG_CHANNEL or Config.LOG_CHANNEL == 0:
             return False
         
+        if log_digest.enabled:
+            log_digest.add(client, f"🎉 <b>Joins</b> <code>{giveaway_id}</code>", user_id)
+            return True
+        
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         username = f"@{username}" if username else "Not Available"
         
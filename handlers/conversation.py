@@ -0,0 +1,65 @@
+from datetime import datetime
+from pyrogram import Client, filters
+from pyrogram.types import Message
+from config import Config
+from database.models import Conversation
+from utils.cache import TTLCache
+
+# Marks a user that is not in the cache at all (None means "known to have no flow")
+_MISSING = object()
+
+def get_conversation_engine(app: Client):
+    """Get the ConversationEngine shared by all handlers of a client"""
+    if not hasattr(app, "conversations"):
+        app.conversations = ConversationEngine()
+    return app.conversations
+
+class ConversationEngine:
+    """
+    Multi-step flow state per user, stored in MongoDB with a TTL so flows
+    survive restarts, with an in-memory LRU of recently seen users in front.
+    
+    Cached entries, open flow or none, are trusted for CONVERSATION_CACHE_TTL
+    seconds only, so a flow saved or ended on another replica is picked up
+    shortly after. Handlers put an admin filter ahead of in_flow, so ordinary
+    users never reach the lookup.
+    """
+    
+    def __init__(self):
+        # user_id -> (flow, state) or None
+        self.flows = TTLCache(Config.CONVERSATION_CACHE_SIZE)
+    
+    def get(self, user_id):
+        """Get (flow, state) of a user's open flow, or None"""
+        entry = self.flows.get(user_id, _MISSING)
+        if entry is not _MISSING:
+            return entry
+        
+        document = Conversation.get_state(user_id)
+        if document is None:
+            self.flows.set(user_id, None, Config.CONVERSATION_CACHE_TTL)
+            return None
+        
+        entry = (document["flow"], document["state"])
+        remaining = (document["expires_at"] - datetime.utcnow()).total_seconds()
+        self.flows.set(user_id, entry, max(min(remaining, Config.CONVERSATION_CACHE_TTL), 1))
+        return entry
+    
+    def save(self, user_id, flow, state):
+        """Open a flow or store its updated state; the TTL restarts on every save"""
+        Conversation.save_state(user_id, flow, state, Config.CONVERSATION_TTL)
+        self.flows.set(user_id, (flow, state), Config.CONVERSATION_CACHE_TTL)
+    
+    def end(self, user_id):
+        """Close a user's flow"""
+        Conversation.clear_state(user_id)
+        self.flows.set(user_id, None, Config.CONVERSATION_CACHE_TTL)
+    
+    def in_flow(self, flow):
+        """Filter matching messages from users with an open flow of this name"""
+        def check(_, __, message: Message):
+            if not message.from_user:
+                return False
+            entry = self.get(message.from_user.id)
+            return entry is not None and entry[0] == flow
+        return filters.create(check)
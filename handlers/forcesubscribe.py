@@ -1,27 +1,89 @@
+import asyncio
+import time
 from pyrogram import Client
-from pyrogram.types import Message
+from pyrogram.types import Message, ChatMemberUpdated
+from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import UserNotParticipant, ChatAdminRequired
+from config import Config
 from database.models import Settings
 from utils.inline import force_subscribe_keyboard
+from utils.cache import TTLCache
+from utils.peers import get_chat_cached
 from utils.logger import logger
 
+def get_force_subscribe_service(app: Client):
+    """Get the ForceSubscribeService shared by all handlers of a client"""
+    if not hasattr(app, "force_subscribe_service"):
+        app.force_subscribe_service = ForceSubscribeService(app)
+    return app.force_subscribe_service
+
+def setup_force_subscribe_handlers(app: Client):
+    """Track joins/leaves in force channels so checks can be answered locally"""
+    force_subscribe_service = get_force_subscribe_service(app)
+    
+    @app.on_chat_member_updated()
+    async def track_force_channel_member(client: Client, update: ChatMemberUpdated):
+        force_subscribe_service.record_member_update(update)
+
 class ForceSubscribeService:
     def __init__(self, app: Client):
         self.app = app
+        # (channel_id, user_id) -> is_member
+        self.membership_cache = TTLCache(Config.FSUB_CACHE_SIZE)
+        # channel_id -> {"calls", "total", "max", "last"} latency of get_chat_member in seconds
+        self.channel_latency = {}
+        # (channel_id, user_id) -> is_member, kept current by chat member updates
+        self.membership_index = TTLCache(Config.FSUB_CACHE_SIZE)
+        # Channels we have received member updates from; only their index is trusted
+        self.tracked_channels = set()
+        # Force subscribe switch and channels from settings, re-read every FSUB_SETTINGS_TTL seconds
+        self.force_subscribe = False
+        self.force_channels = []
+        self.force_channel_ids = set()
+        self.settings_expire_at = 0.0
+        self.index_hits = 0
+    
+    def set_force_channels(self, force_channels: list):
+        """Use these force channels; their member updates feed the index"""
+        self.force_channels = list(force_channels)
+        self.force_channel_ids = {
+            channel.get("id") if isinstance(channel, dict) else channel
+            for channel in force_channels
+        }
+    
+    def set_force_subscribe(self, enabled: bool):
+        """Turn the force subscribe check on or off"""
+        self.force_subscribe = enabled
     
-    async def check_user_subscribed(self, user_id: int) -> tuple[bool, list]:
-        """Check if user is subscribed to all force channels"""
+    def load_force_settings(self):
+        """Load the force subscribe switch and channels from settings, so member updates count before the first check"""
         settings = Settings.get_settings()
-        force_subscribe_enabled = settings.get("force_subscribe", False)
+        self.set_force_subscribe(settings.get("force_subscribe", False))
+        self.set_force_channels(settings.get("force_channels", []))
+        # Changes made on another replica are picked up after this
+        self.settings_expire_at = time.monotonic() + Config.FSUB_SETTINGS_TTL
+    
+    async def check_user_subscribed(self, user_id: int, recheck: bool = False, short_circuit: bool = False) -> tuple[bool, list]:
+        """Check if user is subscribed to all force channels
+        
+        Channels missing from the cache are checked concurrently. With
+        recheck=True cached "not a member" answers are ignored, so a user who
+        just joined the channels is not held back by the negative cache. With
+        short_circuit=True the check stops at the first channel the user is
+        missing, so not_subscribed may be incomplete.
+        """
+        if time.monotonic() >= self.settings_expire_at:
+            self.load_force_settings()
         
-        if not force_subscribe_enabled:
+        if not self.force_subscribe:
             return True, []
         
-        force_channels = Settings.get_force_channels()
+        force_channels = self.force_channels
         if not force_channels:
             return True, []
         
         not_subscribed = []
+        to_fetch = []
         
         for channel in force_channels:
             # Handle both old format (int) and new format (dict)
@@ -31,19 +93,113 @@ class ForceSubscribeService:
                 # Old format - just an integer
                 channel_id = channel
                 
-            try:
-                member = await self.app.get_chat_member(channel_id, user_id)
-                if member.status in ["left", "kicked"]:
-                    not_subscribed.append(channel)
-            except UserNotParticipant:
+            is_member = None
+            if channel_id in self.tracked_channels:
+                is_member = self.membership_index.get((channel_id, user_id))
+                if is_member is not None:
+                    self.index_hits += 1
+            if is_member is None:
+                is_member = self.membership_cache.get((channel_id, user_id))
+            if is_member is None or (recheck and not is_member):
+                to_fetch.append((channel, channel_id))
+            elif not is_member:
                 not_subscribed.append(channel)
-            except Exception as e:
-                logger.error(f"Error checking subscription for channel {channel_id}: {e}")
-                continue
+        
+        if to_fetch and not (short_circuit and not_subscribed):
+            pending = {
+                asyncio.create_task(self._timed_fetch(channel_id, user_id)): (channel, channel_id)
+                for channel, channel_id in to_fetch
+            }
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    channel, channel_id = pending.pop(task)
+                    try:
+                        if not task.result():
+                            not_subscribed.append(channel)
+                    except Exception as e:
+                        logger.error("Error checking subscription for channel %s: %s", channel_id, e)
+                
+                if short_circuit and not_subscribed:
+                    for task in pending:
+                        task.cancel()
+                    break
+            
+            # Keep the configured channel order for the join buttons
+            not_subscribed.sort(key=force_channels.index)
         
         is_subscribed = len(not_subscribed) == 0
         return is_subscribed, not_subscribed
     
+    async def _timed_fetch(self, channel_id: int, user_id: int) -> bool:
+        """Fetch membership with a timeout, recording the call latency"""
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(
+                self._fetch_membership(channel_id, user_id),
+                Config.FSUB_CHECK_TIMEOUT
+            )
+        finally:
+            elapsed = time.perf_counter() - started
+            latency = self.channel_latency.setdefault(channel_id, {"calls": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+            latency["calls"] += 1
+            latency["total"] += elapsed
+            latency["max"] = max(latency["max"], elapsed)
+            latency["last"] = elapsed
+    
+    def latency_breakdown(self) -> dict:
+        """Get average/max/last get_chat_member latency per channel in milliseconds"""
+        return {
+            channel_id: {
+                "calls": latency["calls"],
+                "avg_ms": latency["total"] / latency["calls"] * 1000,
+                "max_ms": latency["max"] * 1000,
+                "last_ms": latency["last"] * 1000
+            }
+            for channel_id, latency in self.channel_latency.items()
+            if latency["calls"]
+        }
+    
+    async def _fetch_membership(self, channel_id: int, user_id: int) -> bool:
+        """Ask Telegram whether user is in channel and cache the answer"""
+        try:
+            member = await self.app.get_chat_member(channel_id, user_id)
+            is_member = member.status not in [ChatMemberStatus.LEFT, ChatMemberStatus.BANNED]
+        except UserNotParticipant:
+            is_member = False
+        
+        ttl = Config.FSUB_CACHE_TTL if is_member else Config.FSUB_NEGATIVE_CACHE_TTL
+        self.membership_cache.set((channel_id, user_id), is_member, ttl)
+        # Seed the index so later updates and checks for this user stay local
+        self.membership_index.set((channel_id, user_id), is_member, Config.FSUB_INDEX_TTL)
+        return is_member
+    
+    def record_member_update(self, update: ChatMemberUpdated):
+        """Apply a chat member update from a force channel to the membership index"""
+        channel_id = update.chat.id
+        if channel_id not in self.force_channel_ids:
+            return
+        
+        member = update.new_chat_member or update.old_chat_member
+        if not member or not member.user:
+            return
+        
+        is_member = bool(update.new_chat_member) and update.new_chat_member.status not in [
+            ChatMemberStatus.LEFT,
+            ChatMemberStatus.BANNED
+        ]
+        self.membership_index.set((channel_id, member.user.id), is_member, Config.FSUB_INDEX_TTL)
+        self.membership_cache.invalidate((channel_id, member.user.id))
+        self.tracked_channels.add(channel_id)
+    
+    def index_stats(self) -> dict:
+        """Get membership index size and hit counters"""
+        return {
+            "tracked_channels": len(self.tracked_channels),
+            "entries": len(self.membership_index.entries),
+            "hits": self.index_hits
+        }
+    
     async def send_force_subscribe_message(self, message: Message, not_subscribed_channels: list):
         """Send force subscribe message with join buttons"""
         text = "⚠️ **You must join the following channels to participate in the giveaway:**\n\n"
@@ -55,7 +211,7 @@ class ForceSubscribeService:
     async def validate_channel(self, channel_id: int) -> tuple[bool, str, str]:
         """Validate if bot is admin in channel and get channel info"""
         try:
-            chat = await self.app.get_chat(channel_id)
+            chat = await get_chat_cached(self.app, channel_id)
             
             # Check if bot is admin
             member = await self.app.get_chat_member(channel_id, "me")
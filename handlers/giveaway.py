@@ -2,11 +2,28 @@ from pyrogram import Client, filters
 from pyrogram.types import Message, CallbackQuery
 from pyrogram import ContinuePropagation
 from datetime import datetime, timedelta
+from config import Config
 from database.models import Giveaway, Settings
-from utils.inline import join_giveaway_keyboard, force_subscribe_keyboard
-from utils.helpers import generate_giveaway_id, select_random_winners, format_time_remaining, get_user_mention
+from utils.inline import join_giveaway_keyboard
+from utils.callbacks import get_callback_router, END_AUTO_ANNOUNCE, END_MANUAL_ANNOUNCE, ANNOUNCE_WINNER
+from utils.helpers import generate_giveaway_id, select_random_winners, format_time_remaining, get_user_mention, parse_duration
+from utils.delivery import send_to_many
+from utils.peers import get_user_cached
+from utils.tasks import background
+from handlers.announcement import AnnouncementUpdater, render_announcement
+from handlers.conversation import get_conversation_engine
+from handlers.admin import settings_admin_only
 from utils.logger import logger
 
+# How results are delivered when a giveaway ends:
+#   winners      - DM the winners
+#   participants - DM every participant
+#   all          - DM every user and post in every chat without an announcement
+# In every mode the posted announcements are edited into the result.
+
+# Conversation flow name of the /creategiveaway steps
+CREATE_GIVEAWAY_FLOW = "create_giveaway"
+
 def is_admin_filter(func):
     """Decorator to check if user is admin"""
     async def wrapper(client: Client, message: Message):
@@ -23,8 +40,13 @@ def is_admin_filter(func):
 def setup_giveaway_handlers(app: Client):
     # notification_service = NotificationService(app)
     
-    # Store conversation states
-    app.giveaway_states = {}
+    # Giveaway creation flow state, persisted per admin
+    conversations = get_conversation_engine(app)
+    
+    # Edits posted announcements with live participant counts
+    app.announcement_updater = AnnouncementUpdater(app)
+    
+    router = get_callback_router(app)
     
     # Register command handlers FIRST with higher priority (group 0)
     # Register command handler for both /endgiveaway and /endgiveway
@@ -42,7 +64,7 @@ def setup_giveaway_handlers(app: Client):
     @app.on_message(filters.private, group=5)
     async def log_all_messages(client: Client, message: Message):
         if message.text and not message.command:
-            logger.info(f"[MSG_DEBUG] Received message: '{message.text}' from user {message.from_user.id}")
+            logger.info("[MSG_DEBUG] Received message: '%s' from user %s", message.text, message.from_user.id)
         # Continue to other handlers
         raise ContinuePropagation()
     
@@ -55,29 +77,29 @@ def setup_giveaway_handlers(app: Client):
             await message.reply_text("❌ There's already an active giveaway! End it first.")
             return
         
-        app.giveaway_states[message.from_user.id] = {"step": "prize"}
+        conversations.save(message.from_user.id, CREATE_GIVEAWAY_FLOW, {"step": "prize"})
         await message.reply_text(
             "🎁 **Create New Giveaway**\n\n"
             "Please enter the prize name:"
         )
     
-    @app.on_message(filters.text & filters.private)
+    # Only admins with an open creation flow get here; the admin check runs first so other users never look up a flow
+    @app.on_message(filters.text & filters.private & settings_admin_only & conversations.in_flow(CREATE_GIVEAWAY_FLOW))
     async def handle_giveaway_creation(client: Client, message: Message):
         user_id = message.from_user.id
         
-        if user_id not in app.giveaway_states:
-            return
-        
-        state = app.giveaway_states[user_id]
+        flow, state = conversations.get(user_id)
         
         if state["step"] == "prize":
             state["prize"] = message.text
             state["step"] = "description"
+            conversations.save(user_id, CREATE_GIVEAWAY_FLOW, state)
             await message.reply_text("📝 Now enter the giveaway description:")
         
         elif state["step"] == "description":
             state["description"] = message.text
             state["step"] = "duration"
+            conversations.save(user_id, CREATE_GIVEAWAY_FLOW, state)
             await message.reply_text(
                 "⏰ Enter the giveaway duration:\n\n"
                 "Examples: 1h, 30m, 2d, 1h30m\n"
@@ -86,31 +108,11 @@ def setup_giveaway_handlers(app: Client):
         
         elif state["step"] == "duration":
             try:
-                # Parse duration
-                duration_text = message.text.lower()
-                total_seconds = 0
-                
-                # Parse days, hours, minutes
-                if 'd' in duration_text:
-                    days = int(duration_text.split('d')[0])
-                    total_seconds += days * 86400
-                    duration_text = duration_text.split('d')[1] if len(duration_text.split('d')) > 1 else ""
-                
-                if 'h' in duration_text:
-                    hours = int(duration_text.split('h')[0])
-                    total_seconds += hours * 3600
-                    duration_text = duration_text.split('h')[1] if len(duration_text.split('h')) > 1 else ""
-                
-                if 'm' in duration_text:
-                    minutes = int(duration_text.split('m')[0])
-                    total_seconds += minutes * 60
-                
-                if total_seconds == 0:
-                    raise ValueError("Invalid duration")
-                
+                total_seconds = parse_duration(message.text)
                 end_time = datetime.now() + timedelta(seconds=total_seconds)
                 state["end_time"] = end_time
                 state["step"] = "winners"
+                conversations.save(user_id, CREATE_GIVEAWAY_FLOW, state)
                 
                 await message.reply_text("🏆 Enter the number of winners:")
             
@@ -123,63 +125,92 @@ def setup_giveaway_handlers(app: Client):
                 if winners_count < 1:
                     raise ValueError("Winners count must be at least 1")
                 
-                # Create giveaway
-                giveaway_id = generate_giveaway_id()
-                giveaway = Giveaway.create_giveaway(
-                    giveaway_id=giveaway_id,
-                    prize=state["prize"],
-                    description=state["description"],
-                    end_time=state["end_time"],
-                    winners_count=winners_count,
-                    created_by=user_id
-                )
-                
-                # Clear state
-                del app.giveaway_states[user_id]
-                
-                # Send notification
-                # await notification_service.notify_giveaway_started(
-                #     giveaway_id,
-                #     state["prize"],
-                #     state["end_time"].strftime("%Y-%m-%d %H:%M:%S")
-                # )
-                
-                # Confirm to admin
-                confirm_text = f"✅ **Giveaway Created!**\n\n"
-                confirm_text += f"🆔 **ID:** `{giveaway_id}`\n"
-                confirm_text += f"🎁 **Prize:** {state['prize']}\n"
-                confirm_text += f"📝 **Description:** {state['description']}\n"
-                confirm_text += f"⏰ **Ends:** {state['end_time'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-                confirm_text += f"🏆 **Winners:** {winners_count}\n\n"
-                confirm_text += "📢 Broadcasting to users and groups..."
+                state["winners_count"] = winners_count
+                state["step"] = "announce_mode"
+                conversations.save(user_id, CREATE_GIVEAWAY_FLOW, state)
                 
-                await message.reply_text(confirm_text)
-                
-                # Broadcast giveaway announcement
-                success, failed = await broadcast_giveaway_announcement(client, giveaway)
-                
-                # Send broadcast stats
                 await message.reply_text(
-                    f"✅ **Broadcast Complete!**\n\n"
-                    f"✅ Success: {success}\n"
-                    f"❌ Failed: {failed}"
+                    "📣 How should the winners be announced?\n\n"
+                    "`winners` - DM winners and post in announced chats\n"
+                    "`participants` - DM every participant\n"
+                    "`all` - DM every user and chat\n\n"
+                    f"Send `default` to use `{Config.ANNOUNCE_MODE}`"
                 )
-                
-                logger.info(f"Giveaway {giveaway_id} created by {user_id}")
             
             except ValueError:
                 await message.reply_text("❌ Invalid number! Please enter a valid number of winners:")
+        
+        elif state["step"] == "announce_mode":
+            announce_mode = message.text.lower().strip()
+            if announce_mode == "default":
+                announce_mode = Config.ANNOUNCE_MODE
+            
+            if announce_mode not in Config.ANNOUNCE_MODES:
+                await message.reply_text("❌ Invalid mode! Use: winners, participants, all or default")
+                return
+            
+            winners_count = state["winners_count"]
+            
+            # Create giveaway
+            giveaway_id = generate_giveaway_id()
+            giveaway = Giveaway.create_giveaway(
+                giveaway_id=giveaway_id,
+                prize=state["prize"],
+                description=state["description"],
+                end_time=state["end_time"],
+                winners_count=winners_count,
+                created_by=user_id,
+                announce_mode=announce_mode
+            )
+            
+            # Clear state
+            conversations.end(user_id)
+            
+            # Send notification
+            # await notification_service.notify_giveaway_started(
+            #     giveaway_id,
+            #     state["prize"],
+            #     state["end_time"].strftime("%Y-%m-%d %H:%M:%S")
+            # )
+            
+            # Confirm to admin
+            confirm_text = f"✅ **Giveaway Created!**\n\n"
+            confirm_text += f"🆔 **ID:** `{giveaway_id}`\n"
+            confirm_text += f"🎁 **Prize:** {state['prize']}\n"
+            confirm_text += f"📝 **Description:** {state['description']}\n"
+            confirm_text += f"⏰ **Ends:** {state['end_time'].strftime('%Y-%m-%d %H:%M:%S')}\n"
+            confirm_text += f"🏆 **Winners:** {winners_count}\n"
+            confirm_text += f"📣 **Announce:** {announce_mode}\n\n"
+            confirm_text += "📢 Broadcasting to users and groups..."
+            
+            await message.reply_text(confirm_text)
+            
+            # The announcement fan-out runs in the background so it does not hold a handler worker
+            background.spawn(announce_giveaway(client, message, giveaway))
+            
+            logger.info(f"Giveaway {giveaway_id} created by {user_id}")
+    
+    async def announce_giveaway(client: Client, message: Message, giveaway):
+        """Broadcast a new giveaway and report the result to the admin who created it"""
+        try:
+            success, failed = await broadcast_giveaway_announcement(client, giveaway)
+            
+            # Send broadcast stats
+            await message.reply_text(
+                f"✅ **Broadcast Complete!**\n\n"
+                f"✅ Success: {success}\n"
+                f"❌ Failed: {failed}"
+            )
+        except Exception as e:
+            logger.error("Giveaway announcement of %s failed: %s", giveaway["giveaway_id"], e, exc_info=True)
+            await message.reply_text(f"❌ Error broadcasting the giveaway: {str(e)}")
     
     async def broadcast_giveaway_announcement(client: Client, giveaway):
         """Broadcast new giveaway to all users, groups, and channels"""
-        from database.models import User, Chat
+        from database.models import User, Chat, Announcement
         
-        announcement = f"🎉 **NEW GIVEAWAY!**\n\n"
-        announcement += f"🎁 **Prize:** {giveaway['prize']}\n"
-        announcement += f"📝 **Description:** {giveaway['description']}\n"
-        announcement += f"⏰ **Ends:** {format_time_remaining(giveaway['end_time'])}\n"
-        announcement += f"🏆 **Winners:** {giveaway['winners_count']}\n\n"
-        announcement += "Click below to join!"
+        announcement = render_announcement(giveaway)
+        giveaway_id = giveaway["giveaway_id"]
         
         keyboard = join_giveaway_keyboard()
         success = 0
@@ -188,6 +219,9 @@ def setup_giveaway_handlers(app: Client):
         # Send to all users
         users = User.get_all_users()
         for user in users:
+            # Ended while still announcing; nobody should be invited any more
+            if giveaway_id in app.announcement_updater.finalized:
+                break
             try:
                 await client.send_message(
                     user["user_id"],
@@ -197,23 +231,28 @@ def setup_giveaway_handlers(app: Client):
                 success += 1
             except Exception as e:
                 failed += 1
-                logger.error(f"Failed to send giveaway announcement to user {user['user_id']}: {e}")
+                logger.limited("announcement_user_failed", "Failed to send giveaway announcement to user %s: %s", user['user_id'], e)
         
         # Send to all groups and channels
         chats = Chat.get_all_chats()
         for chat in chats:
+            if giveaway_id in app.announcement_updater.finalized:
+                break
             try:
-                await client.send_message(
+                sent = await client.send_message(
                     chat["chat_id"],
                     announcement,
                     reply_markup=keyboard
                 )
+                # Recorded as soon as it is posted, so live counts and the result reach it even if the giveaway ends mid-fan-out
+                Announcement.add_announcements(giveaway_id, [(chat["chat_id"], sent.id)])
+                app.announcement_updater.start()
                 success += 1
             except Exception as e:
                 failed += 1
-                logger.error(f"Failed to send giveaway announcement to chat {chat['chat_id']}: {e}")
+                logger.limited("announcement_chat_failed", "Failed to send giveaway announcement to chat %s: %s", chat['chat_id'], e)
         
-        logger.info(f"Giveaway announcement sent: {success} success, {failed} failed")
+        logger.info("Giveaway announcement sent: %s success, %s failed", success, failed)
         return success, failed
     
     async def end_giveaway_handler(client: Client, message: Message):
@@ -252,6 +291,78 @@ def setup_giveaway_handlers(app: Client):
             logger.error(f"[END_GIVEAWAY_CMD] Error: {str(e)}", exc_info=True)
             await message.reply_text(f"❌ Error: {str(e)}")
     
+    async def build_result_text(client: Client, giveaway, winners, log_prefix):
+        """Build the winners announcement text"""
+        result_text = f"🏁 **Giveaway Ended!**\n\n"
+        result_text += f"🎁 **Prize:** {giveaway['prize']}\n"
+        result_text += f"👥 **Participants:** {len(giveaway.get('participants', []))}\n\n"
+        result_text += f"🎉 **Winners:**\n"
+        
+        for winner_id in winners:
+            try:
+                winner_user = await get_user_cached(client, winner_id)
+                result_text += f"  🏆 {get_user_mention(winner_user)}\n"
+                logger.debug("%s Retrieved winner info: %s", log_prefix, winner_user.username or winner_id)
+            except Exception as e:
+                logger.debug("%s Could not retrieve winner %s: %s", log_prefix, winner_id, e)
+                result_text += f"  🏆 User {winner_id}\n"
+        
+        result_text += f"\n🎊 Congratulations to all winners!"
+        return result_text
+    
+    async def announce_results(client: Client, giveaway, result_text, winners, log_prefix):
+        """Deliver the result according to the giveaway's announce mode"""
+        from database.models import User, Chat
+        
+        announce_mode = giveaway.get("announce_mode", Config.ANNOUNCE_MODE)
+        logger.info(f"{log_prefix} Announcing results in '{announce_mode}' mode")
+        
+        # Turn the posted announcements into the result; re-post only where editing failed
+        edited, edit_failed = await app.announcement_updater.finalize(giveaway["giveaway_id"], result_text)
+        chat_ids = edit_failed
+        text = result_text
+        success = len(edited)
+        failed = 0
+        
+        if announce_mode == "participants":
+            chat_ids = chat_ids + giveaway.get("participants", [])
+        elif announce_mode == "all":
+            edited_chats = set(edited)
+            chat_ids = [user["user_id"] for user in User.get_all_users()]
+            chat_ids += [chat["chat_id"] for chat in Chat.get_all_chats() if chat["chat_id"] not in edited_chats]
+        else:
+            # winners mode: re-post where editing failed, then one DM per winner
+            reposted, repost_failed = await send_to_many(
+                client, chat_ids, result_text,
+                log_prefix=log_prefix, disable_web_page_preview=True
+            )
+            success += reposted
+            failed += repost_failed
+            chat_ids = winners
+            text = "🥳 **Congratulations, you won!**\n\n" + result_text
+        
+        sent, send_failed = await send_to_many(
+            client, chat_ids, text,
+            log_prefix=log_prefix, disable_web_page_preview=True
+        )
+        return success + sent, failed + send_failed
+    
+    async def announce_and_mark(client: Client, giveaway, winners, log_prefix):
+        """Announce the winners and mark the giveaway announced; runs as a background task"""
+        try:
+            result_text = await build_result_text(client, giveaway, winners, log_prefix)
+            
+            success_count, failed_count = await announce_results(client, giveaway, result_text, winners, log_prefix)
+            logger.info("%s Successfully sent %s/%s result messages", log_prefix, success_count, success_count + failed_count)
+            
+            # Update status to announced
+            logger.info("%s Updating status to announced", log_prefix)
+            Giveaway.update_giveaway_status(giveaway["giveaway_id"], "announced")
+            
+            logger.info("%s ✅ Winners announced for giveaway %s", log_prefix, giveaway["giveaway_id"])
+        except Exception as e:
+            logger.error("%s Error announcing giveaway %s: %s", log_prefix, giveaway["giveaway_id"], str(e), exc_info=True)
+    
     async def end_giveaway(client: Client, giveaway, ended_by=None, auto_announce=True):
         """End a giveaway and select winners"""
         try:
@@ -259,89 +370,50 @@ def setup_giveaway_handlers(app: Client):
             participants = giveaway.get("participants", [])
             winners_count = giveaway["winners_count"]
             
-            logger.info(f"[END_GIVEAWAY] Starting end_giveaway process for {giveaway_id}")
-            logger.info(f"[END_GIVEAWAY] Participants: {len(participants)}, Winners needed: {winners_count}, Auto-announce: {auto_announce}")
+            logger.info("[END_GIVEAWAY] Starting end_giveaway process for %s", giveaway_id)
+            logger.info("[END_GIVEAWAY] Participants: %s, Winners needed: %s, Auto-announce: %s", len(participants), winners_count, auto_announce)
             
             if len(participants) == 0:
                 # No participants
-                logger.warning(f"[END_GIVEAWAY] No participants for giveaway {giveaway_id}")
+                logger.warning("[END_GIVEAWAY] No participants for giveaway %s", giveaway_id)
                 Giveaway.end_giveaway(giveaway_id)
                 result_text = f"🏁 **Giveaway Ended**\n\n"
                 result_text += f"🎁 **Prize:** {giveaway['prize']}\n"
                 result_text += f"❌ **No participants!**"
                 
-                # Notify users
-                from database.models import User
-                users = User.get_all_users()
-                logger.info(f"[END_GIVEAWAY] Notifying {len(users)} users about no participants")
-                for user in users:
-                    try:
-                        await client.send_message(user["user_id"], result_text)
-                    except Exception as e:
-                        logger.debug(f"[END_GIVEAWAY] Failed to notify user {user['user_id']}: {e}")
+                # Nobody to DM in winners/participants mode, so this only reaches the announced chats
+                background.spawn(announce_results(client, giveaway, result_text, [], "[END_GIVEAWAY]"))
                 
-                logger.info(f"[END_GIVEAWAY] Giveaway {giveaway_id} ended with no participants")
+                logger.info("[END_GIVEAWAY] Giveaway %s ended with no participants", giveaway_id)
                 return
             
             # Select winners
-            logger.info(f"[END_GIVEAWAY] Selecting {winners_count} winners from {len(participants)} participants")
+            logger.info("[END_GIVEAWAY] Selecting %s winners from %s participants", winners_count, len(participants))
             winners = select_random_winners(participants, winners_count)
-            logger.info(f"[END_GIVEAWAY] Selected winners: {winners}")
+            logger.info("[END_GIVEAWAY] Selected winners: %s", winners)
             
             # Update giveaway status and winners in database
-            logger.info(f"[END_GIVEAWAY] Updating database for giveaway {giveaway_id}")
+            logger.info("[END_GIVEAWAY] Updating database for giveaway %s", giveaway_id)
             Giveaway.end_giveaway(giveaway_id, winners)
-            logger.info(f"[END_GIVEAWAY] Database updated successfully")
+            logger.info("[END_GIVEAWAY] Database updated successfully")
             
             if auto_announce:
-                logger.info(f"[END_GIVEAWAY] Starting auto-announce process")
-                # Prepare winner announcement
-                result_text = f"🏁 **Giveaway Ended!**\n\n"
-                result_text += f"🎁 **Prize:** {giveaway['prize']}\n"
-                result_text += f"👥 **Participants:** {len(participants)}\n\n"
-                result_text += f"🎉 **Winners:**\n"
-                
-                for winner_id in winners:
-                    try:
-                        winner_user = await client.get_users(winner_id)
-                        result_text += f"  🏆 {get_user_mention(winner_user)}\n"
-                        logger.debug(f"[END_GIVEAWAY] Retrieved winner info: {winner_user.username or winner_id}")
-                    except Exception as e:
-                        logger.debug(f"[END_GIVEAWAY] Could not retrieve winner {winner_id}: {e}")
-                        result_text += f"  🏆 User {winner_id}\n"
-                
-                result_text += f"\n🎊 Congratulations to all winners!"
-                
-                # Notify all participants
-                logger.info(f"[END_GIVEAWAY] Notifying {len(participants)} participants of winners")
-                success_count = 0
-                for participant_id in participants:
-                    try:
-                        await client.send_message(participant_id, result_text, disable_web_page_preview=True)
-                        success_count += 1
-                    except Exception as e:
-                        logger.error(f"[END_GIVEAWAY] Failed to notify participant {participant_id}: {e}")
+                logger.info("[END_GIVEAWAY] Starting auto-announce process")
+                # The fan-out runs in the background so it does not hold a handler worker
+                background.spawn(announce_and_mark(client, giveaway, winners, "[END_GIVEAWAY]"))
                 
-                logger.info(f"[END_GIVEAWAY] Successfully notified {success_count}/{len(participants)} participants")
-                
-                # Update status to announced
-                logger.info(f"[END_GIVEAWAY] Updating status to announced")
-                Giveaway.update_giveaway_status(giveaway_id, "announced")
-                
-                logger.info(f"[END_GIVEAWAY] ✅ Giveaway {giveaway_id} ended with {len(winners)} winners (auto-announced)")
+                logger.info("[END_GIVEAWAY] ✅ Giveaway %s ended with %s winners (announcing)", giveaway_id, len(winners))
             else:
-                logger.info(f"[END_GIVEAWAY] Manual announcement mode - winners selected but not announced yet")
-                logger.info(f"[END_GIVEAWAY] ✅ Giveaway {giveaway_id} ended with {len(winners)} winners (pending manual announcement)")
+                logger.info("[END_GIVEAWAY] Manual announcement mode - winners selected but not announced yet")
+                logger.info("[END_GIVEAWAY] ✅ Giveaway %s ended with %s winners (pending manual announcement)", giveaway_id, len(winners))
         except Exception as e:
-            logger.error(f"[END_GIVEAWAY] Critical error in end_giveaway: {str(e)}", exc_info=True)
+            logger.error("[END_GIVEAWAY] Critical error in end_giveaway: %s", str(e), exc_info=True)
             raise
     
-    @app.on_callback_query(filters.regex("^end_auto_announce_"))
-    async def end_auto_announce_callback(client: Client, callback_query: CallbackQuery):
+    @router.route(END_AUTO_ANNOUNCE)
+    async def end_auto_announce_callback(client: Client, callback_query: CallbackQuery, giveaway_id):
         """End giveaway and automatically announce winner"""
         try:
-            # Extract giveaway_id: "end_auto_announce_GA_20260131063210_2963" -> "GA_20260131063210_2963"
-            giveaway_id = callback_query.data.replace("end_auto_announce_", "")
             logger.info(f"[AUTO_ANNOUNCE] User {callback_query.from_user.id} clicked auto announce for giveaway {giveaway_id}")
             
             giveaway = Giveaway.get_giveaway(giveaway_id)
@@ -357,17 +429,15 @@ def setup_giveaway_handlers(app: Client):
             await end_giveaway(client, giveaway, callback_query.from_user.id, auto_announce=True)
             
             logger.info(f"[AUTO_ANNOUNCE] ✅ Successfully processed auto announce for {giveaway_id}")
-            await callback_query.answer("✅ Giveaway ended and winners announced!", show_alert=True)
+            await callback_query.answer("✅ Giveaway ended! Winners are being announced.", show_alert=True)
         except Exception as e:
             logger.error(f"[AUTO_ANNOUNCE] Error: {str(e)}", exc_info=True)
             await callback_query.answer(f"❌ Error: {str(e)}", show_alert=True)
     
-    @app.on_callback_query(filters.regex("^end_manual_announce_"))
-    async def end_manual_announce_callback(client: Client, callback_query: CallbackQuery):
+    @router.route(END_MANUAL_ANNOUNCE)
+    async def end_manual_announce_callback(client: Client, callback_query: CallbackQuery, giveaway_id):
         """End giveaway and wait for manual announcement"""
         try:
-            # Extract giveaway_id: "end_manual_announce_GA_20260131063210_2963" -> "GA_20260131063210_2963"
-            giveaway_id = callback_query.data.replace("end_manual_announce_", "")
             logger.info(f"[MANUAL_ANNOUNCE] User {callback_query.from_user.id} clicked manual announce for giveaway {giveaway_id}")
             
             giveaway = Giveaway.get_giveaway(giveaway_id)
@@ -401,12 +471,10 @@ def setup_giveaway_handlers(app: Client):
             logger.error(f"[MANUAL_ANNOUNCE] Error: {str(e)}", exc_info=True)
             await callback_query.answer(f"❌ Error: {str(e)}", show_alert=True)
     
-    @app.on_callback_query(filters.regex("^announce_winner_"))
-    async def announce_winner_callback(client: Client, callback_query: CallbackQuery):
+    @router.route(ANNOUNCE_WINNER)
+    async def announce_winner_callback(client: Client, callback_query: CallbackQuery, giveaway_id):
         """Announce winner for a giveaway"""
         try:
-            # Extract giveaway_id: "announce_winner_GA_20260131063210_2963" -> "GA_20260131063210_2963"
-            giveaway_id = callback_query.data.replace("announce_winner_", "")
             logger.info(f"[ANNOUNCE_WINNER] User {callback_query.from_user.id} clicked announce winner for giveaway {giveaway_id}")
             
             giveaway = Giveaway.get_giveaway(giveaway_id)
@@ -424,43 +492,11 @@ def setup_giveaway_handlers(app: Client):
             logger.info(f"[ANNOUNCE_WINNER] Found {len(giveaway['winners'])} winners for {giveaway_id}")
             await callback_query.message.delete()
             
-            # Send winner announcement
-            result_text = f"🏁 **Giveaway Ended!**\n\n"
-            result_text += f"🎁 **Prize:** {giveaway['prize']}\n"
-            result_text += f"👥 **Participants:** {len(giveaway.get('participants', []))}\n\n"
-            result_text += f"🎉 **Winners:**\n"
-            
+            # Send winner announcement in the background
             winners = giveaway.get("winners", [])
-            for winner_id in winners:
-                try:
-                    winner_user = await client.get_users(winner_id)
-                    result_text += f"  🏆 {get_user_mention(winner_user)}\n"
-                    logger.debug(f"[ANNOUNCE_WINNER] Retrieved winner: {winner_user.username or winner_id}")
-                except Exception as e:
-                    logger.debug(f"[ANNOUNCE_WINNER] Could not retrieve winner {winner_id}: {e}")
-                    result_text += f"  🏆 User {winner_id}\n"
-            
-            result_text += f"\n🎊 Congratulations to all winners!"
-            
-            # Notify all participants
-            participants = giveaway.get("participants", [])
-            logger.info(f"[ANNOUNCE_WINNER] Notifying {len(participants)} participants about winners")
-            success_count = 0
-            for participant_id in participants:
-                try:
-                    await client.send_message(participant_id, result_text, disable_web_page_preview=True)
-                    success_count += 1
-                except Exception as e:
-                    logger.error(f"[ANNOUNCE_WINNER] Failed to notify participant {participant_id}: {e}")
-            
-            logger.info(f"[ANNOUNCE_WINNER] Successfully notified {success_count}/{len(participants)} participants")
-            
-            # Update giveaway status
-            logger.info(f"[ANNOUNCE_WINNER] Updating status to announced")
-            Giveaway.update_giveaway_status(giveaway_id, "announced")
-            
-            logger.info(f"[ANNOUNCE_WINNER] ✅ Winners announced for giveaway {giveaway_id}")
-            await callback_query.answer("✅ Winners announced to all participants!", show_alert=True)
+            background.spawn(announce_and_mark(client, giveaway, winners, "[ANNOUNCE_WINNER]"))
+            
+            await callback_query.answer("✅ Winners are being announced!", show_alert=True)
         except Exception as e:
             logger.error(f"[ANNOUNCE_WINNER] Error: {str(e)}", exc_info=True)
             await callback_query.answer(f"❌ Error: {str(e)}", show_alert=True)
@@ -469,10 +505,7 @@ def setup_giveaway_handlers(app: Client):
     @is_admin_filter
     async def reroll_command(client: Client, message: Message):
         # Get last ended giveaway
-        last_giveaway = app.db.giveaways.find_one(
-            {"status": "ended"},
-            sort=[("created_at", -1)]
-        )
+        last_giveaway = Giveaway.get_last_ended()
         
         if not last_giveaway:
             await message.reply_text("❌ No ended giveaway found!")
@@ -488,10 +521,7 @@ def setup_giveaway_handlers(app: Client):
         new_winners = select_random_winners(participants, winners_count)
         
         # Update winners
-        app.db.giveaways.update_one(
-            {"giveaway_id": last_giveaway["giveaway_id"]},
-            {"$set": {"winners": new_winners}}
-        )
+        Giveaway.set_winners(last_giveaway["giveaway_id"], new_winners)
         
         # Notify
         # await notification_service.notify_winner_selected(last_giveaway["giveaway_id"], new_winners)
@@ -503,7 +533,7 @@ def setup_giveaway_handlers(app: Client):
         
         for winner_id in new_winners:
             try:
-                winner_user = await client.get_users(winner_id)
+                winner_user = await get_user_cached(client, winner_id)
                 result_text += f"  🏆 {get_user_mention(winner_user)}\n"
             except:
                 result_text += f"  🏆 User {winner_id}\n"
@@ -539,132 +569,3 @@ def setup_giveaway_handlers(app: Client):
         info_text += "Use /join to participate!"
         
         await message.reply_text(info_text, reply_markup=join_giveaway_keyboard())
-    
-    @app.on_callback_query(filters.regex("^join_giveaway$"))
-    async def join_giveaway_callback(client: Client, callback_query: CallbackQuery):
-        """Handle join giveaway button clicks from group/channel/private"""
-        user_id = callback_query.from_user.id
-        
-        # Get active giveaway
-        giveaway = Giveaway.get_active_giveaway()
-        if not giveaway:
-            await callback_query.answer("❌ No active giveaway at the moment!", show_alert=True)
-            return
-        
-        # Check force subscribe
-        from handlers.forcesubscribe import ForceSubscribeService
-        force_subscribe_service = ForceSubscribeService(client)
-        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id)
-        
-        if not is_subscribed:
-            # User not subscribed to required channels
-            text = "⚠️ **You must join the following channels to participate:**\n\n"
-            text += "Please join all channels and click '✅ Try Again'"
-            
-            keyboard = force_subscribe_keyboard(not_subscribed)
-            await callback_query.answer("Please join required channels first!", show_alert=True)
-            
-            # Try to send message in private chat (may fail if user never started bot)
-            try:
-                await client.send_message(user_id, text, reply_markup=keyboard)
-            except:
-                # Can't send private message, just show alert
-                await callback_query.answer(
-                    "⚠️ Please join the required channels and start the bot in private chat!",
-                    show_alert=True
-                )
-            return
-        
-        # Check if already participated
-        if user_id in giveaway.get("participants", []):
-            await callback_query.answer("✅ You have already joined this giveaway!", show_alert=True)
-            return
-        
-        # Add participant
-        Giveaway.add_participant(giveaway["giveaway_id"], user_id)
-        
-        # Add user to database if not exists
-        from database.models import User
-        User.add_user(user_id, callback_query.from_user.username)
-        
-        participants_count = Giveaway.get_participants_count(giveaway["giveaway_id"])
-        
-        # # Notify log group
-        # await notification_service.notify_giveaway_participation(
-        #     user_id,
-        #     callback_query.from_user.username,
-        #     giveaway["giveaway_id"],
-        #     giveaway["prize"]
-        # )
-        
-        # Show success message
-        success_msg = f"🎉 Successfully joined!\n\n"
-        success_msg += f"🎁 Prize: {giveaway['prize']}\n"
-        success_msg += f"👥 Participants: {participants_count}"
-        
-        await callback_query.answer(success_msg, show_alert=True)
-        
-        logger.info(f"User {user_id} joined giveaway {giveaway['giveaway_id']} via callback")
-    
-    @app.on_callback_query(filters.regex("^check_subscription$"))
-    async def check_subscription_callback(client: Client, callback_query: CallbackQuery):
-        """Handle Try Again button for force subscribe check"""
-        user_id = callback_query.from_user.id
-        
-        # Get active giveaway
-        giveaway = Giveaway.get_active_giveaway()
-        if not giveaway:
-            await callback_query.answer("❌ No active giveaway at the moment!", show_alert=True)
-            return
-        
-        # Check force subscribe again
-        from handlers.forcesubscribe import ForceSubscribeService
-        force_subscribe_service = ForceSubscribeService(client)
-        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id)
-        
-        if not is_subscribed:
-            # Still not subscribed
-            await callback_query.answer("❌ Please join all required channels first!", show_alert=True)
-            return
-        
-        # Check if already participated
-        if user_id in giveaway.get("participants", []):
-            await callback_query.answer("✅ You have already joined this giveaway!", show_alert=True)
-            # Delete the force subscribe message
-            try:
-                await callback_query.message.delete()
-            except:
-                pass
-            return
-        
-        # Add participant
-        Giveaway.add_participant(giveaway["giveaway_id"], user_id)
-        
-        # Add user to database if not exists
-        from database.models import User
-        User.add_user(user_id, callback_query.from_user.username)
-        
-        participants_count = Giveaway.get_participants_count(giveaway["giveaway_id"])
-        
-        # Notify log group
-        # await notification_service.notify_giveaway_participation(
-        #     user_id,
-        #     callback_query.from_user.username,
-        #     giveaway["giveaway_id"],
-        #     giveaway["prize"]
-        # )
-        
-        # Show success message
-        success_msg = f"🎉 Successfully joined!\n\n"
-        success_msg += f"🎁 Prize: {giveaway['prize']}\n"
-        success_msg += f"👥 Participants: {participants_count}"
-        
-        await callback_query.answer(success_msg, show_alert=True)
-        
-        # Delete the force subscribe message
-        try:
-            await callback_query.message.delete()
-        except:
-            pass
-        
-        logger.info(f"User {user_id} joined giveaway {giveaway['giveaway_id']} after force subscribe check")
@@ -1,15 +1,39 @@
+import asyncio
 from pyrogram import Client, filters
 from pyrogram.types import Message, CallbackQuery
-from database.models import User, Giveaway, Settings, Chat
-from handlers.forcesubscribe import ForceSubscribeService
+from database.models import User, Giveaway, Chat
+from handlers.forcesubscribe import get_force_subscribe_service
 from handlers.referral import ReferralService
+from handlers.admin import get_admin_ids
 from utils.reply import main_menu_keyboard
 from utils.helpers import get_user_mention, format_time_remaining, format_datetime
 from utils.logger import logger
+from utils.peers import get_user_cached
+from utils.coalesce import Coalescer
+from utils.admission import AdmissionQueue
+from utils.batching import Batcher
+from utils.delivery import PacedSender
+from utils.tasks import background
+from utils.callbacks import get_callback_router, JOIN_GIVEAWAY, CHECK_SUBSCRIPTION, CLOSE
+from config import Config
 from handlers.botlog import send_bot_start_log, send_user_joined_giveaway_log
 
 def setup_user_handlers(app: Client):
-    force_subscribe_service = ForceSubscribeService(app)
+    force_subscribe_service = get_force_subscribe_service(app)
+    router = get_callback_router(app)
+    join_coalescer = Coalescer("join_giveaway", Config.JOIN_ANSWER_CACHE_TTL)
+    # Join checks and writes run here, off the handler workers, so a launch spike queues up instead of timing out
+    app.join_admission = AdmissionQueue("join", Config.JOIN_WORKERS, Config.JOIN_QUEUE_SIZE)
+    # (user_id, giveaway_id) -> future of the join queued for it, so repeat taps wait for that one job
+    queued_joins = {}
+    # (user_id, giveaway_id) -> queue notice of a queued join, decided once per join
+    join_notices = {}
+    join_results = PacedSender(app, "join_results", Config.JOIN_RESULT_RATE, log_prefix="[JOIN]")
+    # New users and referral credits from a /start storm are written a batch at a time, off the event loop on MongoDB
+    app.user_registrations = Batcher(
+        "user_registrations", User.add_users, Config.USER_BATCH_SIZE, Config.USER_BATCH_MS / 1000,
+        in_thread=Config.STORAGE_BACKEND == "mongo"
+    )
     
     @app.on_message(filters.command("start") & filters.private)
     async def start_command(client: Client, message: Message):
@@ -21,18 +45,12 @@ def setup_user_handlers(app: Client):
         if len(message.command) > 1:
             referrer_id = ReferralService.extract_referrer_id(message.command[1])
         
-        # Add user to database
-        is_new = User.add_user(user_id, username, referrer_id)
+        # Add user to database with the next batch; the welcome does not wait for it
+        registered = client.user_registrations.submit((user_id, username, referrer_id))
+        registered.add_done_callback(lambda done: background.spawn(log_new_user(client, message.from_user, done)))
         
-        # Check if user is admin
-        admins = Settings.get_admins()
-        is_admin = user_id in admins
-        
-        if is_new:
-            # await notification_service.notify_new_user(user_id, username)
-            # Send log for new user
-            await send_bot_start_log(client, message.from_user)
-            logger.info(f"New user started bot: {user_id}")
+        # Check if user is admin, from the cached admin list so a /start storm costs no settings reads
+        is_admin = user_id in get_admin_ids()
         
         welcome_text = f"👋 **Welcome {message.from_user.first_name}!**\n\n"
         welcome_text += "🎁 I'm a Giveaway Bot. You can participate in giveaways and win amazing prizes!\n\n"
@@ -47,10 +65,35 @@ def setup_user_handlers(app: Client):
             welcome_text += "👮 **You are an admin!**\n"
             welcome_text += "Use /help for admin commands."
         
-        await message.reply_text(
+        reply = message.reply_text(
             welcome_text,
             reply_markup=main_menu_keyboard(is_admin)
         )
+        # During a /start storm the welcome is sent without holding a handler worker for the round trip
+        if client.dispatcher.updates_queue.qsize() >= client.workers:
+            background.spawn(send_welcome(user_id, reply))
+        else:
+            await reply
+    
+    async def send_welcome(user_id, reply):
+        try:
+            await reply
+        except Exception as e:
+            logger.limited("welcome_failed", "[START] Could not send welcome to %s: %s", user_id, e)
+    
+    async def log_new_user(client: Client, user, registered):
+        """Send the start log once the user's registration is written, if they were new"""
+        try:
+            is_new = registered.result()
+        except Exception as e:
+            logger.error("[START] Registering %s failed: %s", user.id, e)
+            return
+        
+        if is_new:
+            # await notification_service.notify_new_user(user_id, username)
+            # Send log for new user
+            await send_bot_start_log(client, user)
+            logger.info(f"New user started bot: {user.id}")
     
     @app.on_message(filters.command("join") & filters.private)
     async def join_command(client: Client, message: Message):
@@ -80,6 +123,7 @@ def setup_user_handlers(app: Client):
         
         # Add participant
         Giveaway.add_participant(giveaway["giveaway_id"], user_id)
+        client.announcement_updater.mark_dirty()
         
         participants_count = Giveaway.get_participants_count(giveaway["giveaway_id"])
         time_remaining = format_time_remaining(giveaway["end_time"])
@@ -99,7 +143,7 @@ def setup_user_handlers(app: Client):
             message.from_user.username,
             giveaway["giveaway_id"]
         )
-        logger.info(f"User {user_id} joined giveaway {giveaway['giveaway_id']}")
+        logger.info("User %s joined giveaway %s", user_id, giveaway['giveaway_id'])
     
     @app.on_message(filters.command("stats") & filters.private)
     async def stats_command(client: Client, message: Message):
@@ -122,7 +166,7 @@ def setup_user_handlers(app: Client):
     @app.on_message(filters.command("refer") & filters.private)
     async def refer_command(client: Client, message: Message):
         user_id = message.from_user.id
-        bot_username = (await client.get_me()).username
+        bot_username = client.me.username
         
         referral_link = ReferralService.get_referral_link(bot_username, user_id)
         referral_stats = ReferralService.get_referral_stats(user_id)
@@ -137,7 +181,7 @@ def setup_user_handlers(app: Client):
     @app.on_message(filters.command("winners") & filters.private)
     async def winners_command(client: Client, message: Message):
         # Get recent ended giveaways with winners
-        ended_giveaways = list(app.db.giveaways.find({"status": "ended"}).sort("created_at", -1).limit(5))
+        ended_giveaways = Giveaway.get_recent_ended(5)
         
         if not ended_giveaways:
             await message.reply_text("❌ No winners yet!")
@@ -151,7 +195,7 @@ def setup_user_handlers(app: Client):
                 winners_text += f"🎁 **{giveaway['prize']}**\n"
                 for winner_id in winners[:3]:  # Show max 3 winners
                     try:
-                        user = await client.get_users(winner_id)
+                        user = await get_user_cached(client, winner_id)
                         winners_text += f"   👤 {get_user_mention(user)}\n"
                     except:
                         winners_text += f"   👤 User {winner_id}\n"
@@ -162,8 +206,7 @@ def setup_user_handlers(app: Client):
     @app.on_message(filters.command("help") & filters.private)
     async def help_command(client: Client, message: Message):
         user_id = message.from_user.id
-        admins = Settings.get_admins()
-        is_admin = user_id in admins
+        is_admin = user_id in get_admin_ids()
         
         help_text = "❓ **Help & Commands**\n\n"
         help_text += "**User Commands:**\n"
@@ -191,40 +234,109 @@ def setup_user_handlers(app: Client):
         
         await message.reply_text(help_text)
     
-    @app.on_callback_query(filters.regex("^join_giveaway$"))
-    async def join_giveaway_callback(client: Client, callback_query: CallbackQuery):
-        user_id = callback_query.from_user.id
+    async def join_giveaway(client: Client, user_id, giveaway):
+        """Run the join checks and writes for one tap and return the alert text"""
+        key = (user_id, giveaway["giveaway_id"])
         
-        # Check force subscribe
-        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id)
+        # Check force subscribe; only an alert is shown, so stop at the first missing channel
+        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id, short_circuit=True)
         if not is_subscribed:
-            await callback_query.answer("⚠️ You must join all channels first!", show_alert=True)
-            return
+            return "⚠️ You must join all channels first!"
+        
+        if user_id in giveaway.get("participants", []):
+            join_coalescer.remember(key, "✅ Already joined!")
+            return "✅ Already joined!"
+        
+        Giveaway.add_participant(giveaway["giveaway_id"], user_id)
+        client.announcement_updater.mark_dirty()
+        join_coalescer.remember(key, "✅ Already joined!")
+        return "🎉 Successfully joined the giveaway!"
+    
+    @router.route(JOIN_GIVEAWAY)
+    async def join_giveaway_callback(client: Client, callback_query: CallbackQuery):
+        user_id = callback_query.from_user.id
         
         giveaway = Giveaway.get_active_giveaway()
         if not giveaway:
             await callback_query.answer("❌ Giveaway has ended!", show_alert=True)
             return
         
-        if user_id in giveaway.get("participants", []):
-            await callback_query.answer("✅ Already joined!", show_alert=True)
+        # Repeated taps share the first tap's answer instead of redoing the checks and writes
+        key = (user_id, giveaway["giveaway_id"])
+        answer = join_coalescer.recall(key)
+        if answer is not None:
+            await callback_query.answer(answer, show_alert=True)
             return
         
-        Giveaway.add_participant(giveaway["giveaway_id"], user_id)
-        await callback_query.answer("🎉 Successfully joined the giveaway!", show_alert=True)
+        # A tap while the user's earlier join is still queued waits for that job instead of queueing another
+        result = queued_joins.get(key)
+        if result is None:
+            try:
+                result = client.join_admission.submit(
+                    lambda: join_coalescer.run(key, lambda: join_giveaway(client, user_id, giveaway))
+                )
+            except asyncio.QueueFull:
+                await callback_query.answer("🚦 Too many people are joining right now, please tap again in a minute.", show_alert=True)
+                return
+            queued_joins[key] = result
+            result.add_done_callback(lambda _: queued_joins.pop(key, None))
+        
+        # Answer with the result while updates are not piling up behind this one; during
+        # a spike acknowledge right away and send the result once the join has run
+        spike = client.join_admission.saturated() or client.dispatcher.updates_queue.qsize() >= client.workers
+        if not spike:
+            try:
+                answer = await asyncio.wait_for(asyncio.shield(result), Config.JOIN_ANSWER_WAIT)
+                await callback_query.answer(answer, show_alert=True)
+                return
+            except asyncio.TimeoutError:
+                pass
+        
+        # Only users who started the bot can be messaged; the rest learn the outcome by tapping again.
+        # The result message is promised once per join, however often the user taps meanwhile
+        notice = join_notices.get(key)
+        if notice is None:
+            if User.get_user(user_id):
+                result.add_done_callback(lambda done: send_join_result(user_id, done))
+                notice = "⏳ You're in the queue! We'll message you once you've joined."
+            else:
+                notice = "⏳ You're in the queue! Tap Join again in a minute to see if you've joined."
+            join_notices[key] = notice
+            result.add_done_callback(lambda _: join_notices.pop(key, None))
+        
+        # The notice is sent without holding a handler worker for the round trip
+        background.spawn(acknowledge_queued_join(callback_query, notice))
+    
+    async def acknowledge_queued_join(callback_query: CallbackQuery, notice):
+        try:
+            await callback_query.answer(notice, show_alert=True)
+        except Exception as e:
+            logger.limited("join_ack_failed", "[JOIN] Could not acknowledge queued join: %s", e)
+    
+    def send_join_result(user_id, result):
+        """Queue the message telling a joiner the outcome of their queued join"""
+        if result.cancelled():
+            # Dropped at shutdown; the user can tap again once the bot is back
+            return
+        try:
+            answer = result.result()
+        except Exception as e:
+            logger.error("[JOIN] Queued join for %s failed: %s", user_id, e)
+            answer = "❌ Joining the giveaway failed, please tap Join again."
+        join_results.send(user_id, answer)
     
-    @app.on_callback_query(filters.regex("^check_subscription$"))
+    @router.route(CHECK_SUBSCRIPTION)
     async def check_subscription_callback(client: Client, callback_query: CallbackQuery):
         user_id = callback_query.from_user.id
         
-        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id)
+        is_subscribed, not_subscribed = await force_subscribe_service.check_user_subscribed(user_id, recheck=True)
         if is_subscribed:
             await callback_query.answer("✅ Subscription verified! Now you can join the giveaway.", show_alert=True)
             await callback_query.message.delete()
         else:
             await callback_query.answer("⚠️ You haven't joined all channels yet!", show_alert=True)
     
-    @app.on_callback_query(filters.regex("^close$"))
+    @router.route(CLOSE)
     async def close_callback(client: Client, callback_query: CallbackQuery):
         await callback_query.message.delete()
     
@@ -232,7 +344,7 @@ def setup_user_handlers(app: Client):
     @app.on_message(filters.new_chat_members)
     async def bot_added_to_chat(client: Client, message: Message):
         for member in message.new_chat_members:
-            if member.id == (await client.get_me()).id:
+            if member.id == client.me.id:
                 chat_id = message.chat.id
                 chat_title = message.chat.title
                 chat_type = message.chat.type.value if hasattr(message.chat.type, 'value') else str(message.chat.type)
@@ -243,8 +355,4 @@ def setup_user_handlers(app: Client):
                 # Notify
                 # await notification_service.notify_bot_added_to_chat(chat_id, chat_title, chat_type)
                 logger.info(f"Bot added to {chat_type}: {chat_id}")
-    
-    # Store reference to db in app for easy access
-    app.db = app.db if hasattr(app, 'db') else None
-    from database.mongo import db as mongodb
-    app.db = mongodb.db
+
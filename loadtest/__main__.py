@@ -0,0 +1,65 @@
+"""
+Offline load test of the bot against a fake Telegram API.
+
+    python -m loadtest start --users 5000
+    python -m loadtest join --users 20000 --taps 2 --channels 2 --latency 30
+    python -m loadtest broadcast --users 10000 --flood-wait-rate 0.001 --blocked-rate 0.05
+    python -m loadtest all --json
+
+Each scenario runs the real handlers with in-memory storage and prints
+throughput and p50/p99 latency per update (queue wait included).
+"""
+import argparse
+import asyncio
+import json
+from loadtest.harness import LoadHarness
+from loadtest.fake_telegram import FakeTelegram
+
+SCENARIOS = ["start", "join", "broadcast"]
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Offline load test against a fake Telegram API")
+    parser.add_argument("scenario", choices=SCENARIOS + ["all"])
+    parser.add_argument("--users", type=int, default=2000, help="synthetic users")
+    parser.add_argument("--rate", type=float, default=0, help="updates per second to feed, 0 for all at once")
+    parser.add_argument("--taps", type=int, default=1, help="join taps per user")
+    parser.add_argument("--channels", type=int, default=1, help="force subscribe channels for joins")
+    parser.add_argument("--referral-share", type=float, default=0.5, help="share of /start commands with a referral link")
+    parser.add_argument("--latency", type=float, default=20, help="fake API latency in ms")
+    parser.add_argument("--jitter", type=float, default=10, help="random +/- ms added to each call")
+    parser.add_argument("--flood-wait-rate", type=float, default=0.0, help="share of sends to users failing with FloodWait")
+    parser.add_argument("--flood-wait-seconds", type=int, default=1)
+    parser.add_argument("--blocked-rate", type=float, default=0.0, help="share of sends to users failing as blocked")
+    parser.add_argument("--member-rate", type=float, default=1.0, help="share of get_chat_member checks answered as member")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print one JSON report per scenario")
+    parser.add_argument("--verbose", action="store_true", help="keep the bot's INFO logs")
+    return parser.parse_args()
+
+async def run(args):
+    telegram = FakeTelegram(
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        flood_wait_rate=args.flood_wait_rate,
+        flood_wait_seconds=args.flood_wait_seconds,
+        blocked_rate=args.blocked_rate,
+        member_rate=args.member_rate,
+        seed=args.seed
+    )
+    harness = LoadHarness(telegram, quiet=not args.verbose)
+    await harness.start()
+    try:
+        scenarios = SCENARIOS if args.scenario == "all" else [args.scenario]
+        for scenario in scenarios:
+            if scenario == "start":
+                report = await harness.start_storm(args.users, args.referral_share, args.rate)
+            elif scenario == "join":
+                report = await harness.join_storm(args.users, args.taps, args.channels, args.rate)
+            else:
+                report = await harness.broadcast(args.users)
+            print(json.dumps(report.as_dict()) if args.json else report.format() + "\n")
+    finally:
+        await harness.stop()
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
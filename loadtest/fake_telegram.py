@@ -0,0 +1,167 @@
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from pyrogram import Client, raw, types
+from pyrogram.enums import ChatType, ChatMemberStatus
+from pyrogram.errors import FloodWait, UserIsBlocked
+
+# Client methods replaced by FakeTelegram.install
+FAKE_CLIENT_METHODS = [
+    "send_message",
+    "copy_message",
+    "edit_message_text",
+    "delete_messages",
+    "answer_callback_query",
+    "get_chat_member",
+    "get_chat",
+    "get_users",
+    "get_messages",
+    "get_me"
+]
+
+class FakeTelegram:
+    """
+    Local stand-in for the Telegram API behind a Pyrogram Client.
+    
+    Every call sleeps for latency (+ random jitter) and is counted. Sends
+    to users can fail with FloodWait (flood_wait_rate, retry after
+    flood_wait_seconds) or UserIsBlocked (blocked_rate). get_chat_member
+    reports every user as a member of every channel unless member_rate
+    is below 1. Chats in safe_chat_ids (admins) never fail.
+    """
+    
+    def __init__(self, latency=0.02, jitter=0.01, flood_wait_rate=0.0, flood_wait_seconds=1,
+                 blocked_rate=0.0, member_rate=1.0, safe_chat_ids=(), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_wait_rate = flood_wait_rate
+        self.flood_wait_seconds = flood_wait_seconds
+        self.blocked_rate = blocked_rate
+        self.member_rate = member_rate
+        self.safe_chat_ids = set(safe_chat_ids)
+        self.random = random.Random(seed)
+        self.message_ids = itertools.count(1)
+        self.calls = Counter()
+        self.errors = Counter()
+        self.client = None
+        self.me = None
+    
+    def install(self, app: Client, bot_id=1000, bot_username="loadtest_bot"):
+        """Replace the Telegram API methods of app with fakes (after instrument_client, so no real call slips through)"""
+        self.client = app
+        self.me = types.User(id=bot_id, is_bot=True, first_name="Load Test", username=bot_username)
+        app.me = self.me
+        for name in FAKE_CLIENT_METHODS:
+            setattr(app, name, getattr(self, name))
+        return self
+    
+    async def _call(self, method, chat_id=None):
+        self.calls[method] += 1
+        await asyncio.sleep(max(0, self.latency + self.random.uniform(-self.jitter, self.jitter)))
+        # Only private chats with users (positive ids) fail, like real blocked users
+        if isinstance(chat_id, int) and chat_id > 0 and chat_id not in self.safe_chat_ids:
+            roll = self.random.random()
+            if roll < self.flood_wait_rate:
+                self.errors["FloodWait"] += 1
+                raise FloodWait(value=self.flood_wait_seconds)
+            if roll < self.flood_wait_rate + self.blocked_rate:
+                self.errors["UserIsBlocked"] += 1
+                raise UserIsBlocked()
+    
+    def _chat(self, chat_id):
+        if isinstance(chat_id, int) and chat_id > 0:
+            return types.Chat(id=chat_id, type=ChatType.PRIVATE, first_name=f"User {chat_id}", client=self.client)
+        return types.Chat(id=chat_id, type=ChatType.CHANNEL, title=f"Channel {chat_id}", client=self.client)
+    
+    def _message(self, chat_id, text=None, reply_markup=None, message_id=None):
+        return types.Message(
+            id=message_id or next(self.message_ids),
+            chat=self._chat(chat_id),
+            from_user=self.me,
+            text=text,
+            reply_markup=reply_markup,
+            outgoing=True,
+            client=self.client
+        )
+    
+    async def send_message(self, chat_id, text, reply_markup=None, **kwargs):
+        await self._call("send_message", chat_id)
+        return self._message(chat_id, text, reply_markup)
+    
+    async def copy_message(self, chat_id, from_chat_id, message_id, reply_markup=None, **kwargs):
+        await self._call("copy_message", chat_id)
+        return self._message(chat_id, reply_markup=reply_markup)
+    
+    async def edit_message_text(self, chat_id, message_id, text, reply_markup=None, **kwargs):
+        await self._call("edit_message_text")
+        return self._message(chat_id, text, reply_markup, message_id)
+    
+    async def delete_messages(self, chat_id, message_ids, **kwargs):
+        await self._call("delete_messages")
+        return len(message_ids) if isinstance(message_ids, list) else 1
+    
+    async def answer_callback_query(self, callback_query_id, text=None, show_alert=None, **kwargs):
+        await self._call("answer_callback_query")
+        return True
+    
+    async def get_chat_member(self, chat_id, user_id):
+        await self._call("get_chat_member")
+        if user_id == "me" or self.random.random() < self.member_rate:
+            status = ChatMemberStatus.ADMINISTRATOR if user_id == "me" else ChatMemberStatus.MEMBER
+        else:
+            status = ChatMemberStatus.LEFT
+        user = self.me if user_id == "me" else types.User(id=user_id, first_name=f"User {user_id}")
+        return types.ChatMember(status=status, user=user, client=self.client)
+    
+    async def get_chat(self, chat_id):
+        await self._call("get_chat")
+        return self._chat(chat_id)
+    
+    async def get_users(self, user_ids):
+        await self._call("get_users")
+        if isinstance(user_ids, list):
+            return [types.User(id=user_id, first_name=f"User {user_id}") for user_id in user_ids]
+        return types.User(id=user_ids, first_name=f"User {user_ids}")
+    
+    async def get_messages(self, chat_id, message_ids=None, **kwargs):
+        await self._call("get_messages")
+        return self._message(chat_id, message_id=message_ids)
+    
+    async def get_me(self):
+        await self._call("get_me")
+        return self.me
+
+def raw_user(user_id):
+    return raw.types.User(id=user_id, access_hash=0, first_name=f"User {user_id}", username=f"user{user_id}", restriction_reason=[])
+
+def command_update(user_id, text, message_id):
+    """Raw update (update, users, chats) for a private text message, as Pyrogram's session queues it"""
+    message = raw.types.Message(
+        id=message_id,
+        peer_id=raw.types.PeerUser(user_id=user_id),
+        from_id=raw.types.PeerUser(user_id=user_id),
+        date=int(time.time()),
+        message=text,
+        entities=[]
+    )
+    update = raw.types.UpdateNewMessage(message=message, pts=message_id, pts_count=1)
+    return update, {user_id: raw_user(user_id)}, {}
+
+def callback_update(user_id, data, message_id, query_id, channel_id=None):
+    """Raw update (update, users, chats) for a tap on an inline button, in the user's chat or under a channel post"""
+    if channel_id is None:
+        peer = raw.types.PeerUser(user_id=user_id)
+    else:
+        # Bot API style -100... id to the raw channel id
+        peer = raw.types.PeerChannel(channel_id=-channel_id - 1000000000000)
+    update = raw.types.UpdateBotCallbackQuery(
+        query_id=query_id,
+        user_id=user_id,
+        peer=peer,
+        msg_id=message_id,
+        chat_instance=0,
+        data=data.encode()
+    )
+    return update, {user_id: raw_user(user_id)}, {}
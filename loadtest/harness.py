@@ -0,0 +1,285 @@
+import os
+
+# Offline run: in-memory storage and placeholder credentials, set before config is imported
+os.environ["STORAGE_BACKEND"] = "memory"
+for key, value in {
+    "API_ID": "1",
+    "API_HASH": "loadtest",
+    "BOT_TOKEN": "1:loadtest",
+    "LOG_CHANNEL": "-1000000000001",
+    "DB_URL": "mongodb://localhost",
+    "DB_NAME": "loadtest",
+    "ADMINS": "1"
+}.items():
+    os.environ.setdefault(key, value)
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from config import Config
+from database.memory import store
+from database.models import Giveaway, Settings, User, connect_storage, close_storage
+from loadtest.fake_telegram import FakeTelegram, command_update, callback_update
+from main import GiveawayBot
+from utils.callbacks import pack, JOIN_GIVEAWAY, BROADCAST_SELECT, BROADCAST_CONFIRM
+from utils.logger import logger
+from utils.metrics import model_latency
+from utils.tasks import background
+
+# Synthetic user ids start here, clear of admin ids
+FIRST_USER_ID = 10_000_000
+ANNOUNCEMENT_CHANNEL_ID = -1009000000000
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+class TrackingQueue:
+    """
+    Wraps the client's DispatchQueue and times each update from the moment it
+    is queued until its handler worker comes back for the next one.
+    """
+    
+    def __init__(self, queue):
+        self.queue = queue
+        # id(packet) -> perf_counter when queued
+        self.queued_at = {}
+        # worker task -> packet it is handling
+        self.handling = {}
+        self.latencies = []
+    
+    def qsize(self):
+        return self.queue.qsize()
+    
+    def empty(self):
+        return self.queue.empty()
+    
+    def put_nowait(self, packet):
+        if packet is not None:
+            self.queued_at[id(packet)] = time.perf_counter()
+        self.queue.put_nowait(packet)
+    
+    async def put(self, packet):
+        self.put_nowait(packet)
+    
+    async def get(self):
+        task = asyncio.current_task()
+        done = self.handling.pop(task, None)
+        if done is not None:
+            self.latencies.append(time.perf_counter() - self.queued_at.pop(id(done)))
+        packet = await self.queue.get()
+        if packet is not None:
+            self.handling[task] = packet
+        return packet
+    
+    def idle(self):
+        return self.queue.empty() and not self.handling
+    
+    def dropped(self):
+        """Updates the DispatchQueue dropped past their deadline (queued, never handled)"""
+        if not self.idle():
+            return 0
+        return len(self.queued_at)
+
+def storage_calls():
+    """Storage repository calls made so far, from the model latency histogram"""
+    return sum(entry[-1] for entry in model_latency.values.values())
+
+class LoadReport:
+    def __init__(self, name, updates, latencies, dropped, seconds, calls, errors, extra=None):
+        self.name = name
+        self.updates = updates
+        self.latencies = latencies
+        self.dropped = dropped
+        self.seconds = seconds
+        self.calls = calls
+        self.errors = errors
+        self.extra = extra or {}
+    
+    @property
+    def throughput(self):
+        return len(self.latencies) / self.seconds if self.seconds else 0.0
+    
+    def as_dict(self):
+        return {
+            "scenario": self.name,
+            "updates": self.updates,
+            "handled": len(self.latencies),
+            "dropped": self.dropped,
+            "seconds": round(self.seconds, 3),
+            "updates_per_second": round(self.throughput, 1),
+            "p50_ms": round(percentile(self.latencies, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 0.99) * 1000, 2),
+            "max_ms": round(max(self.latencies, default=0) * 1000, 2),
+            "api_calls": dict(self.calls),
+            "api_errors": dict(self.errors),
+            **self.extra
+        }
+    
+    def format(self):
+        report = self.as_dict()
+        lines = [
+            f"== {self.name} ==",
+            f"updates {report['updates']:,}  handled {report['handled']:,}  dropped {report['dropped']:,}  in {report['seconds']:.2f}s",
+            f"throughput {report['updates_per_second']:,.1f} updates/s",
+            f"latency p50 {report['p50_ms']:.1f}ms  p99 {report['p99_ms']:.1f}ms  max {report['max_ms']:.1f}ms"
+        ]
+        for key, value in self.extra.items():
+            lines.append(f"{key} {value:,}" if isinstance(value, (int, float)) else f"{key} {value}")
+        lines.append("api calls " + ", ".join(f"{name} {count:,}" for name, count in sorted(self.calls.items())))
+        if self.errors:
+            lines.append("api errors " + ", ".join(f"{name} {count:,}" for name, count in sorted(self.errors.items())))
+        return "\n".join(lines)
+
+class LoadHarness:
+    """
+    Runs the real bot (GiveawayBot with all its handlers, dispatch queue and
+    in-memory storage) against a FakeTelegram, feeding synthetic raw updates
+    the way Pyrogram's session does.
+    """
+    
+    def __init__(self, telegram: FakeTelegram, quiet=True):
+        self.telegram = telegram
+        self.quiet = quiet
+        self.bot = None
+        self.app = None
+        self.queue = None
+        self.ids = itertools.count(1)
+    
+    @property
+    def admin_id(self):
+        return Config.ADMINS[0]
+    
+    async def start(self):
+        if self.quiet:
+            logger.logger.setLevel(logging.WARNING)
+        store.reset()
+        self.bot = GiveawayBot()
+        self.app = self.bot.app
+        self.telegram.safe_chat_ids.update(Config.ADMINS)
+        self.telegram.install(self.app)
+        self.queue = TrackingQueue(self.app.dispatcher.updates_queue)
+        self.app.dispatcher.updates_queue = self.queue
+        await connect_storage()
+        await self.app.dispatcher.start()
+        # Let the handler registrations queued by add_handler run
+        await asyncio.sleep(0)
+    
+    async def stop(self):
+        await self.app.dispatcher.stop()
+        await background.drain(Config.SHUTDOWN_TIMEOUT)
+        close_storage()
+    
+    async def run(self, name, packets, rate=0, timeout=600, extra=None, settled=None):
+        """Feed packets (at rate updates/s, 0 for all at once), wait until all are handled (and settled() is true) and report"""
+        self.queue.latencies = []
+        self.queue.queued_at.clear()
+        calls = Counter(self.telegram.calls)
+        errors = Counter(self.telegram.errors)
+        calls_before = storage_calls()
+        started = time.perf_counter()
+        
+        for index, packet in enumerate(packets):
+            if rate:
+                delay = started + index / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self.queue.put_nowait(packet)
+        
+        deadline = time.monotonic() + timeout
+        while not self.queue.idle() or (settled is not None and not settled()):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{name}: {self.queue.qsize()} updates still queued after {timeout}s")
+            await asyncio.sleep(0.005)
+        
+        report = LoadReport(
+            name,
+            len(packets),
+            list(self.queue.latencies),
+            self.queue.dropped(),
+            time.perf_counter() - started,
+            self.telegram.calls - calls,
+            self.telegram.errors - errors,
+            extra
+        )
+        report.extra["storage_calls"] = storage_calls() - calls_before
+        return report
+    
+    def _user_ids(self, users):
+        return range(FIRST_USER_ID, FIRST_USER_ID + users)
+    
+    async def start_storm(self, users, referral_share=0.5, rate=0):
+        """Every user sends /start once; a share of them arrive through a referral link"""
+        packets = []
+        for index, user_id in enumerate(self._user_ids(users)):
+            text = "/start"
+            if index and index / users < referral_share:
+                text = f"/start ref_{user_id - 1}"
+            packets.append(command_update(user_id, text, next(self.ids)))
+        report = await self.run("start_storm", packets, rate)
+        report.extra["users_stored"] = User.count_users()
+        return report
+    
+    async def join_storm(self, users, taps=1, channels=1, rate=0):
+        """Every user taps Join on the active giveaway taps times, with channels force subscribe channels"""
+        for index in range(channels):
+            channel_id = -1001000000000 - index
+            Settings.add_force_channel(channel_id, f"@loadtest_channel_{index}")
+        Settings.update_setting("force_subscribe", channels > 0)
+        self.app.force_subscribe_service.load_force_settings()
+        giveaway_id = f"LOAD{next(self.ids)}"
+        Giveaway.create_giveaway(
+            giveaway_id, "Load test prize", "", datetime.now() + timedelta(days=1), 1, self.admin_id
+        )
+        # Every tap comes from one announcement post, which Pyrogram keeps in its
+        # message cache after sending it, as the bot does on a real launch
+        post = await self.app.send_message(ANNOUNCEMENT_CHANNEL_ID, "Load test announcement")
+        self.app.message_cache[(ANNOUNCEMENT_CHANNEL_ID, post.id)] = post
+        data = pack(JOIN_GIVEAWAY)
+        packets = [
+            callback_update(user_id, data, post.id, next(self.ids), ANNOUNCEMENT_CHANNEL_ID)
+            for _ in range(taps)
+            for user_id in self._user_ids(users)
+        ]
+        started = time.perf_counter()
+        calls_before = self.telegram.calls["send_message"]
+        report = await self.run("join_storm", packets, rate)
+        # Taps acknowledged with a queue notice finish their join in the admission queue
+        while not self.app.join_admission.idle():
+            await asyncio.sleep(0.005)
+        report.extra["joins_done_seconds"] = round(time.perf_counter() - started, 3)
+        # Result messages of queued joins go out at JOIN_RESULT_RATE
+        while not background.idle():
+            await asyncio.sleep(0.005)
+        report.extra["results_sent_seconds"] = round(time.perf_counter() - started, 3)
+        report.extra["result_messages"] = self.telegram.calls["send_message"] - calls_before
+        report.extra["participants"] = Giveaway.get_participants_count(giveaway_id)
+        Giveaway.end_giveaway(giveaway_id)
+        return report
+    
+    async def broadcast(self, users):
+        """The admin broadcasts a text message to users registered users"""
+        for user_id in self._user_ids(users):
+            User.add_user(user_id)
+        admin_id = self.admin_id
+        await self.run("broadcast_prepare", [command_update(admin_id, "/broadcast Load test", next(self.ids))])
+        await self.run("broadcast_select", [callback_update(admin_id, pack(BROADCAST_SELECT, "users"), next(self.ids), next(self.ids))])
+        # The send loop finishes in a background task after the confirm handler returns
+        report = await self.run(
+            "broadcast", [callback_update(admin_id, pack(BROADCAST_CONFIRM), next(self.ids), next(self.ids))],
+            settled=background.idle
+        )
+        result = store.broadcasts[max(store.broadcasts)]
+        deliveries = result["success"] + result["failed"] + result["blocked"]
+        report.extra["recipients"] = User.count_users()
+        report.extra["delivered"] = result["success"]
+        report.extra["failed"] = result["failed"]
+        report.extra["blocked"] = result["blocked"]
+        report.extra["deliveries_per_second"] = round(deliveries / report.seconds, 1) if report.seconds else 0.0
+        return report
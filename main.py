@@ -1,35 +1,74 @@
 import asyncio
+import hashlib
+import json
 import os
+import time
+
+# Taken before the heavy imports so the startup report includes them
+PROCESS_STARTED = time.perf_counter()
+
 from pyrogram import Client, idle
 from pyrogram.enums import ParseMode
-from database.mongo import db
+from database.models import Settings, connect_storage, close_storage
 from handlers.user import setup_user_handlers
 from handlers.admin import setup_admin_handlers
 from handlers.giveaway import setup_giveaway_handlers
+from handlers.forcesubscribe import setup_force_subscribe_handlers, get_force_subscribe_service
+from handlers.antiflood import setup_antiflood_handlers
+from handlers.botlog import log_digest
 # from handlers.broadcast import setup_broadcast_handlers
 # from services.notification import NotificationService
 from config import Config
 from utils.logger import logger
+from utils.tracing import instrument_client
+from utils.metrics import start_metrics_server, registry
+from utils.watchdog import LoopWatchdog
+from utils.dispatch import install_dispatch_queue
+from utils.tasks import background
+from utils.callbacks import setup_callback_router
 from pyrogram.types import BotCommand, BotCommandScopeChat, BotCommandScopeDefault
-                
+
+startup_seconds = registry.gauge("bot_startup_seconds", "Time spent in each startup phase", ["phase"])
+
+def command_hash(commands):
+    """Stable hash of a command menu, to skip pushing an unchanged one"""
+    payload = json.dumps([[command.command, command.description] for command in commands])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
 
 class GiveawayBot:
     def __init__(self):
+        init_started = time.perf_counter()
+        self.startup_timings = {"imports": init_started - PROCESS_STARTED}
+        
         self.app = Client(
             "giveaway_bot",
             api_id=Config.API_ID,
             api_hash=Config.API_HASH,
             bot_token=Config.BOT_TOKEN,
-            parse_mode=ParseMode.MARKDOWN
+            parse_mode=ParseMode.MARKDOWN,
+            workers=Config.DISPATCH_WORKERS
         )
         
+        # Correlation ids and timings for every handler and API call
+        instrument_client(self.app)
+        
+        # Per-user ordered queues on shared workers; fresh callbacks first, updates past their deadline dropped
+        install_dispatch_queue(self.app)
+        
         # Setup handlers
+        setup_antiflood_handlers(self.app)
         setup_user_handlers(self.app)
         setup_admin_handlers(self.app)
         setup_giveaway_handlers(self.app)
+        setup_force_subscribe_handlers(self.app)
+        # One dict-dispatched handler for every callback query
+        setup_callback_router(self.app)
         # setup_broadcast_handlers(self.app)
         # self.setup_system_handlers()
         
+        self.watchdog = LoopWatchdog()
+        
+        self.startup_timings["init"] = time.perf_counter() - init_started
         logger.info("Bot initialized successfully")
     
     # def setup_system_handlers(self):
@@ -54,18 +93,48 @@ class GiveawayBot:
     #                 )
     #                 logger.info(f"Bot added to {chat.type.value}: {chat.title} ({chat.id})")
     
+    async def _timed(self, phase, awaitable):
+        """Await a startup phase and record how long it took"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.startup_timings[phase] = time.perf_counter() - started
+    
+    def report_startup(self):
+        """Log and export how long each startup phase took"""
+        total = time.perf_counter() - PROCESS_STARTED
+        for phase, seconds in self.startup_timings.items():
+            startup_seconds.set(seconds, phase=phase)
+        startup_seconds.set(total, phase="total")
+        logger.info(
+            "[STARTUP] Ready in %.2fs (%s)",
+            total, ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_timings.items())
+        )
+    
     async def start(self):
         """Start the bot"""
-        await self.app.start()
+        self.watchdog.start()
+        
+        # Storage (settings and indexes) must be ready before Client.start() starts dispatching updates to handlers
+        await self._timed("storage.connect", connect_storage())
+        # Member updates from force channels are tracked from the first one on
+        get_force_subscribe_service(self.app).load_force_settings()
+        await self._timed("app.start", self.app.start())
         
-        bot_info = await self.app.get_me()
-        logger.info(f"Bot started: @{bot_info.username}")
+        # Client.start() resolves the bot's identity once; handlers use client.me instead of get_me()
+        logger.info(f"Bot started: @{self.app.me.username}")
         
         # Set bot commands
-        await self.set_commands()
+        await self._timed("set_commands", self.set_commands())
+        
+        if Config.METRICS_PORT:
+            await self._timed("metrics", start_metrics_server(Config.METRICS_HOST, Config.METRICS_PORT))
+        
+        self.report_startup()
         
-        print(f"[OK] Bot is running as @{bot_info.username}")
-        print(f"[INFO] MongoDB: Connected")
+        print(f"[OK] Bot is running as @{self.app.me.username}")
+        print(f"[INFO] Storage: {Config.STORAGE_BACKEND}")
         print(f"[INFO] Admins: {len(Config.ADMINS)}")
         print("\n[OK] Bot is ready to receive messages!\n")
         print("[INFO] Press Ctrl+C to stop the bot\n")
@@ -105,25 +174,52 @@ class GiveawayBot:
             BotCommand("addadmin", "Add new admin"),
             BotCommand("removeadmin", "Remove admin"),
             BotCommand("settings", "Bot settings"),
-            BotCommand("admins", "View admin list")
+            BotCommand("admins", "View admin list"),
+            BotCommand("profile", "Profile the running bot")
         ]
         
-        # Set default commands for all users
-        await self.app.set_bot_commands(user_commands, scope=BotCommandScopeDefault())
-        
-        # Set admin commands for each admin user
+        # Default commands for all users, admin commands for each admin user
+        scopes = {"default": (user_commands, BotCommandScopeDefault())}
         for admin_id in Config.ADMINS:
-            try:
-                await self.app.set_bot_commands(admin_commands, scope=BotCommandScopeChat(admin_id))
-            except Exception as e:
-                logger.warning(f"Could not set commands for admin {admin_id}: {e}")
+            scopes[f"admin_{admin_id}"] = (admin_commands, BotCommandScopeChat(admin_id))
+        
+        # Only push menus that changed since the last successful push
+        pushed_hashes = Settings.get_settings().get("command_hashes", {})
+        hashes = {key: command_hash(commands) for key, (commands, scope) in scopes.items()}
+        changed = [key for key in scopes if pushed_hashes.get(key) != hashes[key]]
+        if not changed:
+            logger.info("Bot commands unchanged, skipping sync")
+            return
+        
+        results = await asyncio.gather(
+            *(self.app.set_bot_commands(scopes[key][0], scope=scopes[key][1]) for key in changed),
+            return_exceptions=True
+        )
+        
+        failed = 0
+        for key, result in zip(changed, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not set commands for {key}: {result}")
+                # Keep the old hash so the next start retries this scope
+                hashes[key] = pushed_hashes.get(key)
+                failed += 1
         
-        logger.info("Bot commands set successfully")
+        Settings.update_setting("command_hashes", {key: value for key, value in hashes.items() if value})
+        logger.info("Bot commands set for %s scope(s), %s failed", len(changed) - failed, failed)
     
     async def stop(self):
         """Stop the bot"""
+        self.watchdog.stop()
+        # Stop taking updates, then let queued joins and the messages, broadcasts and announcements started by handlers finish
+        await self.app.dispatcher.stop()
+        await self.app.join_admission.drain(Config.SHUTDOWN_TIMEOUT)
+        # Write registrations still waiting for their batch; their start logs join the background tasks
+        await self.app.user_registrations.flush()
+        await background.drain(Config.SHUTDOWN_TIMEOUT)
+        # Post the pending log digest while the client is still connected
+        await log_digest.flush(self.app)
         await self.app.stop()
-        db.close()
+        close_storage()
         logger.info("Bot stopped")
 
 async def main():
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from utils.logger import logger, correlation_id
+from utils.metrics import registry
+from utils.tasks import create_detached_task
+
+admission_depth = registry.gauge("bot_admission_queue_depth", "Jobs waiting for an admission worker", ["queue"])
+admission_active = registry.gauge("bot_admission_active", "Jobs being run by admission workers", ["queue"])
+admission_wait = registry.histogram("bot_admission_wait_seconds", "Time a job waited for an admission worker", ["queue"])
+admission_rejected = registry.counter("bot_admission_rejected_total", "Jobs turned away because the admission queue was full", ["queue"])
+
+class AdmissionQueue:
+    """
+    Bounded queue of jobs run by a fixed pool of worker tasks.
+    
+    Handlers submit the slow part of their work and get a future back, so a
+    burst is worked off at the pool's pace instead of every update holding a
+    handler worker until it finishes. When the queue is full, submit raises
+    asyncio.QueueFull and the caller should turn the request away. On
+    shutdown, drain waits for the queued jobs and then stops the workers.
+    """
+    
+    def __init__(self, name, workers, maxsize):
+        self.name = name
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize)
+        self.tasks = []
+        self.active = 0
+    
+    def _start_workers(self):
+        # Started on first use, from inside the running event loop
+        if not self.tasks:
+            self.tasks = [create_detached_task(self._worker()) for _ in range(self.workers)]
+    
+    def saturated(self):
+        """True if a job submitted now would have to wait for a worker"""
+        return self.active + self.queue.qsize() >= self.workers
+    
+    def idle(self):
+        return self.active == 0 and self.queue.empty()
+    
+    def submit(self, func):
+        """Queue func() for a worker and return a future of its result; raises asyncio.QueueFull"""
+        self._start_workers()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((time.monotonic(), correlation_id.get(), func, future))
+        except asyncio.QueueFull:
+            admission_rejected.inc(queue=self.name)
+            raise
+        admission_depth.inc(queue=self.name)
+        return future
+    
+    async def drain(self, timeout):
+        """Wait up to timeout seconds for queued and running jobs, then stop the workers and cancel what is left"""
+        if self.tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "[ADMISSION] %s: cancelling %s queued and %s running jobs after %ss",
+                    self.name, self.queue.qsize(), self.active, timeout
+                )
+            for task in self.tasks:
+                task.cancel()
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+            self.tasks = []
+        
+        # Jobs that never ran resolve as cancelled, so their callers stop waiting
+        while not self.queue.empty():
+            _, _, _, future = self.queue.get_nowait()
+            self.queue.task_done()
+            admission_depth.dec(queue=self.name)
+            future.cancel()
+    
+    async def _worker(self):
+        while True:
+            submitted, job_id, func, future = await self.queue.get()
+            admission_depth.dec(queue=self.name)
+            admission_wait.observe(time.monotonic() - submitted, queue=self.name)
+            if future.cancelled():
+                self.queue.task_done()
+                continue
+            
+            # The job logs under the id of the update that submitted it
+            correlation_id.set(job_id)
+            self.active += 1
+            admission_active.inc(queue=self.name)
+            try:
+                result = await func()
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                logger.limited(("admission_failed", self.name), "[ADMISSION] %s job failed: %s", self.name, e)
+                if not future.done():
+                    future.set_exception(e)
+            except asyncio.CancelledError:
+                # Stopped by drain mid-job
+                future.cancel()
+                raise
+            finally:
+                self.active -= 1
+                admission_active.dec(queue=self.name)
+                self.queue.task_done()
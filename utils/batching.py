@@ -0,0 +1,115 @@
+import asyncio
+import time
+from utils.logger import logger
+from utils.metrics import registry
+
+batch_size = registry.histogram(
+    "bot_batch_size",
+    "Items written per batch flush",
+    ["batch"],
+    (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+batch_flush_seconds = registry.histogram("bot_batch_flush_seconds", "Time spent writing one batch", ["batch"])
+batch_failures = registry.counter("bot_batch_failures_total", "Batch flushes that raised", ["batch"])
+
+class Batcher:
+    """
+    Collects items for up to max_delay seconds (or max_size items) and hands
+    them to flush(items) in one call, so a burst costs one write per batch
+    instead of one per item.
+    
+    flush returns one result per item, in order; submit returns a future of
+    the item's result. With in_thread=True the write runs in a worker thread
+    (for blocking drivers such as pymongo) so it never stalls the event
+    loop. If flush raises, the batch is queued again after retry_delay
+    seconds, up to retries times; after that every future in the batch gets
+    the exception.
+    """
+    
+    def __init__(self, name, flush, max_size, max_delay, in_thread=False, retries=3, retry_delay=1.0):
+        self.name = name
+        self._write = flush
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.in_thread = in_thread
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # (item, future, failed attempts)
+        self.pending = []
+        self.timer = None
+        # Writes in progress, awaited by flush()
+        self.writing = set()
+    
+    def submit(self, item):
+        """Queue item for the next flush and return a future of its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((item, future, 0))
+        if len(self.pending) >= self.max_size:
+            # Flushed on the next loop pass, not inside the submitting handler
+            self._schedule(loop.call_soon)
+        elif self.timer is None:
+            self._schedule(lambda callback: loop.call_later(self.max_delay, callback))
+        return future
+    
+    def _schedule(self, call):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = call(self._start_write)
+    
+    def _start_write(self):
+        """Write the pending items in a task of their own"""
+        self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self._write_batch(batch))
+            self.writing.add(task)
+            task.add_done_callback(self.writing.discard)
+    
+    async def flush(self):
+        """Write all pending items now, retries included, and wait until every write is done"""
+        while self.pending or self.writing:
+            if self.writing:
+                await asyncio.gather(*self.writing, return_exceptions=True)
+                continue
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            batch, self.pending = self.pending, []
+            failed = await self._write_batch(batch)
+            if failed and self.pending:
+                # Retried after the same pause as a timed retry
+                await asyncio.sleep(self.retry_delay)
+    
+    async def _write_batch(self, batch):
+        """Write one batch and resolve its futures; returns True if it failed and was queued again"""
+        items = [item for item, _, _ in batch]
+        started = time.perf_counter()
+        try:
+            if self.in_thread:
+                results = await asyncio.to_thread(self._write, items)
+            else:
+                results = self._write(items)
+        except Exception as e:
+            batch_failures.inc(batch=self.name)
+            retry = [(item, future, attempts + 1) for item, future, attempts in batch if attempts < self.retries]
+            logger.limited(
+                ("batch_failed", self.name),
+                "[BATCH] %s flush of %s items failed, retrying %s: %s",
+                self.name, len(batch), len(retry), e
+            )
+            for _, future, attempts in batch:
+                if attempts >= self.retries and not future.done():
+                    future.set_exception(e)
+            if retry:
+                self.pending = retry + self.pending
+                self._schedule(lambda callback: asyncio.get_running_loop().call_later(self.retry_delay, callback))
+            return bool(retry)
+        finally:
+            batch_flush_seconds.observe(time.perf_counter() - started, batch=self.name)
+            batch_size.observe(len(batch), batch=self.name)
+        
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        return False
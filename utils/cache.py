@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Size-bounded LRU cache where every entry carries its own TTL"""
+    
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, default=None):
+        """Get a cached value, or default if missing or expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return default
+        
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key, value, ttl):
+        """Cache a value for ttl seconds, evicting the least recently used entry when full"""
+        self.entries[key] = (value, time.monotonic() + ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, key):
+        """Drop a cached value"""
+        self.entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all cached values"""
+        self.entries.clear()
+    
+    def stats(self):
+        """Get cache size and hit-rate counters"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
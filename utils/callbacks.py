@@ -0,0 +1,107 @@
+from pyrogram import Client
+from pyrogram.types import CallbackQuery
+from utils.logger import logger
+from utils.metrics import registry
+from utils.tracing import traced_handler
+
+# Action codes; callback_data is "<code>" or "<code>:<arg>:<arg>..."
+JOIN_GIVEAWAY = "j"
+CHECK_SUBSCRIPTION = "cs"
+CLOSE = "x"
+BROADCAST_SELECT = "bs"
+BROADCAST_CONFIRM = "bc"
+BROADCAST_CANCEL = "bx"
+END_AUTO_ANNOUNCE = "ea"
+END_MANUAL_ANNOUNCE = "em"
+ANNOUNCE_WINNER = "aw"
+ADMIN_PANEL = "ap"
+SETTING = "st"
+END_GIVEAWAY = "eg"
+REROLL_GIVEAWAY = "rg"
+PARTICIPANTS = "pp"
+CONFIRM = "ok"
+CANCEL = "no"
+
+# Telegram rejects callback_data longer than 64 bytes
+MAX_CALLBACK_DATA = 64
+
+# Buttons posted before the compact format still carry the old data
+LEGACY_ACTIONS = {
+    "join_giveaway": JOIN_GIVEAWAY,
+    "check_subscription": CHECK_SUBSCRIPTION,
+    "close": CLOSE,
+    "broadcast_confirm": BROADCAST_CONFIRM,
+    "broadcast_cancel": BROADCAST_CANCEL
+}
+LEGACY_PREFIXES = {
+    "broadcast_select_": BROADCAST_SELECT,
+    "end_auto_announce_": END_AUTO_ANNOUNCE,
+    "end_manual_announce_": END_MANUAL_ANNOUNCE,
+    "announce_winner_": ANNOUNCE_WINNER
+}
+
+unrouted_callbacks = registry.counter("bot_callback_unrouted_total", "Callback queries with no route for their action")
+
+def pack(action, *args):
+    """Build callback_data for an action and its arguments"""
+    data = ":".join([action, *(str(arg) for arg in args)])
+    if len(data.encode()) > MAX_CALLBACK_DATA:
+        raise ValueError(f"callback_data too long ({len(data.encode())} bytes): {data}")
+    return data
+
+def unpack(data):
+    """Split callback_data into (action, [args]), understanding the legacy format"""
+    if isinstance(data, bytes):
+        data = data.decode(errors="replace")
+    action, *args = data.split(":")
+    legacy = LEGACY_ACTIONS.get(action)
+    if legacy:
+        return legacy, args
+    if not args:
+        for prefix, code in LEGACY_PREFIXES.items():
+            if action.startswith(prefix):
+                return code, [action[len(prefix):]]
+    return action, args
+
+class CallbackRouter:
+    """
+    Routes every callback query through one handler with a dict lookup on
+    its action code. Route callbacks receive the packed arguments after the
+    callback query: callback(client, callback_query, *args).
+    """
+    
+    def __init__(self):
+        self.routes = {}
+    
+    def route(self, action):
+        """Decorator registering the callback for an action code"""
+        def decorator(callback):
+            if action in self.routes:
+                raise ValueError(f"Callback action {action!r} is already routed")
+            self.routes[action] = traced_handler(callback)
+            return callback
+        return decorator
+    
+    async def dispatch(self, client: Client, callback_query: CallbackQuery):
+        action, args = unpack(callback_query.data or "")
+        callback = self.routes.get(action)
+        if callback is None:
+            unrouted_callbacks.inc()
+            logger.limited(("callback_unrouted", action), "[CALLBACK] No route for %r", callback_query.data)
+            await callback_query.answer()
+            return
+        await callback(client, callback_query, *args)
+
+def get_callback_router(app: Client):
+    """Get the CallbackRouter shared by all handlers of a client"""
+    if not hasattr(app, "callback_router"):
+        app.callback_router = CallbackRouter()
+    return app.callback_router
+
+def setup_callback_router(app: Client):
+    """Register the single callback query handler that feeds the router"""
+    router = get_callback_router(app)
+    
+    @app.on_callback_query()
+    async def dispatch_callback(client: Client, callback_query: CallbackQuery):
+        await router.dispatch(client, callback_query)
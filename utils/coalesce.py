@@ -0,0 +1,51 @@
+import asyncio
+from utils.cache import TTLCache
+from utils.metrics import registry
+
+coalesced = registry.counter(
+    "bot_coalesced_total",
+    "Calls answered from another caller's in-flight call or a recent result",
+    ["name", "source"]
+)
+
+class Coalescer:
+    """
+    Runs at most one call per key at a time: concurrent callers with the same
+    key await the first caller's result instead of repeating the work.
+    Results the caller chooses to remember() answer repeats until they expire.
+    """
+    
+    def __init__(self, name, ttl, maxsize=100000):
+        self.name = name
+        self.ttl = ttl
+        self.in_flight = {}
+        self.recent = TTLCache(maxsize)
+    
+    async def run(self, key, func):
+        """Return a remembered result for key, join the in-flight call, or start func()"""
+        result = self.recall(key)
+        if result is not None:
+            return result
+        
+        task = self.in_flight.get(key)
+        if task is not None:
+            coalesced.inc(name=self.name, source="in_flight")
+        else:
+            task = asyncio.ensure_future(func())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        
+        # Shielded so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    def recall(self, key):
+        """Return the remembered result for key, or None"""
+        result = self.recent.get(key)
+        if result is not None:
+            coalesced.inc(name=self.name, source="recent")
+        return result
+    
+    def remember(self, key, result):
+        """Answer calls for key with result for the next ttl seconds"""
+        if self.ttl > 0:
+            self.recent.set(key, result, self.ttl)
@@ -0,0 +1,72 @@
+import asyncio
+import collections
+import time
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from utils.logger import logger
+from utils.metrics import registry
+from utils.tasks import background
+
+paced_depth = registry.gauge("bot_paced_send_queue_depth", "Messages waiting for a paced sender", ["sender"])
+
+async def send_to_many(client: Client, chat_ids, text, log_prefix="[DELIVERY]", **kwargs):
+    """Send the same text to many chats, waiting out FloodWait once per chat"""
+    success = 0
+    failed = 0
+    
+    for chat_id in chat_ids:
+        try:
+            try:
+                await client.send_message(chat_id, text, **kwargs)
+            except FloodWait as e:
+                logger.warning("%s FloodWait %ss while sending to %s", log_prefix, e.value, chat_id)
+                await asyncio.sleep(e.value)
+                await client.send_message(chat_id, text, **kwargs)
+            success += 1
+        except Exception as e:
+            failed += 1
+            logger.limited((log_prefix, "send_failed"), "%s Failed to send to %s: %s", log_prefix, chat_id, e)
+    
+    logger.info("%s Delivered to %s/%s chats", log_prefix, success, success + failed)
+    return success, failed
+
+class PacedSender:
+    """
+    Sends queued messages from one background task at no more than rate per
+    second, so a burst of result messages stays under Telegram's bulk limit
+    instead of tripping FloodWait. A FloodWait pauses the whole sender and
+    the message is retried once, as in send_to_many.
+    """
+    
+    def __init__(self, client: Client, name, rate, log_prefix="[DELIVERY]"):
+        self.client = client
+        self.name = name
+        self.delay = 1 / rate
+        self.log_prefix = log_prefix
+        self.pending = collections.deque()
+        self.task = None
+    
+    def send(self, chat_id, text, **kwargs):
+        """Queue a message; the sender task starts when there is something to send"""
+        self.pending.append((chat_id, text, kwargs))
+        paced_depth.inc(sender=self.name)
+        if self.task is None or self.task.done():
+            # Tracked, so shutdown waits for queued messages
+            self.task = background.spawn(self._run())
+    
+    async def _run(self):
+        while self.pending:
+            chat_id, text, kwargs = self.pending.popleft()
+            paced_depth.dec(sender=self.name)
+            # The send's own round trip counts towards the gap before the next one
+            next_send = time.monotonic() + self.delay
+            try:
+                try:
+                    await self.client.send_message(chat_id, text, **kwargs)
+                except FloodWait as e:
+                    logger.warning("%s FloodWait %ss while sending to %s", self.log_prefix, e.value, chat_id)
+                    await asyncio.sleep(e.value)
+                    await self.client.send_message(chat_id, text, **kwargs)
+            except Exception as e:
+                logger.limited((self.log_prefix, "send_failed"), "%s Failed to send to %s: %s", self.log_prefix, chat_id, e)
+            await asyncio.sleep(max(0, next_send - time.monotonic()))
@@ -0,0 +1,193 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import time
+import uuid
+from pyrogram import raw
+from config import Config
+from utils.logger import logger, correlation_id
+from utils.metrics import registry
+
+# Lower value is served first
+PRIORITY_CALLBACK = 0
+PRIORITY_MESSAGE = 1
+PRIORITY_LOW = 2
+
+# Commands that can wait (or be dropped) when the bot is overloaded
+LOW_PRIORITY_COMMANDS = ["help", "winners", "refer"]
+
+dispatch_queue_depth = registry.gauge("bot_dispatch_queue_depth", "Updates waiting for a handler worker", ["kind"])
+dispatch_wait = registry.histogram("bot_dispatch_wait_seconds", "Update age when picked up by a handler worker", ["kind"])
+dispatch_dropped = registry.counter("bot_dispatch_dropped_total", "Updates dropped because they were past their deadline", ["kind"])
+worker_busy = registry.gauge("bot_dispatch_worker_busy", "1 while a handler worker is handling an update", ["worker"])
+worker_busy_seconds = registry.counter("bot_dispatch_worker_busy_seconds_total", "Time a handler worker spent handling updates", ["worker"])
+worker_updates = registry.counter("bot_dispatch_worker_updates_total", "Updates handled per handler worker", ["worker"])
+
+def command_name(text):
+    """Lowercase command of a "/command@bot args" text, or None"""
+    if not text or not text.startswith("/"):
+        return None
+    parts = text[1:].split(maxsplit=1)
+    return parts[0].split("@", 1)[0].lower() if parts else None
+
+def classify_update(update):
+    """Return (kind, priority, sent_at, deadline) for a raw update"""
+    now = time.time()
+    if isinstance(update, (raw.types.UpdateBotCallbackQuery, raw.types.UpdateInlineBotCallbackQuery)):
+        return "callback", PRIORITY_CALLBACK, now, Config.DISPATCH_CALLBACK_DEADLINE
+    
+    if isinstance(update, (raw.types.UpdateNewMessage, raw.types.UpdateNewChannelMessage)):
+        message = update.message
+        # Telegram's send time, so updates that were already late on arrival count as late
+        sent_at = min(getattr(message, "date", None) or now, now)
+        if command_name(getattr(message, "message", None)) in LOW_PRIORITY_COMMANDS:
+            return "low", PRIORITY_LOW, sent_at, Config.DISPATCH_LOW_PRIORITY_DEADLINE
+        return "message", PRIORITY_MESSAGE, sent_at, Config.DISPATCH_MESSAGE_DEADLINE
+    
+    return "other", PRIORITY_MESSAGE, now, 0
+
+def update_user_id(update):
+    """User id a raw update belongs to, or None"""
+    user_id = getattr(update, "user_id", None)
+    if user_id is not None:
+        return user_id
+    message = getattr(update, "message", None)
+    peer = getattr(message, "from_id", None) or getattr(message, "peer_id", None)
+    return getattr(peer, "user_id", None)
+
+class DispatchQueue:
+    """
+    Drop-in replacement for Pyrogram's dispatcher updates queue.
+    
+    Each user's updates wait in their own FIFO, and a user is handled by at
+    most one worker at a time, so one user's updates run strictly in the
+    order they arrived (a double-tapped "Join" runs after the first tap
+    finishes). Any idle worker takes the next ready user, so a slow handler
+    only holds up the user it belongs to. Updates without a user have no
+    order to keep and go to any worker.
+    
+    Among ready users, those whose next update is an interactive callback are
+    served first and low-value commands last. Updates that are older than
+    their deadline when a worker picks them up are dropped instead of
+    handled, so under overload the bot keeps answering fresh taps rather
+    than falling uniformly behind. A deadline of 0 disables dropping for that
+    kind.
+    """
+    
+    def __init__(self, workers):
+        self.workers = workers
+        # user key -> deque of (priority, seq, sent_at, kind, deadline, packet)
+        self.pending = {}
+        # (priority, seq, user key) of each user with pending updates that no worker holds
+        self.ready = []
+        # worker task -> user key of the update it is handling
+        self.holding = {}
+        self.not_empty = asyncio.Event()
+        self.counter = itertools.count()
+        self.size = 0
+        self.stops = 0
+        # worker task -> index used as the metrics label, bound on the worker's first get()
+        self.worker_ids = {}
+        self.busy_since = {}
+    
+    def qsize(self):
+        return self.size
+    
+    def empty(self):
+        return self.size == 0
+    
+    def _make_ready(self, key):
+        updates = self.pending.get(key)
+        if updates:
+            priority, seq = updates[0][:2]
+            heapq.heappush(self.ready, (priority, seq, key))
+            self.not_empty.set()
+    
+    def put_nowait(self, packet):
+        if packet is None:
+            # Dispatcher.stop puts one stop sentinel per worker, served once no update is waiting, as Pyrogram's FIFO does
+            self.stops += 1
+            self.not_empty.set()
+            return
+        
+        kind, priority, sent_at, deadline = classify_update(packet[0])
+        seq = next(self.counter)
+        user_id = update_user_id(packet[0])
+        key = user_id if user_id is not None else ("no_user", seq)
+        
+        updates = self.pending.get(key)
+        if updates is None:
+            updates = self.pending[key] = collections.deque()
+        updates.append((priority, seq, sent_at, kind, deadline, packet))
+        self.size += 1
+        dispatch_queue_depth.inc(kind=kind)
+        # A user that already waits or is being handled keeps their place; this update runs after their earlier ones
+        if len(updates) == 1 and key not in self.holding.values():
+            self._make_ready(key)
+    
+    async def put(self, packet):
+        self.put_nowait(packet)
+    
+    def _release(self, task):
+        """The worker is back for more, so its previous update is done and its user can go to any worker"""
+        key = self.holding.pop(task, None)
+        if key is not None:
+            self._make_ready(key)
+        
+        worker = self.worker_ids.get(task)
+        started = self.busy_since.pop(task, None)
+        if started is not None:
+            worker_busy_seconds.inc(time.monotonic() - started, worker=worker)
+            worker_busy.set(0, worker=worker)
+    
+    async def get(self):
+        task = asyncio.current_task()
+        worker = self.worker_ids.setdefault(task, len(self.worker_ids))
+        self._release(task)
+        
+        while True:
+            if not self.ready and self.stops:
+                # Users still held by other workers become ready when those workers come back, and are handled by them
+                self.stops -= 1
+                self.worker_ids.pop(task, None)
+                return None
+            if not self.ready:
+                self.not_empty.clear()
+                await self.not_empty.wait()
+                continue
+            
+            _, _, key = heapq.heappop(self.ready)
+            updates = self.pending[key]
+            _, _, sent_at, kind, deadline, packet = updates.popleft()
+            if not updates:
+                del self.pending[key]
+            self.size -= 1
+            dispatch_queue_depth.dec(kind=kind)
+            
+            age = max(0.0, time.time() - sent_at)
+            dispatch_wait.observe(age, kind=kind)
+            if deadline and age > deadline:
+                dispatch_dropped.inc(kind=kind)
+                logger.limited(
+                    ("dispatch_dropped", kind),
+                    "[DISPATCH] Dropped %s update %.1fs past its %ss deadline (%s still queued)",
+                    kind, age - deadline, deadline, self.size
+                )
+                self._make_ready(key)
+                continue
+            
+            self.holding[task] = key
+            self.busy_since[task] = time.monotonic()
+            worker_busy.set(1, worker=worker)
+            worker_updates.inc(worker=worker)
+            # Handlers run in this worker's context, so every handler group of the update shares one id
+            correlation_id.set(uuid.uuid4().hex[:12])
+            return packet
+
+def install_dispatch_queue(app):
+    """
+    Replace the client's FIFO updates queue with a DispatchQueue for its
+    handler workers (the Client is created with workers=Config.DISPATCH_WORKERS)
+    """
+    app.dispatcher.updates_queue = DispatchQueue(app.workers)
@@ -57,3 +57,27 @@ def parse_time_string(time_str):
         return int(time_str[:-1]) * 60
     else:
         return int(time_str)
+
+def parse_duration(text):
+    """Parse a giveaway duration like '2d', '1h30m' or '1d2h5m' to seconds"""
+    duration_text = text.lower()
+    total_seconds = 0
+    
+    # Parse days, hours, minutes
+    if 'd' in duration_text:
+        days = int(duration_text.split('d')[0])
+        total_seconds += days * 86400
+        duration_text = duration_text.split('d')[1] if len(duration_text.split('d')) > 1 else ""
+    
+    if 'h' in duration_text:
+        hours = int(duration_text.split('h')[0])
+        total_seconds += hours * 3600
+        duration_text = duration_text.split('h')[1] if len(duration_text.split('h')) > 1 else ""
+    
+    if 'm' in duration_text:
+        minutes = int(duration_text.split('m')[0])
+        total_seconds += minutes * 60
+    
+    if total_seconds == 0:
+        raise ValueError("Invalid duration")
+    return total_seconds
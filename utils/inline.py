@@ -1,9 +1,27 @@
 from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from utils.callbacks import (
+    pack,
+    JOIN_GIVEAWAY,
+    CHECK_SUBSCRIPTION,
+    CLOSE,
+    BROADCAST_SELECT,
+    BROADCAST_CANCEL,
+    END_AUTO_ANNOUNCE,
+    END_MANUAL_ANNOUNCE,
+    ANNOUNCE_WINNER,
+    ADMIN_PANEL,
+    SETTING,
+    END_GIVEAWAY,
+    REROLL_GIVEAWAY,
+    PARTICIPANTS,
+    CONFIRM,
+    CANCEL
+)
 
 def join_giveaway_keyboard():
     """Join giveaway button"""
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("🎁 Join Giveaway", callback_data="join_giveaway")]
+        [InlineKeyboardButton("🎁 Join Giveaway", callback_data=pack(JOIN_GIVEAWAY))]
     ])
 
 def force_subscribe_keyboard(channels):
@@ -26,19 +44,19 @@ def force_subscribe_keyboard(channels):
             username_clean = username.lstrip('@')
             buttons.append([InlineKeyboardButton(f"📢 Join {title}", url=f"https://t.me/{username_clean}")])
     
-    buttons.append([InlineKeyboardButton("✅ Try Again", callback_data="check_subscription")])
+    buttons.append([InlineKeyboardButton("✅ Try Again", callback_data=pack(CHECK_SUBSCRIPTION))])
     return InlineKeyboardMarkup(buttons)
 
 def admin_panel_keyboard():
     """Admin panel keyboard"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("🎁 Giveaway", callback_data="admin_giveaway"),
-            InlineKeyboardButton("📢 Broadcast", callback_data="admin_broadcast")
+            InlineKeyboardButton("🎁 Giveaway", callback_data=pack(ADMIN_PANEL, "giveaway")),
+            InlineKeyboardButton("📢 Broadcast", callback_data=pack(ADMIN_PANEL, "broadcast"))
         ],
         [
-            InlineKeyboardButton("⚙️ Settings", callback_data="admin_settings"),
-            InlineKeyboardButton("📊 Stats", callback_data="admin_stats")
+            InlineKeyboardButton("⚙️ Settings", callback_data=pack(ADMIN_PANEL, "settings")),
+            InlineKeyboardButton("📊 Stats", callback_data=pack(ADMIN_PANEL, "stats"))
         ]
     ])
 
@@ -46,11 +64,11 @@ def giveaway_admin_keyboard(giveaway_id):
     """Giveaway admin control keyboard"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("🏁 End Giveaway", callback_data=f"end_giveaway_{giveaway_id}"),
-            InlineKeyboardButton("🔄 Reroll", callback_data=f"reroll_giveaway_{giveaway_id}")
+            InlineKeyboardButton("🏁 End Giveaway", callback_data=pack(END_GIVEAWAY, giveaway_id)),
+            InlineKeyboardButton("🔄 Reroll", callback_data=pack(REROLL_GIVEAWAY, giveaway_id))
         ],
         [
-            InlineKeyboardButton("👥 Participants", callback_data=f"participants_{giveaway_id}")
+            InlineKeyboardButton("👥 Participants", callback_data=pack(PARTICIPANTS, giveaway_id))
         ]
     ])
 
@@ -58,54 +76,54 @@ def broadcast_target_keyboard():
     """Broadcast target selection keyboard"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("👤 Users", callback_data="broadcast_users"),
-            InlineKeyboardButton("👥 Groups", callback_data="broadcast_groups")
+            InlineKeyboardButton("👤 Users", callback_data=pack(BROADCAST_SELECT, "users")),
+            InlineKeyboardButton("👥 Groups", callback_data=pack(BROADCAST_SELECT, "groups"))
         ],
         [
-            InlineKeyboardButton("📢 Channels", callback_data="broadcast_channels"),
-            InlineKeyboardButton("🌐 All", callback_data="broadcast_all")
+            InlineKeyboardButton("📢 Channels", callback_data=pack(BROADCAST_SELECT, "channels")),
+            InlineKeyboardButton("🌐 All", callback_data=pack(BROADCAST_SELECT, "all"))
         ],
-        [InlineKeyboardButton("❌ Cancel", callback_data="cancel_broadcast")]
+        [InlineKeyboardButton("❌ Cancel", callback_data=pack(BROADCAST_CANCEL))]
     ])
 
 def settings_keyboard():
     """Settings keyboard"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("🔔 Force Subscribe", callback_data="setting_force_subscribe"),
-            InlineKeyboardButton("📢 Channels", callback_data="setting_channels")
+            InlineKeyboardButton("🔔 Force Subscribe", callback_data=pack(SETTING, "force_subscribe")),
+            InlineKeyboardButton("📢 Channels", callback_data=pack(SETTING, "channels"))
         ],
         [
-            InlineKeyboardButton("👮 Admins", callback_data="setting_admins"),
-            InlineKeyboardButton("📝 Log Group", callback_data="setting_log_group")
+            InlineKeyboardButton("👮 Admins", callback_data=pack(SETTING, "admins")),
+            InlineKeyboardButton("📝 Log Group", callback_data=pack(SETTING, "log_group"))
         ],
-        [InlineKeyboardButton("🔙 Back", callback_data="admin_panel")]
+        [InlineKeyboardButton("🔙 Back", callback_data=pack(ADMIN_PANEL))]
     ])
 
 def confirm_keyboard(action):
     """Confirmation keyboard"""
     return InlineKeyboardMarkup([
         [
-            InlineKeyboardButton("✅ Yes", callback_data=f"confirm_{action}"),
-            InlineKeyboardButton("❌ No", callback_data=f"cancel_{action}")
+            InlineKeyboardButton("✅ Yes", callback_data=pack(CONFIRM, action)),
+            InlineKeyboardButton("❌ No", callback_data=pack(CANCEL, action))
         ]
     ])
 
 def close_keyboard():
     """Close button"""
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("❌ Close", callback_data="close")]
+        [InlineKeyboardButton("❌ Close", callback_data=pack(CLOSE))]
     ])
 
 def end_giveaway_keyboard(giveaway_id):
     """End giveaway options keyboard"""
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("✅ Auto Announce", callback_data=f"end_auto_announce_{giveaway_id}")],
-        [InlineKeyboardButton("⏳ Manual Announce", callback_data=f"end_manual_announce_{giveaway_id}")]
+        [InlineKeyboardButton("✅ Auto Announce", callback_data=pack(END_AUTO_ANNOUNCE, giveaway_id))],
+        [InlineKeyboardButton("⏳ Manual Announce", callback_data=pack(END_MANUAL_ANNOUNCE, giveaway_id))]
     ])
 
 def announce_winner_keyboard(giveaway_id):
     """Announce winner button"""
     return InlineKeyboardMarkup([
-        [InlineKeyboardButton("📢 Announce Winners", callback_data=f"announce_winner_{giveaway_id}")]
+        [InlineKeyboardButton("📢 Announce Winners", callback_data=pack(ANNOUNCE_WINNER, giveaway_id))]
     ])
@@ -1,7 +1,55 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
 from config import Config
 
+# Correlation id of the update currently being handled, set per update by utils.dispatch
+correlation_id = ContextVar("correlation_id", default=None)
+
+class _CorrelationFilter(logging.Filter):
+    """Stamp records with the correlation id while still in the calling context"""
+    
+    def filter(self, record):
+        record.corr_id = correlation_id.get()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the correlation id and event fields"""
+    
+    def format(self, record):
+        entry = {
+            "ts": "%s.%03d" % (self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), record.msecs),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+            "corr_id": getattr(record, "corr_id", None)
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never formats or blocks in the calling thread"""
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Formatting (including %-style args) happens in the writer thread
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
 class Logger:
     def __init__(self):
         self.logger = logging.getLogger("GiveawayBot")
@@ -12,27 +60,88 @@ class Logger:
         console_handler.setLevel(logging.INFO)
         
         # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        self.json = Config.LOG_FORMAT == "json"
+        if self.json:
+            formatter = JsonFormatter()
+        else:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         console_handler.setFormatter(formatter)
+        self.console_handler = console_handler
+        
+        # Records go through a bounded queue to a background writer thread,
+        # so logging never blocks the event loop on stream I/O
+        self.queue_handler = _NonBlockingQueueHandler(queue.Queue(Config.LOG_QUEUE_SIZE))
+        self.queue_handler.addFilter(_CorrelationFilter())
+        self.listener = QueueListener(self.queue_handler.queue, console_handler, respect_handler_level=True)
         
         # Add handler to logger
         if not self.logger.handlers:
-            self.logger.addHandler(console_handler)
+            self.logger.addHandler(self.queue_handler)
+            self.listener.start()
+            atexit.register(self.stop)
+        
+        # key -> [last_logged_at, suppressed_count] for rate-limited messages
+        self.limits = {}
+    
+    def info(self, message, *args):
+        self.logger.info(message, *args)
+    
+    def error(self, message, *args, exc_info=False):
+        self.logger.error(message, *args, exc_info=exc_info)
     
-    def info(self, message):
-        self.logger.info(message)
+    def warning(self, message, *args):
+        self.logger.warning(message, *args)
     
-    def error(self, message, exc_info=False):
-        self.logger.error(message, exc_info=exc_info)
+    def debug(self, message, *args):
+        self.logger.debug(message, *args)
     
-    def warning(self, message):
-        self.logger.warning(message)
+    def event(self, name, **fields):
+        """Log a structured event; INFO in JSON mode, DEBUG in text mode"""
+        level = logging.INFO if self.json else logging.DEBUG
+        if not self.logger.isEnabledFor(level):
+            return
+        if self.json:
+            self.logger.log(level, name, extra={"fields": fields})
+        else:
+            self.logger.log(level, "%s %s", name, fields)
+    
+    def limited(self, key, message, *args, level=logging.WARNING, interval=10):
+        """Log at most once per interval seconds for key, counting what was skipped
+        
+        Meant for per-recipient failures in broadcasts, where one line per
+        failed chat would flood the output.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        now = time.monotonic()
+        limit = self.limits.setdefault(key, [0.0, 0])
+        if now - limit[0] < interval:
+            limit[1] += 1
+            return
+        
+        suppressed = limit[1]
+        self.limits[key] = [now, 0]
+        if suppressed:
+            message += " (%d similar messages suppressed)"
+            args += (suppressed,)
+        self.logger.log(level, message, *args)
     
-    def debug(self, message):
-        self.logger.debug(message)
+    def stop(self):
+        """Flush queued records and stop the writer thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+            # Written straight to the console, as the queue has no writer any more
+            dropped = self.queue_handler.dropped
+            if dropped:
+                self.console_handler.handle(self.logger.makeRecord(
+                    self.logger.name, logging.WARNING, __file__, 0,
+                    "[LOG] %s log records were dropped because the log writer fell behind (LOG_QUEUE_SIZE=%s)",
+                    (dropped, Config.LOG_QUEUE_SIZE), None
+                ))
 
 # Global logger instance
 logger = Logger()
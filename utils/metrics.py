@@ -0,0 +1,198 @@
+import asyncio
+from urllib.parse import parse_qs
+from utils.logger import logger
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = [(name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+class Counter:
+    """Monotonically increasing value per label set"""
+    kind = "counter"
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+    
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self.values[key] = self.values.get(key, 0) + amount
+    
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, _format_labels(self.labelnames, key), value
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+    kind = "gauge"
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+    
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        self.values[key] = value
+
+class CallbackCounter(Counter):
+    """Counter kept by another component, read when the metrics are rendered"""
+    
+    def __init__(self, name, documentation, read):
+        super().__init__(name, documentation)
+        self.read = read
+    
+    def samples(self):
+        yield self.name, "", self.read()
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+    kind = "histogram"
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [bucket counts..., sum, count]
+        self.values = {}
+    
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                entry[index] += 1
+        entry[-2] += value
+        entry[-1] += 1
+    
+    def samples(self):
+        for key, entry in self.values.items():
+            for index, bound in enumerate(self.buckets):
+                yield f"{self.name}_bucket", _format_labels(self.labelnames, key, ("le", bound)), entry[index]
+            yield f"{self.name}_bucket", _format_labels(self.labelnames, key, ("le", "+Inf")), entry[-1]
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), entry[-2]
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), entry[-1]
+
+class MetricsRegistry:
+    """Holds all metrics and renders them in the Prometheus text format"""
+    
+    def __init__(self):
+        self.metrics = {}
+    
+    def _register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def callback_counter(self, name, documentation, read):
+        return self._register(CallbackCounter(name, documentation, read))
+    
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+# Global metrics registry
+registry = MetricsRegistry()
+
+# Handler metrics, filled by utils.tracing.traced_handler
+handler_latency = registry.histogram("bot_handler_latency_seconds", "Time spent in a handler", ["handler"])
+handler_in_flight = registry.gauge("bot_handler_in_flight", "Handlers currently running", ["handler"])
+handler_errors = registry.counter("bot_handler_errors_total", "Handlers that raised an error", ["handler", "error"])
+command_calls = registry.counter("bot_command_calls_total", "Commands received", ["command"])
+api_latency = registry.histogram("bot_telegram_api_latency_seconds", "Time spent in Telegram API calls", ["method"])
+model_latency = registry.histogram("bot_model_latency_seconds", "Time spent in database model calls", ["call"])
+# Counted by utils.logger, which cannot import this module
+registry.callback_counter(
+    "bot_log_records_dropped_total",
+    "Log records dropped because the log writer queue was full",
+    lambda: logger.queue_handler.dropped
+)
+
+# path -> callable taking the query dict and returning (content_type, body); more routes can be added with add_route
+routes = {
+    "/metrics": lambda query: ("text/plain; version=0.0.4", registry.render())
+}
+
+def add_route(path, handler):
+    """Serve handler(query) (sync or async, returning (content_type, body)) at path
+    
+    The handler can raise HTTPError to answer with another status.
+    """
+    routes[path] = handler
+
+class HTTPError(Exception):
+    """Raised by a route handler to answer with status (e.g. "400 Bad Request") and message"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+async def _handle_request(reader, writer):
+    try:
+        request_line = await reader.readline()
+        # Drain headers
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        
+        parts = request_line.decode("latin-1").split()
+        path, _, query_string = (parts[1] if len(parts) > 1 else "/").partition("?")
+        query = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        handler = routes.get(path)
+        if handler is None:
+            status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+        else:
+            try:
+                result = handler(query)
+                if asyncio.iscoroutine(result):
+                    result = await result
+                content_type, body = result
+                status = "200 OK"
+            except HTTPError as e:
+                status, content_type, body = e.status, "text/plain", f"error: {e}\n"
+            except Exception as e:
+                logger.error("Error in metrics route %s: %s", path, e)
+                status, content_type, body = "500 Internal Server Error", "text/plain", "internal error\n"
+        
+        payload = body.encode() if isinstance(body, str) else body
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.error("Error serving metrics request: %s", e)
+    finally:
+        writer.close()
+
+async def start_metrics_server(host, port):
+    """Serve the registered routes over HTTP on host:port"""
+    server = await asyncio.start_server(_handle_request, host, port)
+    logger.info("Metrics endpoint listening on http://%s:%s/metrics", host, port)
+    return server
@@ -0,0 +1,30 @@
+from pyrogram import Client
+from config import Config
+from utils.cache import TTLCache
+
+# Chats and users by id (and chats also by lowercase @username)
+peer_cache = TTLCache(Config.PEER_CACHE_SIZE)
+
+def _chat_key(chat_id):
+    if isinstance(chat_id, str):
+        return ("chat", chat_id.lower())
+    return ("chat", chat_id)
+
+async def get_chat_cached(client: Client, chat_id):
+    """client.get_chat, answered from the peer cache for PEER_CACHE_TTL seconds"""
+    key = _chat_key(chat_id)
+    chat = peer_cache.get(key)
+    if chat is None:
+        chat = await client.get_chat(chat_id)
+        peer_cache.set(key, chat, Config.PEER_CACHE_TTL)
+        peer_cache.set(("chat", chat.id), chat, Config.PEER_CACHE_TTL)
+    return chat
+
+async def get_user_cached(client: Client, user_id):
+    """client.get_users for a single user, answered from the peer cache for PEER_CACHE_TTL seconds"""
+    key = ("user", user_id)
+    user = peer_cache.get(key)
+    if user is None:
+        user = await client.get_users(user_id)
+        peer_cache.set(key, user, Config.PEER_CACHE_TTL)
+    return user
@@ -0,0 +1,116 @@
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from config import Config
+from utils.logger import logger
+from utils.metrics import add_route, HTTPError
+
+PROFILE_MODES = ["cpu", "sample"]
+
+# Only one profile may run at a time
+_profile_lock = asyncio.Lock()
+
+def _frame_key(frame):
+    code = frame.f_code
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+def _sample_stacks(thread_id, seconds, interval, own_samples, total_samples):
+    """Sample the stack of thread_id from a helper thread"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            own_samples[_frame_key(frame)] += 1
+            seen = set()
+            while frame is not None:
+                key = _frame_key(frame)
+                if key not in seen:
+                    seen.add(key)
+                    total_samples[key] += 1
+                frame = frame.f_back
+        time.sleep(interval)
+
+def _format_samples(own_samples, total_samples, top):
+    count = sum(own_samples.values()) or 1
+    lines = [f"Samples: {count}", "", "Top functions by own samples:"]
+    for key, samples in own_samples.most_common(top):
+        lines.append(f"{samples / count:7.1%}  {samples:6}  {key}")
+    lines += ["", "Top functions by inclusive samples:"]
+    for key, samples in total_samples.most_common(top):
+        lines.append(f"{samples / count:7.1%}  {samples:6}  {key}")
+    return "\n".join(lines)
+
+async def run_profile(seconds, mode="cpu", memory=False, top=40):
+    """
+    Profile the live event loop thread for seconds and return a text report.
+    
+    mode "cpu" uses cProfile (exact, higher overhead); "sample" samples the
+    loop thread's stack every few milliseconds from a helper thread. With
+    memory=True the report also includes the top tracemalloc allocation sites
+    over the same window.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+    if _profile_lock.locked():
+        raise RuntimeError("A profile is already running")
+    
+    seconds = max(1, min(seconds, Config.PROFILE_MAX_SECONDS))
+    async with _profile_lock:
+        logger.info("[PROFILE] Starting %s profile for %ss (memory=%s)", mode, seconds, memory)
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        
+        try:
+            if mode == "cpu":
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    profile.disable()
+                output = io.StringIO()
+                pstats.Stats(profile, stream=output).sort_stats("cumulative").print_stats(top)
+                report = output.getvalue()
+            else:
+                own_samples = Counter()
+                total_samples = Counter()
+                await asyncio.to_thread(
+                    _sample_stacks, threading.get_ident(), seconds, 0.005, own_samples, total_samples
+                )
+                report = _format_samples(own_samples, total_samples, top)
+            
+            if memory:
+                snapshot = tracemalloc.take_snapshot()
+                report += "\n\nTop memory allocations:\n"
+                for stat in snapshot.statistics("lineno")[:top]:
+                    report += f"{stat}\n"
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        
+        logger.info("[PROFILE] Finished %s profile", mode)
+        return f"{mode} profile, {seconds}s\n\n{report}"
+
+async def _profile_route(query):
+    """HTTP: /profile?seconds=10&mode=cpu&memory=1"""
+    try:
+        report = await run_profile(
+            int(query.get("seconds", 10)),
+            query.get("mode", "cpu"),
+            query.get("memory", "0") in ["1", "true"]
+        )
+    except ValueError as e:
+        raise HTTPError("400 Bad Request", e)
+    except RuntimeError as e:
+        # A profile is already running
+        raise HTTPError("409 Conflict", e)
+    return "text/plain", report
+
+add_route("/profile", _profile_route)
@@ -0,0 +1,58 @@
+import asyncio
+import time
+from utils.logger import logger, correlation_id
+
+def create_detached_task(coro):
+    """
+    Start a long-lived task without the current update's correlation id.
+    
+    Tasks copy the context they are created in, so a loop started from a
+    handler would otherwise log every later pass under that one update's id.
+    """
+    token = correlation_id.set(None)
+    try:
+        return asyncio.create_task(coro)
+    finally:
+        correlation_id.reset(token)
+
+class BackgroundTasks:
+    """
+    Keeps fire-and-forget tasks referenced until they finish and lets
+    shutdown wait for them. The event loop only holds weak references to
+    tasks, so an unreferenced one can be garbage-collected mid-flight.
+    """
+    
+    def __init__(self):
+        self.tasks = set()
+    
+    def spawn(self, coro):
+        """Run coro as a tracked task and return the task"""
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+    
+    def _done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("[TASKS] Background task failed: %s", task.exception())
+    
+    def idle(self):
+        return not self.tasks
+    
+    async def drain(self, timeout):
+        """Wait up to timeout seconds for the tracked tasks, and tasks they start, then cancel the rest"""
+        deadline = time.monotonic() + timeout
+        while self.tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await asyncio.wait(set(self.tasks), timeout=remaining)
+        
+        if self.tasks:
+            logger.warning("[TASKS] Cancelling %s background tasks still running after %ss", len(self.tasks), timeout)
+            for task in set(self.tasks):
+                task.cancel()
+
+# Fire-and-forget work started by handlers, drained by GiveawayBot.stop
+background = BackgroundTasks()
@@ -0,0 +1,124 @@
+import asyncio
+import functools
+import time
+import uuid
+from pyrogram import ContinuePropagation, StopPropagation
+from utils.logger import logger, correlation_id
+from utils.metrics import handler_latency, handler_in_flight, handler_errors, command_calls, api_latency, model_latency
+
+# Client methods that talk to Telegram and get their own timed span
+TRACED_CLIENT_METHODS = [
+    "send_message",
+    "copy_message",
+    "edit_message_text",
+    "delete_messages",
+    "answer_callback_query",
+    "get_chat_member",
+    "get_chat",
+    "get_users",
+    "get_me"
+]
+
+def _update_user_id(update):
+    user = getattr(update, "from_user", None)
+    return user.id if user else None
+
+def _has_command_filter(handler_filter):
+    """True if a handler filter, possibly combined with &, | and ~, includes filters.command"""
+    if handler_filter is None:
+        return False
+    if hasattr(handler_filter, "commands"):
+        return True
+    return any(_has_command_filter(getattr(handler_filter, part, None)) for part in ("base", "other"))
+
+def traced_handler(callback, counts_commands=False):
+    """Wrap a handler so each update gets a correlation id and a timed end event
+    
+    Only handlers whose own filter matches commands count them. message.command
+    stays set for later handler groups, which would count the command again.
+    """
+    # Module prefix keeps same-named handlers apart (user.join_giveaway_callback vs giveaway.join_giveaway_callback)
+    handler_name = f"{callback.__module__.rsplit('.', 1)[-1]}.{callback.__name__}"
+    
+    @functools.wraps(callback)
+    async def wrapper(client, update, *args):
+        # The dispatch queue sets one id per update; a fresh one only for updates handled outside it
+        token = correlation_id.set(correlation_id.get() or uuid.uuid4().hex[:12])
+        started = time.perf_counter()
+        status = "ok"
+        handler_in_flight.inc(handler=handler_name)
+        command = getattr(update, "command", None) if counts_commands else None
+        if command:
+            command_calls.inc(command=command[0])
+        try:
+            return await callback(client, update, *args)
+        except (ContinuePropagation, StopPropagation):
+            raise
+        except Exception as e:
+            status = type(e).__name__
+            handler_errors.inc(handler=handler_name, error=status)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            handler_in_flight.dec(handler=handler_name)
+            handler_latency.observe(elapsed, handler=handler_name)
+            logger.event(
+                "handler",
+                handler=handler_name,
+                user_id=_update_user_id(update),
+                status=status,
+                elapsed_ms=round(elapsed * 1000, 2)
+            )
+            correlation_id.reset(token)
+    return wrapper
+
+def _traced_call(kind, name, func, histogram, label):
+    def record(started):
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **{label: name})
+        logger.event(kind, call=name, elapsed_ms=round(elapsed * 1000, 2))
+    
+    @functools.wraps(func)
+    async def async_wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            record(started)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(started)
+    
+    return async_wrapper if asyncio.iscoroutinefunction(func) else wrapper
+
+def traced_repository(repository, name):
+    """Time every public method of a storage repository, labelled "<name>.<method>" """
+    for attr in dir(repository):
+        method = getattr(repository, attr)
+        if not attr.startswith("_") and callable(method):
+            setattr(repository, attr, _traced_call("model", f"{name}.{attr}", method, model_latency, "call"))
+    return repository
+
+def instrument_client(app):
+    """Trace every handler registered on app and time its Telegram API calls
+    
+    Handler latency, in-flight counts, errors and command calls are also
+    recorded in utils.metrics.
+    
+    Must run before the setup_*_handlers functions register their handlers.
+    """
+    add_handler = app.add_handler
+    
+    def traced_add_handler(handler, group=0):
+        handler.callback = traced_handler(handler.callback, _has_command_filter(getattr(handler, "filters", None)))
+        return add_handler(handler, group)
+    
+    app.add_handler = traced_add_handler
+    
+    for name in TRACED_CLIENT_METHODS:
+        setattr(app, name, _traced_call("api", name, getattr(app, name), api_latency, "method"))
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from config import Config
+from utils.logger import logger
+from utils.metrics import registry
+
+loop_lag = registry.gauge("bot_event_loop_lag_seconds", "Latest measured event loop lag")
+loop_lag_histogram = registry.histogram(
+    "bot_event_loop_lag_histogram_seconds",
+    "Event loop lag",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+loop_stalls = registry.counter("bot_event_loop_stalls_total", "Event loop stalls longer than LOOP_LAG_THRESHOLD_MS")
+
+class LoopWatchdog:
+    """
+    Measures event loop lag from a heartbeat task and, from a separate thread,
+    dumps the loop thread's stack when the heartbeat stops for longer than the
+    threshold, pointing at the synchronous call that is blocking the loop.
+    """
+    
+    def __init__(self, interval=None, threshold=None):
+        self.interval = (interval or Config.LOOP_LAG_INTERVAL_MS) / 1000
+        self.threshold = (threshold or Config.LOOP_LAG_THRESHOLD_MS) / 1000
+        self.heartbeat = time.monotonic()
+        self.loop_thread_id = None
+        self.task = None
+        self.thread = None
+        self.running = False
+    
+    def start(self):
+        """Start the heartbeat task on the running loop and the monitor thread"""
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.running = True
+        self.task = asyncio.create_task(self._heartbeat())
+        self.thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self.thread.start()
+        logger.info("Event loop watchdog started (threshold %sms)", int(self.threshold * 1000))
+    
+    def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+    
+    async def _heartbeat(self):
+        while self.running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.heartbeat = now
+            loop_lag.set(lag)
+            loop_lag_histogram.observe(lag)
+    
+    def _monitor(self):
+        reported = False
+        while self.running:
+            time.sleep(self.interval)
+            stalled_for = time.monotonic() - self.heartbeat - self.interval
+            if stalled_for < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            
+            # Report each stall once, with the stack the loop thread is stuck in
+            reported = True
+            loop_stalls.inc()
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logger.warning(
+                "[WATCHDOG] Event loop blocked for %.0fms, loop thread stack:\n%s",
+                stalled_for * 1000, stack
+            )